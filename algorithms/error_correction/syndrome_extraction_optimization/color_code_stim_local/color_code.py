@@ -1,3 +1,4 @@
+import copy
 import itertools
 from pathlib import Path
 import pickle
@@ -187,42 +188,9 @@ class ColorCode:
             Legacy parameter same as `circuit_type` for backward compatability. If this
             is given, it is prioritized over `circuit_type`.
         """
-        if isinstance(cnot_schedule, str):
-            if cnot_schedule in ["tri_optimal", "LLB"]:
-                cnot_schedule = [2, 3, 6, 5, 4, 1, 3, 4, 7, 6, 5, 2]
-            elif cnot_schedule == "tri_optimal_reversed":
-                cnot_schedule = [3, 4, 7, 6, 5, 2, 2, 3, 6, 5, 4, 1]
-            else:
-                raise ValueError(f"Invalid cnot schedule: {cnot_schedule}")
-            self._per_stabilizer_cnot = False
-        elif isinstance(cnot_schedule, dict):
-            # Dict with keys 'X' and 'Z', each a list of lists
-            if set(cnot_schedule.keys()) == {"X", "Z"} and all(
-                isinstance(v, list)
-                and all(
-                    isinstance(l, list) and all(isinstance(i, int) for i in l)
-                    for l in v
-                )
-                for v in cnot_schedule.values()
-            ):
-                self._per_stabilizer_cnot = "dict"
-            else:
-                raise ValueError(
-                    "If cnot_schedule is a dict, it must have keys 'X' and 'Z', each mapping to a list of lists of ints."
-                )
-        elif isinstance(cnot_schedule, list):
-            if all(isinstance(x, int) for x in cnot_schedule):
-                assert len(cnot_schedule) == 12
-                self._per_stabilizer_cnot = False
-            else:
-                raise ValueError(
-                    "cnot_schedule must be a string, a list of 12 ints, or a dict with keys 'X' and 'Z'."
-                )
-        else:
-            raise ValueError(
-                "cnot_schedule must be a string, a list of 12 ints, or a dict with keys 'X' and 'Z'."
-            )
-        self.cnot_schedule = cnot_schedule
+        self.cnot_schedule, self._per_stabilizer_cnot = self._parse_cnot_schedule(
+            cnot_schedule
+        )
 
         assert d > 1 and rounds >= 1
 
@@ -376,6 +344,57 @@ class ColorCode:
                 )
                 self.dems_decomposed[c] = dem_decomp
 
+    @staticmethod
+    def _parse_cnot_schedule(
+        cnot_schedule: Union[str, List[int], dict],
+    ) -> Tuple[Union[List[int], dict], Union[bool, str]]:
+        """
+        Validate a CNOT schedule given as in `__init__` and resolve the preset names.
+
+        Returns
+        -------
+        cnot_schedule : list of 12 ints or dict with keys 'X' and 'Z'
+            The resolved schedule.
+        per_stabilizer_cnot : bool or "dict"
+            "dict" for per-stabilizer schedules, False for uniform ones.
+        """
+        if isinstance(cnot_schedule, str):
+            if cnot_schedule in ["tri_optimal", "LLB"]:
+                cnot_schedule = [2, 3, 6, 5, 4, 1, 3, 4, 7, 6, 5, 2]
+            elif cnot_schedule == "tri_optimal_reversed":
+                cnot_schedule = [3, 4, 7, 6, 5, 2, 2, 3, 6, 5, 4, 1]
+            else:
+                raise ValueError(f"Invalid cnot schedule: {cnot_schedule}")
+            per_stabilizer_cnot = False
+        elif isinstance(cnot_schedule, dict):
+            # Dict with keys 'X' and 'Z', each a list of lists
+            if set(cnot_schedule.keys()) == {"X", "Z"} and all(
+                isinstance(v, list)
+                and all(
+                    isinstance(l, list) and all(isinstance(i, int) for i in l)
+                    for l in v
+                )
+                for v in cnot_schedule.values()
+            ):
+                per_stabilizer_cnot = "dict"
+            else:
+                raise ValueError(
+                    "If cnot_schedule is a dict, it must have keys 'X' and 'Z', each mapping to a list of lists of ints."
+                )
+        elif isinstance(cnot_schedule, list):
+            if all(isinstance(x, int) for x in cnot_schedule):
+                assert len(cnot_schedule) == 12
+                per_stabilizer_cnot = False
+            else:
+                raise ValueError(
+                    "cnot_schedule must be a string, a list of 12 ints, or a dict with keys 'X' and 'Z'."
+                )
+        else:
+            raise ValueError(
+                "cnot_schedule must be a string, a list of 12 ints, or a dict with keys 'X' and 'Z'."
+            )
+        return cnot_schedule, per_stabilizer_cnot
+
     def get_detector_type(self, detector_id: int) -> Tuple[PAULI_LABEL, COLOR_LABEL]:
         coords = self.circuit.get_detector_coordinates(only=[detector_id])[detector_id]
         pauli = coords[3]
@@ -394,6 +413,70 @@ class ColorCode:
     def get_observable_pauli(self, observable_id: int) -> PAULI_LABEL:
         return self.obs_paulis[observable_id]
 
+    def with_cnot_schedule(
+        self,
+        cnot_schedule: Union[str, List[int], dict],
+        *,
+        _generate_dem: bool = True,
+        _decompose_dem: bool = True,
+    ) -> "ColorCode":
+        """
+        Copy of this color code with another CNOT schedule.
+
+        The Tanner graph, qubit groups and detector information are shared with
+        this object, since they do not depend on the schedule, and only the CNOT
+        layers of the circuit are regenerated. This is much faster than
+        constructing a new `ColorCode` when many schedules of the same patch are
+        compared.
+
+        Parameters
+        ----------
+        cnot_schedule : str, list of 12 ints, or dict with keys 'X' and 'Z'
+            CNOT schedule, as in `__init__`.
+        _generate_dem : bool, default True
+            Whether to generate the detector error model. Not needed if only the
+            circuit is used, e.g., to compute the circuit-level distance.
+        _decompose_dem : bool, default True
+            Whether to decompose the detector error model for decoding.
+
+        Returns
+        -------
+        ColorCode
+            The new color code.
+        """
+        colorcode = copy.copy(self)
+        colorcode.cnot_schedule, colorcode._per_stabilizer_cnot = (
+            self._parse_cnot_schedule(cnot_schedule)
+        )
+        if getattr(self, "_circuit_parts", None) is None:
+            # Saved before the circuit parts were stored
+            colorcode.circuit = colorcode._generate_circuit()
+        else:
+            colorcode.circuit = colorcode._assemble_circuit(
+                colorcode._generate_cnot_layers()
+            )
+
+        if _generate_dem:
+            (
+                colorcode.dem_xz,
+                colorcode.H,
+                colorcode.obs_matrix,
+                colorcode.probs_xz,
+            ) = colorcode._generate_dem()
+        else:
+            colorcode.dem_xz = None
+            colorcode.H = None
+            colorcode.obs_matrix = None
+            colorcode.probs_xz = None
+
+        colorcode._bp_inputs = {}
+
+        colorcode.dems_decomposed = {}
+        if _generate_dem and _decompose_dem:
+            colorcode._reconstruct_dems_decomposed()
+
+        return colorcode
+
     @timeit
     def _create_tanner_graph(self) -> None:
         """Construct the Tanner graph for the chosen circuit type."""
@@ -701,7 +784,6 @@ class ColorCode:
     @timeit
     def _generate_circuit(self) -> stim.Circuit:
         qubit_groups = self.qubit_groups
-        cnot_schedule = self.cnot_schedule
         tanner_graph = self.tanner_graph
         rounds = self.rounds
         circuit_type = self.circuit_type
@@ -709,7 +791,6 @@ class ColorCode:
         d2 = self.d2
         temp_bdry_type = self.temp_bdry_type
         probs = self.physical_probs
-        p_bitflip = probs["bitflip"]
         p_reset = probs["reset"]
         p_meas = probs["meas"]
         p_cnot = probs["cnot"]
@@ -733,10 +814,6 @@ class ColorCode:
         num_anc_X_qubits = len(anc_X_qubits)
         num_anc_qubits = num_anc_X_qubits + num_anc_Z_qubits
 
-        num_qubits = tanner_graph.vcount()
-        all_qids = list(range(num_qubits))
-        all_qids_set = set(all_qids)
-
         exclude_non_essential_pauli_detectors = (
             self.exclude_non_essential_pauli_detectors
         )
@@ -747,143 +824,12 @@ class ColorCode:
             coords = self.get_qubit_coords(qubit)
             circuit.append("QUBIT_COORDS", qubit.index, coords)
 
-        # Syndrome extraction circuit without SPAM
-        synd_extr_circuit_without_spam = stim.Circuit()
-        if getattr(self, "_per_stabilizer_cnot", False) == True:
-            # Per-stabilizer CNOT schedule: cnot_schedule is a list of lists, for Z stabilizers only
-            for stab_idx, anc_Z_qubit in enumerate(anc_Z_qubits):
-                CX_targets = []
-                schedule = cnot_schedule[stab_idx]
-                for offset_idx in schedule:
-                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
-                    offset = offsets[offset_idx % 6]
-                    data_qubit_x = anc_Z_qubit["x"] + offset[0]
-                    data_qubit_y = anc_Z_qubit["y"] + offset[1]
-                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
-                    try:
-                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
-                    except ValueError:
-                        continue
-                    anc_qid = anc_Z_qubit.index
-                    data_qid = data_qubit.index
-                    CX_targets.extend([data_qid, anc_qid])
-                if CX_targets:
-                    synd_extr_circuit_without_spam.append("CX", CX_targets)
-                    if p_cnot > 0:
-                        synd_extr_circuit_without_spam.append(
-                            "DEPOLARIZE2", CX_targets, p_cnot
-                        )
-                synd_extr_circuit_without_spam.append("TICK")
-        elif getattr(self, "_per_stabilizer_cnot", False) == "dict":
-            # Per-stabilizer CNOT schedule for both X and Z stabilizers
-            z_schedules = cnot_schedule["Z"]
-            x_schedules = cnot_schedule["X"]
-            # Z stabilizers
-            for stab_idx, anc_Z_qubit in enumerate(anc_Z_qubits):
-                schedule = z_schedules[stab_idx]
-                for offset_idx in schedule:
-                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
-                    offset = offsets[offset_idx % 6]
-                    data_qubit_x = anc_Z_qubit["x"] + offset[0]
-                    data_qubit_y = anc_Z_qubit["y"] + offset[1]
-                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
-                    try:
-                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
-                    except ValueError:
-                        continue
-                    anc_qid = anc_Z_qubit.index
-                    data_qid = data_qubit.index
-                    synd_extr_circuit_without_spam.append("CX", [data_qid, anc_qid])
-                    if p_cnot > 0:
-                        synd_extr_circuit_without_spam.append(
-                            "DEPOLARIZE2", [data_qid, anc_qid], p_cnot
-                        )
-                    synd_extr_circuit_without_spam.append("TICK")
-            # X stabilizers
-            for stab_idx, anc_X_qubit in enumerate(anc_X_qubits):
-                schedule = x_schedules[stab_idx]
-                for offset_idx in schedule:
-                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
-                    offset = offsets[offset_idx % 6]
-                    data_qubit_x = anc_X_qubit["x"] + offset[0]
-                    data_qubit_y = anc_X_qubit["y"] + offset[1]
-                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
-                    try:
-                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
-                    except ValueError:
-                        continue
-                    anc_qid = anc_X_qubit.index
-                    data_qid = data_qubit.index
-                    synd_extr_circuit_without_spam.append("CX", [anc_qid, data_qid])
-                    if p_cnot > 0:
-                        synd_extr_circuit_without_spam.append(
-                            "DEPOLARIZE2", [anc_qid, data_qid], p_cnot
-                        )
-                    synd_extr_circuit_without_spam.append("TICK")
-        else:
-            # Old behavior: uniform schedule for all stabilizers
-            for timeslice in range(1, max(cnot_schedule) + 1):
-                targets = [i for i, val in enumerate(cnot_schedule) if val == timeslice]
-                operated_qids = set()
-
-                CX_targets = []
-                for target in targets:
-                    if target in {0, 6}:
-                        offset = (-2, 1)
-                    elif target in {1, 7}:
-                        offset = (2, 1)
-                    elif target in {2, 8}:
-                        offset = (4, 0)
-                    elif target in {3, 9}:
-                        offset = (2, -1)
-                    elif target in {4, 10}:
-                        offset = (-2, -1)
-                    else:
-                        offset = (-4, 0)
-
-                    target_anc_qubits = anc_Z_qubits if target < 6 else anc_X_qubits
-                    for anc_Z_qubit in target_anc_qubits:
-                        data_qubit_x = anc_Z_qubit["x"] + offset[0]
-                        data_qubit_y = anc_Z_qubit["y"] + offset[1]
-                        data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
-                        try:
-                            data_qubit = tanner_graph.vs.find(name=data_qubit_name)
-                        except ValueError:
-                            continue
-                        anc_qid = anc_Z_qubit.index
-                        data_qid = data_qubit.index
-                        operated_qids.update({anc_qid, data_qid})
-
-                        CX_target = (
-                            [data_qid, anc_qid] if target < 6 else [anc_qid, data_qid]
-                        )
-                        CX_targets.extend(CX_target)
-
-                synd_extr_circuit_without_spam.append("CX", CX_targets)
-                if p_cnot > 0:
-                    synd_extr_circuit_without_spam.append(
-                        "DEPOLARIZE2", CX_targets, p_cnot
-                    )
-
-                if p_idle > 0:
-                    idling_qids = list(all_qids_set - operated_qids)
-                    synd_extr_circuit_without_spam.append(
-                        "DEPOLARIZE1", idling_qids, p_idle
-                    )
-
-                synd_extr_circuit_without_spam.append("TICK")
-
-        # Syndrome extraction circuit with measurement & detector
+        # Measurements & detectors of the syndrome extraction rounds, which follow
+        # the CNOT layers (see `_assemble_circuit`)
         synd_extr_circuits = []
         obs_included_lookbacks = set()
         for first in [True, False]:
-            synd_extr_circuit = synd_extr_circuit_without_spam.copy()
-
-            if p_bitflip > 0:
-                synd_extr_circuit.insert(
-                    0, stim.CircuitInstruction("X_ERROR", data_qids, [p_bitflip])
-                )
-
+            synd_extr_circuit = stim.Circuit()
             synd_extr_circuit.append("MRZ", anc_Z_qids, p_meas)
             synd_extr_circuit.append("MRX", anc_X_qids, p_meas)
 
@@ -1124,8 +1070,9 @@ class ColorCode:
 
         circuit.append("TICK")
 
-        circuit += synd_extr_circuits[0]
-        circuit += synd_extr_circuits[1] * (rounds - 1)
+        # Everything after the syndrome extraction rounds
+        head = circuit
+        circuit = stim.Circuit()
 
         # Final data qubit measurements (& observables for red boundaries)
         p_meas_final = 0 if perfect_init_final else p_meas
@@ -1298,6 +1245,174 @@ class ColorCode:
                     coords = (-1, -1, -1, pauli_val, color_val, obs_id)
                     circuit.append("DETECTOR", target, coords)
 
+        # Only the CNOT layers depend on the CNOT schedule, see `with_cnot_schedule`
+        self._circuit_parts = (head, synd_extr_circuits, circuit)
+
+        return self._assemble_circuit(self._generate_cnot_layers())
+
+    @timeit
+    def _generate_cnot_layers(self) -> stim.Circuit:
+        """CNOT layers of a syndrome extraction round, following `cnot_schedule`."""
+        qubit_groups = self.qubit_groups
+        cnot_schedule = self.cnot_schedule
+        tanner_graph = self.tanner_graph
+        p_cnot = self.physical_probs["cnot"]
+        p_idle = self.physical_probs["idle"]
+
+        anc_Z_qubits = qubit_groups["anc_Z"]
+        anc_X_qubits = qubit_groups["anc_X"]
+        all_qids_set = set(range(tanner_graph.vcount()))
+
+        synd_extr_circuit_without_spam = stim.Circuit()
+        synd_extr_circuit_without_spam = stim.Circuit()
+        if getattr(self, "_per_stabilizer_cnot", False) == True:
+            # Per-stabilizer CNOT schedule: cnot_schedule is a list of lists, for Z stabilizers only
+            for stab_idx, anc_Z_qubit in enumerate(anc_Z_qubits):
+                CX_targets = []
+                schedule = cnot_schedule[stab_idx]
+                for offset_idx in schedule:
+                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
+                    offset = offsets[offset_idx % 6]
+                    data_qubit_x = anc_Z_qubit["x"] + offset[0]
+                    data_qubit_y = anc_Z_qubit["y"] + offset[1]
+                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
+                    try:
+                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
+                    except ValueError:
+                        continue
+                    anc_qid = anc_Z_qubit.index
+                    data_qid = data_qubit.index
+                    CX_targets.extend([data_qid, anc_qid])
+                if CX_targets:
+                    synd_extr_circuit_without_spam.append("CX", CX_targets)
+                    if p_cnot > 0:
+                        synd_extr_circuit_without_spam.append(
+                            "DEPOLARIZE2", CX_targets, p_cnot
+                        )
+                synd_extr_circuit_without_spam.append("TICK")
+        elif getattr(self, "_per_stabilizer_cnot", False) == "dict":
+            # Per-stabilizer CNOT schedule for both X and Z stabilizers
+            z_schedules = cnot_schedule["Z"]
+            x_schedules = cnot_schedule["X"]
+            # Z stabilizers
+            for stab_idx, anc_Z_qubit in enumerate(anc_Z_qubits):
+                schedule = z_schedules[stab_idx]
+                for offset_idx in schedule:
+                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
+                    offset = offsets[offset_idx % 6]
+                    data_qubit_x = anc_Z_qubit["x"] + offset[0]
+                    data_qubit_y = anc_Z_qubit["y"] + offset[1]
+                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
+                    try:
+                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
+                    except ValueError:
+                        continue
+                    anc_qid = anc_Z_qubit.index
+                    data_qid = data_qubit.index
+                    synd_extr_circuit_without_spam.append("CX", [data_qid, anc_qid])
+                    if p_cnot > 0:
+                        synd_extr_circuit_without_spam.append(
+                            "DEPOLARIZE2", [data_qid, anc_qid], p_cnot
+                        )
+                    synd_extr_circuit_without_spam.append("TICK")
+            # X stabilizers
+            for stab_idx, anc_X_qubit in enumerate(anc_X_qubits):
+                schedule = x_schedules[stab_idx]
+                for offset_idx in schedule:
+                    offsets = [(-2, 1), (2, 1), (4, 0), (2, -1), (-2, -1), (-4, 0)]
+                    offset = offsets[offset_idx % 6]
+                    data_qubit_x = anc_X_qubit["x"] + offset[0]
+                    data_qubit_y = anc_X_qubit["y"] + offset[1]
+                    data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
+                    try:
+                        data_qubit = tanner_graph.vs.find(name=data_qubit_name)
+                    except ValueError:
+                        continue
+                    anc_qid = anc_X_qubit.index
+                    data_qid = data_qubit.index
+                    synd_extr_circuit_without_spam.append("CX", [anc_qid, data_qid])
+                    if p_cnot > 0:
+                        synd_extr_circuit_without_spam.append(
+                            "DEPOLARIZE2", [anc_qid, data_qid], p_cnot
+                        )
+                    synd_extr_circuit_without_spam.append("TICK")
+        else:
+            # Old behavior: uniform schedule for all stabilizers
+            for timeslice in range(1, max(cnot_schedule) + 1):
+                targets = [i for i, val in enumerate(cnot_schedule) if val == timeslice]
+                operated_qids = set()
+
+                CX_targets = []
+                for target in targets:
+                    if target in {0, 6}:
+                        offset = (-2, 1)
+                    elif target in {1, 7}:
+                        offset = (2, 1)
+                    elif target in {2, 8}:
+                        offset = (4, 0)
+                    elif target in {3, 9}:
+                        offset = (2, -1)
+                    elif target in {4, 10}:
+                        offset = (-2, -1)
+                    else:
+                        offset = (-4, 0)
+
+                    target_anc_qubits = anc_Z_qubits if target < 6 else anc_X_qubits
+                    for anc_Z_qubit in target_anc_qubits:
+                        data_qubit_x = anc_Z_qubit["x"] + offset[0]
+                        data_qubit_y = anc_Z_qubit["y"] + offset[1]
+                        data_qubit_name = f"{data_qubit_x}-{data_qubit_y}"
+                        try:
+                            data_qubit = tanner_graph.vs.find(name=data_qubit_name)
+                        except ValueError:
+                            continue
+                        anc_qid = anc_Z_qubit.index
+                        data_qid = data_qubit.index
+                        operated_qids.update({anc_qid, data_qid})
+
+                        CX_target = (
+                            [data_qid, anc_qid] if target < 6 else [anc_qid, data_qid]
+                        )
+                        CX_targets.extend(CX_target)
+
+                synd_extr_circuit_without_spam.append("CX", CX_targets)
+                if p_cnot > 0:
+                    synd_extr_circuit_without_spam.append(
+                        "DEPOLARIZE2", CX_targets, p_cnot
+                    )
+
+                if p_idle > 0:
+                    idling_qids = list(all_qids_set - operated_qids)
+                    synd_extr_circuit_without_spam.append(
+                        "DEPOLARIZE1", idling_qids, p_idle
+                    )
+
+                synd_extr_circuit_without_spam.append("TICK")
+
+        return synd_extr_circuit_without_spam
+
+    def _assemble_circuit(self, cnot_layers: stim.Circuit) -> stim.Circuit:
+        """
+        Combine the CNOT layers with the schedule-independent parts of the circuit
+        stored by `_generate_circuit`.
+        """
+        head, synd_extr_circuits, tail = self._circuit_parts
+        p_bitflip = self.physical_probs["bitflip"]
+        data_qids = self.qubit_groups["data"]["qid"]
+
+        rounds_circuits = []
+        for synd_extr_circuit in synd_extr_circuits:
+            round_circuit = stim.Circuit()
+            if p_bitflip > 0:
+                round_circuit.append("X_ERROR", data_qids, p_bitflip)
+            round_circuit += cnot_layers
+            round_circuit += synd_extr_circuit
+            rounds_circuits.append(round_circuit)
+
+        circuit = head.copy()
+        circuit += rounds_circuits[0]
+        circuit += rounds_circuits[1] * (self.rounds - 1)
+        circuit += tail
         return circuit
 
     def _generate_det_id_info(
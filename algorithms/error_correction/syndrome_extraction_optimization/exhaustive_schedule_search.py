@@ -9,13 +9,20 @@ are obtained by rotation:
 This exploits the 3-fold rotational symmetry of the color code.
 """
 
+import json
+import multiprocessing
+import os
 import numpy as np
 from itertools import product
-from color_code_stim import ColorCode
+from color_code_stim_local import ColorCode
 from compare_schedules import schedule_to_cnot_dict_by_color_and_type
-from ilp_circuit_distance import mip_circuit_distance
+from ilp_circuit_distance import CircuitDistanceSession, mip_circuit_distance
 from custom_error_model import apply_custom_error_model, get_edge_ancilla_qids
 from visualize_minimal_error import visualize_errors_grid, print_minimal_representatives
+from generate_zero_collision_schedules import (
+    count_collisions,
+    setup_collision_detection,
+)
 import time
 
 
@@ -91,7 +98,95 @@ def get_all_color_schedules():
     return red_schedules, green_schedules, blue_schedules
 
 
-def compute_circuit_distance(colorcode, method="ilp"):
+def get_edge_schedules():
+    """
+    Fixed edge schedules, with the X part appended:
+        'r': [1, 4, 2, 6, 3, 5],
+        'b': [1, 5, 3, 6, 2, 4],
+        'g': [4, 2, 6, 3, 5, 1],
+    """
+    edge_schedules = {
+        "r": [1, 4, 2, 6, 3, 5],
+        "b": [1, 5, 3, 6, 2, 4],
+        "g": [4, 2, 6, 3, 5, 1],
+    }
+    return {
+        color: schedule + [x + 6 for x in schedule]
+        for color, schedule in edge_schedules.items()
+    }
+
+
+def build_colorcode(
+    colorcode_init,
+    r_schedule,
+    g_schedule,
+    b_schedule,
+    d,
+    rounds=1,
+    p_cnot=1e-3,
+    use_custom_error_model=False,
+):
+    """
+    Build the ColorCode with the given bulk schedules and the fixed edge schedules.
+
+    If colorcode_init has the same rounds and noise, the circuit is derived from
+    it with ColorCode.with_cnot_schedule, which only regenerates the CNOT layers
+    and skips the DEM of the ColorCode (the distance is computed from the
+    circuit).
+
+    Args:
+        colorcode_init: ColorCode with the "tri_optimal" schedule, used for the
+                        lattice structure
+        r_schedule, g_schedule, b_schedule: Bulk schedules (6 ints each)
+        d, rounds, p_cnot, use_custom_error_model: As in exhaustive_search
+
+    Returns:
+        ColorCode instance
+    """
+    edge_schedules = get_edge_schedules()
+    bulk_schedules = {
+        "r": r_schedule + [x + 6 for x in r_schedule],
+        "g": g_schedule + [x + 6 for x in g_schedule],
+        "b": b_schedule + [x + 6 for x in b_schedule],
+    }
+
+    # Combine bulk and edge schedules
+    schedules_by_color_and_type = {
+        color: {"bulk": bulk_schedules[color], "edge": edge_schedules[color]}
+        for color in ["r", "g", "b"]
+    }
+
+    # Build schedule dict
+    cnot_dict = schedule_to_cnot_dict_by_color_and_type(
+        colorcode_init, schedules_by_color_and_type
+    )
+
+    # Build ColorCode with this schedule
+    build_p_cnot = 0 if use_custom_error_model else p_cnot
+    if (
+        hasattr(colorcode_init, "with_cnot_schedule")
+        and colorcode_init.rounds == rounds
+        and colorcode_init.physical_probs["cnot"] == build_p_cnot
+        and colorcode_init.exclude_non_essential_pauli_detectors
+    ):
+        colorcode = colorcode_init.with_cnot_schedule(cnot_dict, _generate_dem=False)
+    else:
+        colorcode = ColorCode(
+            d=d,
+            rounds=rounds,
+            cnot_schedule=cnot_dict,
+            p_cnot=build_p_cnot,
+            exclude_non_essential_pauli_detectors=True,
+        )
+
+    # Apply custom error model if requested
+    if use_custom_error_model:
+        colorcode.circuit = apply_custom_error_model(colorcode, p_cnot)
+
+    return colorcode
+
+
+def compute_circuit_distance(colorcode, method="ilp", session=None, cutoff=None):
     """
     Compute the circuit-level distance.
 
@@ -99,14 +194,22 @@ def compute_circuit_distance(colorcode, method="ilp"):
         colorcode: ColorCode instance
         method: 'ilp' for exact ILP solver (OR-Tools/SCIP),
                 'stim' for stim's heuristic search
-        time_limit: Time limit in seconds (for ILP method)
+        session: CircuitDistanceSession reused across calls (for ILP method),
+                 or None to solve a new model
+        cutoff: With a session, stop as soon as the distance is known to be
+                below cutoff
 
     Returns:
-        Circuit-level distance (int)
+        Circuit-level distance (int), or None if it is below cutoff
     """
     if method == "ilp":
         dem = colorcode.circuit.detector_error_model()
-        result = mip_circuit_distance(dem, time_limit=None, verbose=False)
+        if session is not None:
+            result = session.solve(dem, cutoff=cutoff)
+            if result["status"] == "CUTOFF":
+                return None
+        else:
+            result = mip_circuit_distance(dem, time_limit=None, verbose=False)
         if result["distance"] is None:
             raise RuntimeError(f"ILP solver failed with status: {result['status']}")
         return result["distance"]
@@ -124,8 +227,133 @@ def compute_circuit_distance(colorcode, method="ilp"):
         raise ValueError(f"Unknown method: {method}. Use 'ilp' or 'stim'.")
 
 
+def stim_distance_upper_bound(colorcode):
+    """
+    Upper bound on the circuit distance: the size of the undetectable logical
+    error found by stim's heuristic search (method='stim'), or None if it finds
+    none within its search limits. Typically a hundred times faster than the ILP.
+    """
+    try:
+        return compute_circuit_distance(colorcode, method="stim")
+    except ValueError:
+        return None
+
+
+def make_collision_counter(d):
+    """
+    Return a function counting the collisions of (r, g, b) bulk schedules on
+    the distance-d lattice (see generate_zero_collision_schedules.count_collisions).
+    """
+    z_anc_info, z_anc_to_data, bulk_anc_list = setup_collision_detection(d)
+
+    def counter(r_schedule, g_schedule, b_schedule):
+        return count_collisions(
+            r_schedule,
+            g_schedule,
+            b_schedule,
+            z_anc_info,
+            z_anc_to_data,
+            bulk_anc_list,
+        )
+
+    return counter
+
+
+def staged_evaluation(
+    colorcode_init,
+    schedules,
+    d,
+    rounds=1,
+    p_cnot=1e-3,
+    method="ilp",
+    use_custom_error_model=False,
+    incumbent=None,
+    max_collisions=None,
+    collision_counter=None,
+    session=None,
+):
+    """
+    Evaluate bulk schedules in stages of increasing cost, stopping as soon as
+    the candidate is ruled out:
+
+    1. With max_collisions, schedules with more collisions are skipped before
+       any circuit is built.
+    2. With incumbent (the best distance found so far), the circuit is skipped
+       if stim_distance_upper_bound is below the incumbent, as it cannot be
+       among the best configurations.
+    3. Otherwise the distance is computed with method. With a session and an
+       incumbent, the ILP stops as soon as it finds a logical error with fewer
+       than incumbent mechanisms.
+
+    The LP relaxation of the ILP is not used as a lower bound: setting a
+    single observable-flipping error to 1 and the parity slacks to 1/2 is
+    feasible for every DEM, so its optimum is always 1.
+
+    Args:
+        colorcode_init, d, rounds, p_cnot, use_custom_error_model: As in build_colorcode
+        schedules: (r_schedule, g_schedule, b_schedule) bulk schedules
+        method: 'ilp' or 'stim', as in compute_circuit_distance
+        incumbent: Best distance so far, or None to always compute the distance
+        max_collisions: Maximal number of collisions, or None for no limit
+        collision_counter: Output of make_collision_counter(d), built if None
+        session: CircuitDistanceSession for method 'ilp', or None
+
+    Returns:
+        Dict with "distance" (None if the candidate was ruled out), "pruned"
+        (the stage that ruled it out) and, if computed, "collisions" and
+        "upper_bound"
+    """
+    result = {"distance": None}
+    if max_collisions is not None:
+        if collision_counter is None:
+            collision_counter = make_collision_counter(d)
+        result["collisions"] = collision_counter(*schedules)
+        if result["collisions"] > max_collisions:
+            result["pruned"] = "collisions"
+            return result
+
+    colorcode = build_colorcode(
+        colorcode_init,
+        *schedules,
+        d,
+        rounds=rounds,
+        p_cnot=p_cnot,
+        use_custom_error_model=use_custom_error_model,
+    )
+
+    if incumbent is not None or method == "stim":
+        result["upper_bound"] = stim_distance_upper_bound(colorcode)
+        upper_bound = result["upper_bound"]
+        if (
+            incumbent is not None
+            and upper_bound is not None
+            and upper_bound < incumbent
+        ):
+            result["pruned"] = "upper_bound"
+            return result
+        if method == "stim" and upper_bound is not None:
+            result["distance"] = upper_bound
+            return result
+
+    result["distance"] = compute_circuit_distance(
+        colorcode, method=method, session=session, cutoff=incumbent
+    )
+    if result["distance"] is None:
+        result["pruned"] = "ilp_cutoff"
+    return result
+
+
 def exhaustive_search(
-    d=7, rounds=1, p_cnot=1e-3, method="ilp", use_custom_error_model=False, verbose=True
+    d=7,
+    rounds=1,
+    p_cnot=1e-3,
+    method="ilp",
+    use_custom_error_model=False,
+    verbose=True,
+    prune=False,
+    max_collisions=None,
+    ilp_solver="SCIP",
+    ilp_workers=8,
 ):
     """
     Search all 12^3 = 1728 combinations of bulk schedules.
@@ -138,23 +366,19 @@ def exhaustive_search(
         use_custom_error_model: If True, use DEPOLARIZE1 before/after CNOT instead of DEPOLARIZE2,
                                 with special handling for edge plaquettes
         verbose: Print progress updates
-
-    Uses fixed edge schedules:
-        'r': [1, 4, 2, 6, 3, 5],
-        'b': [1, 5, 3, 6, 2, 4],
-        'g': [4, 2, 6, 3, 5, 1],
+        prune: Skip the exact distance of combinations whose stim upper bound
+               is below the best distance so far (see staged_evaluation).
+               The best configurations are still exact, but pruned
+               combinations are recorded with distance None
+        max_collisions: Skip combinations with more bulk collisions
+                        (distance None), or None to evaluate all
+        ilp_solver: 'SCIP', 'CBC' or 'CP-SAT', solving the DEMs of all
+                    combinations in one CircuitDistanceSession
+        ilp_workers: Parallel search workers of 'CP-SAT'
+
+    Uses the fixed edge schedules of get_edge_schedules. See
+    parallel_exhaustive_search for a parallel, resumable version.
     """
-    # Fixed edge schedules (with X part appended)
-    edge_schedules = {
-        "r": [1, 4, 2, 6, 3, 5],
-        "b": [1, 5, 3, 6, 2, 4],
-        "g": [4, 2, 6, 3, 5, 1],
-    }
-    for color in ["r", "g", "b"]:
-        edge_schedules[color] = edge_schedules[color] + [
-            x + 6 for x in edge_schedules[color]
-        ]
-
     # Get all bulk schedules for each color
     red_bulk, green_bulk, blue_bulk = get_all_color_schedules()
 
@@ -176,6 +400,15 @@ def exhaustive_search(
         exclude_non_essential_pauli_detectors=True,
     )
 
+    collision_counter = (
+        make_collision_counter(d) if max_collisions is not None else None
+    )
+    session = (
+        CircuitDistanceSession(ilp_solver, num_workers=ilp_workers)
+        if method == "ilp"
+        else None
+    )
+
     # Track best results
     best_distance = 0
     best_configs = []
@@ -187,40 +420,21 @@ def exhaustive_search(
     for idx, (r_idx, g_idx, b_idx) in enumerate(
         product(range(len(red_bulk)), range(len(green_bulk)), range(len(blue_bulk)))
     ):
-        # Build bulk schedules for this combination
-        bulk_schedules = {
-            "r": red_bulk[r_idx] + [x + 6 for x in red_bulk[r_idx]],
-            "g": green_bulk[g_idx] + [x + 6 for x in green_bulk[g_idx]],
-            "b": blue_bulk[b_idx] + [x + 6 for x in blue_bulk[b_idx]],
-        }
-
-        # Combine bulk and edge schedules
-        schedules_by_color_and_type = {
-            color: {"bulk": bulk_schedules[color], "edge": edge_schedules[color]}
-            for color in ["r", "g", "b"]
-        }
-
-        # Build schedule dict
-        cnot_dict = schedule_to_cnot_dict_by_color_and_type(
-            colorcode_init, schedules_by_color_and_type
-        )
-
-        # Build ColorCode with this schedule
-        build_p_cnot = 0 if use_custom_error_model else p_cnot
-        colorcode = ColorCode(
-            d=d,
+        # Compute distance, unless a cheaper stage rules the combination out
+        evaluation = staged_evaluation(
+            colorcode_init,
+            (red_bulk[r_idx], green_bulk[g_idx], blue_bulk[b_idx]),
+            d,
             rounds=rounds,
-            cnot_schedule=cnot_dict,
-            p_cnot=build_p_cnot,
-            exclude_non_essential_pauli_detectors=True,
+            p_cnot=p_cnot,
+            method=method,
+            use_custom_error_model=use_custom_error_model,
+            incumbent=best_distance if prune else None,
+            max_collisions=max_collisions,
+            collision_counter=collision_counter,
+            session=session,
         )
-
-        # Apply custom error model if requested
-        if use_custom_error_model:
-            colorcode.circuit = apply_custom_error_model(colorcode, p_cnot)
-
-        # Compute distance
-        distance = compute_circuit_distance(colorcode, method=method)
+        distance = evaluation["distance"]
 
         config = {
             "r_idx": r_idx,
@@ -229,11 +443,13 @@ def exhaustive_search(
             "r_schedule": red_bulk[r_idx],
             "g_schedule": green_bulk[g_idx],
             "b_schedule": blue_bulk[b_idx],
-            "distance": distance,
         }
+        config.update(evaluation)
         all_results.append(config)
 
-        if distance > best_distance:
+        if distance is None:
+            pass
+        elif distance > best_distance:
             best_distance = distance
             best_configs = [config]
             if verbose:
@@ -254,6 +470,14 @@ def exhaustive_search(
             )
 
     elapsed = time.time() - start_time
+    print_search_summary(best_configs, all_results, elapsed)
+
+    return best_configs, all_results
+
+
+def print_search_summary(best_configs, all_results, elapsed):
+    """Print the best configurations and the distance distribution of a search."""
+    best_distance = best_configs[0]["distance"] if best_configs else 0
 
     print("\n" + "=" * 80)
     print("SEARCH COMPLETE")
@@ -277,7 +501,7 @@ def exhaustive_search(
         )
 
     # Distribution of distances
-    distances = [r["distance"] for r in all_results]
+    distances = [r["distance"] for r in all_results if r["distance"] is not None]
     unique_distances = sorted(set(distances))
     print("\n" + "=" * 80)
     print("DISTANCE DISTRIBUTION")
@@ -285,8 +509,279 @@ def exhaustive_search(
     for dist in unique_distances:
         count = distances.count(dist)
         print(
-            f"Distance {dist}: {count} configurations ({100*count/len(distances):.1f}%)"
+            f"Distance {dist}: {count} configurations ({100*count/len(all_results):.1f}%)"
+        )
+    for stage in ["collisions", "upper_bound", "ilp_cutoff"]:
+        count = sum(r.get("pruned") == stage for r in all_results)
+        if count:
+            print(
+                f"Pruned by {stage}: {count} configurations ({100*count/len(all_results):.1f}%)"
+            )
+
+
+def load_checkpoint(checkpoint_file, params):
+    """
+    Load the results of a search checkpoint file.
+
+    The checkpoint is a JSON-lines file: a header line with the search
+    parameters, then one config dict per evaluated combination. A partial
+    last line, left by a crash while writing, is dropped from the file.
+
+    Args:
+        checkpoint_file: Path to the checkpoint file
+        params: Search parameters, which must match the header of an
+                existing checkpoint
+
+    Returns:
+        List of config dicts ([] if the file does not exist)
+    """
+    if not os.path.exists(checkpoint_file):
+        return []
+
+    with open(checkpoint_file, "rb") as f:
+        data = f.read()
+    complete = data[: data.rfind(b"\n") + 1]
+    if len(complete) < len(data):
+        with open(checkpoint_file, "r+b") as f:
+            f.truncate(len(complete))
+
+    lines = complete.decode().splitlines()
+    if not lines:
+        return []
+    header = json.loads(lines[0])
+    if header.get("search") != params:
+        raise ValueError(
+            f"Checkpoint {checkpoint_file} was written with parameters "
+            f"{header.get('search')}, not {params}"
+        )
+    return [json.loads(line) for line in lines[1:]]
+
+
+# Per-process state of the parallel search workers
+_worker_state = {}
+
+
+def _init_search_worker(
+    d,
+    rounds,
+    p_cnot,
+    method,
+    use_custom_error_model,
+    incumbent=None,
+    ilp_solver="SCIP",
+    ilp_workers=1,
+):
+    """
+    Build the structure shared by all combinations once per worker process.
+    incumbent is a shared multiprocessing.Value with the best distance so far,
+    or None to compute the distance of every combination. Every worker solves
+    its combinations in its own CircuitDistanceSession.
+    """
+    init_p_cnot = 0 if use_custom_error_model else p_cnot
+    _worker_state.update(
+        colorcode_init=ColorCode(
+            d=d,
+            rounds=rounds,
+            cnot_schedule="tri_optimal",
+            p_cnot=init_p_cnot,
+            exclude_non_essential_pauli_detectors=True,
+        ),
+        bulk_schedules=get_all_color_schedules(),
+        d=d,
+        rounds=rounds,
+        p_cnot=p_cnot,
+        method=method,
+        use_custom_error_model=use_custom_error_model,
+        incumbent=incumbent,
+        session=(
+            CircuitDistanceSession(ilp_solver, num_workers=ilp_workers)
+            if method == "ilp"
+            else None
+        ),
+    )
+
+
+def _evaluate_combination(combination):
+    """staged_evaluation of one (r_idx, g_idx, b_idx) combination."""
+    state = _worker_state
+    incumbent = state["incumbent"]
+    evaluation = staged_evaluation(
+        state["colorcode_init"],
+        [bulk[idx] for bulk, idx in zip(state["bulk_schedules"], combination)],
+        state["d"],
+        rounds=state["rounds"],
+        p_cnot=state["p_cnot"],
+        method=state["method"],
+        use_custom_error_model=state["use_custom_error_model"],
+        incumbent=None if incumbent is None else incumbent.value,
+        session=state["session"],
+    )
+    return combination, evaluation
+
+
+def _make_config(combination, evaluation, bulk_schedules):
+    r_idx, g_idx, b_idx = combination
+    red_bulk, green_bulk, blue_bulk = bulk_schedules
+    config = {
+        "r_idx": r_idx,
+        "g_idx": g_idx,
+        "b_idx": b_idx,
+        "r_schedule": red_bulk[r_idx],
+        "g_schedule": green_bulk[g_idx],
+        "b_schedule": blue_bulk[b_idx],
+    }
+    config.update(evaluation)
+    return config
+
+
+def parallel_exhaustive_search(
+    d=7,
+    rounds=1,
+    p_cnot=1e-3,
+    method="ilp",
+    use_custom_error_model=False,
+    checkpoint_file=None,
+    num_workers=None,
+    prune=False,
+    max_collisions=None,
+    ilp_solver="SCIP",
+    ilp_workers=1,
+    verbose=True,
+):
+    """
+    Search all 12^3 = 1728 combinations of bulk schedules in a pool of
+    worker processes.
+
+    Every result is appended to the checkpoint file as soon as it is
+    computed. If the checkpoint already exists, e.g. after a crash or an
+    interruption, the combinations recorded there are not evaluated again.
+
+    Args:
+        d, rounds, p_cnot, method, use_custom_error_model: As in exhaustive_search
+        checkpoint_file: JSON-lines file for the results
+                         (default: search_results_d{d}.jsonl)
+        num_workers: Number of worker processes (default: number of CPUs)
+        prune, max_collisions: As in exhaustive_search. The best distance so
+                               far is shared with the workers for pruning
+        ilp_solver: As in exhaustive_search, with one session per worker
+        ilp_workers: Parallel search workers of 'CP-SAT' in every worker
+                     process. Keep num_workers * ilp_workers at most the
+                     number of CPUs
+        verbose: Print progress updates
+
+    Returns:
+        best_configs, all_results as in exhaustive_search, with all_results
+        in the order of the combinations
+    """
+    if checkpoint_file is None:
+        checkpoint_file = f"search_results_d{d}.jsonl"
+    params = {
+        "d": d,
+        "rounds": rounds,
+        "p_cnot": p_cnot,
+        "method": method,
+        "custom_error_model": use_custom_error_model,
+        "prune": prune,
+        "max_collisions": max_collisions,
+        "ilp_solver": ilp_solver,
+    }
+
+    red_bulk, green_bulk, blue_bulk = get_all_color_schedules()
+    bulk_schedules = (red_bulk, green_bulk, blue_bulk)
+    combinations = list(
+        product(range(len(red_bulk)), range(len(green_bulk)), range(len(blue_bulk)))
+    )
+
+    all_results = load_checkpoint(checkpoint_file, params)
+    done = {(r["r_idx"], r["g_idx"], r["b_idx"]) for r in all_results}
+    pending = [c for c in combinations if c not in done]
+
+    print(f"Total combinations: {len(combinations)}")
+    print(f"Loaded from {checkpoint_file}: {len(done)}, remaining: {len(pending)}")
+    if use_custom_error_model:
+        print("Using CUSTOM error model (DEPOLARIZE1 before/after CNOT)")
+    print()
+
+    start_time = time.time()
+    best_distance = max(
+        (r["distance"] for r in all_results if r["distance"] is not None), default=0
+    )
+    incumbent = multiprocessing.Value("i", best_distance) if prune else None
+    if pending:
+        write_header = (
+            not os.path.exists(checkpoint_file) or os.path.getsize(checkpoint_file) == 0
         )
+        with open(checkpoint_file, "a") as f, multiprocessing.Pool(
+            num_workers,
+            initializer=_init_search_worker,
+            initargs=(
+                d,
+                rounds,
+                p_cnot,
+                method,
+                use_custom_error_model,
+                incumbent,
+                ilp_solver,
+                ilp_workers,
+            ),
+        ) as pool:
+            if write_header:
+                f.write(json.dumps({"search": params}) + "\n")
+                f.flush()
+
+            # Collisions depend only on the schedules, so they are checked here
+            collisions = {}
+            if max_collisions is not None:
+                counter = make_collision_counter(d)
+                for c in pending:
+                    collisions[c] = counter(
+                        *[bulk[idx] for bulk, idx in zip(bulk_schedules, c)]
+                    )
+                    if collisions[c] > max_collisions:
+                        evaluation = {
+                            "distance": None,
+                            "collisions": collisions[c],
+                            "pruned": "collisions",
+                        }
+                        config = _make_config(c, evaluation, bulk_schedules)
+                        f.write(json.dumps(config) + "\n")
+                        all_results.append(config)
+                f.flush()
+                pending = [c for c in pending if collisions[c] <= max_collisions]
+
+            for idx, (c, evaluation) in enumerate(
+                pool.imap_unordered(_evaluate_combination, pending), 1
+            ):
+                config = _make_config(c, evaluation, bulk_schedules)
+                if c in collisions:
+                    config["collisions"] = collisions[c]
+                f.write(json.dumps(config) + "\n")
+                f.flush()
+                all_results.append(config)
+
+                distance = evaluation["distance"]
+                if distance is not None and distance > best_distance:
+                    best_distance = distance
+                    if incumbent is not None:
+                        incumbent.value = best_distance
+                    if verbose:
+                        print(
+                            f"[{idx}/{len(pending)}] New best distance: {best_distance}"
+                        )
+                        print(
+                            f"  R: {config['r_schedule']}, G: {config['g_schedule']}, "
+                            f"B: {config['b_schedule']}"
+                        )
+                if verbose and idx % 100 == 0:
+                    elapsed = time.time() - start_time
+                    remaining = (len(pending) - idx) * elapsed / idx
+                    print(
+                        f"[{idx}/{len(pending)}] Elapsed: {elapsed:.1f}s, ETA: {remaining:.1f}s, Best: {best_distance}"
+                    )
+
+    all_results.sort(key=lambda r: (r["r_idx"], r["g_idx"], r["b_idx"]))
+    best_configs = get_best_configs(all_results)
+    print_search_summary(best_configs, all_results, time.time() - start_time)
 
     return best_configs, all_results
 
@@ -299,6 +794,10 @@ def test_configs_on_d(
     method="ilp",
     use_custom_error_model=False,
     verbose=True,
+    prune=False,
+    max_collisions=None,
+    ilp_solver="SCIP",
+    ilp_workers=8,
 ):
     """
     Test a list of configurations on a specific code distance.
@@ -311,20 +810,22 @@ def test_configs_on_d(
         method: 'ilp' or 'stim'
         use_custom_error_model: If True, use DEPOLARIZE1 before/after CNOT instead of DEPOLARIZE2
         verbose: Print progress
+        prune, max_collisions: As in exhaustive_search; the stage that ruled
+                               out a config is recorded as pruned_d{d}
+        ilp_solver, ilp_workers: As in exhaustive_search
 
     Returns:
         List of configs with updated distances for this d
     """
-    # Fixed edge schedules
-    edge_schedules = {
-        "r": [1, 4, 2, 6, 3, 5],
-        "b": [1, 5, 3, 6, 2, 4],
-        "g": [4, 2, 6, 3, 5, 1],
-    }
-    for color in ["r", "g", "b"]:
-        edge_schedules[color] = edge_schedules[color] + [
-            x + 6 for x in edge_schedules[color]
-        ]
+    collision_counter = (
+        make_collision_counter(d) if max_collisions is not None else None
+    )
+    session = (
+        CircuitDistanceSession(ilp_solver, num_workers=ilp_workers)
+        if method == "ilp"
+        else None
+    )
+    best_distance = 0
 
     # Build initial ColorCode to get structure
     init_p_cnot = 0 if use_custom_error_model else p_cnot
@@ -344,46 +845,31 @@ def test_configs_on_d(
                 f"[{i+1}/{len(configs)}] Testing config r={cfg['r_idx']}, g={cfg['g_idx']}, b={cfg['b_idx']} on d={d}..."
             )
 
-        # Build bulk schedules
-        bulk_schedules = {
-            "r": cfg["r_schedule"] + [x + 6 for x in cfg["r_schedule"]],
-            "g": cfg["g_schedule"] + [x + 6 for x in cfg["g_schedule"]],
-            "b": cfg["b_schedule"] + [x + 6 for x in cfg["b_schedule"]],
-        }
-
-        # Combine bulk and edge schedules
-        schedules_by_color_and_type = {
-            color: {"bulk": bulk_schedules[color], "edge": edge_schedules[color]}
-            for color in ["r", "g", "b"]
-        }
-
-        # Build schedule dict
-        cnot_dict = schedule_to_cnot_dict_by_color_and_type(
-            colorcode_init, schedules_by_color_and_type
-        )
-
-        # Build ColorCode with this schedule
-        build_p_cnot = 0 if use_custom_error_model else p_cnot
-        colorcode = ColorCode(
-            d=d,
+        # Compute distance, unless a cheaper stage rules the config out
+        evaluation = staged_evaluation(
+            colorcode_init,
+            (cfg["r_schedule"], cfg["g_schedule"], cfg["b_schedule"]),
+            d,
             rounds=rounds,
-            cnot_schedule=cnot_dict,
-            p_cnot=build_p_cnot,
-            exclude_non_essential_pauli_detectors=True,
+            p_cnot=p_cnot,
+            method=method,
+            use_custom_error_model=use_custom_error_model,
+            incumbent=best_distance if prune else None,
+            max_collisions=max_collisions,
+            collision_counter=collision_counter,
+            session=session,
         )
-
-        # Apply custom error model if requested
-        if use_custom_error_model:
-            colorcode.circuit = apply_custom_error_model(colorcode, p_cnot)
-
-        # Compute distance
-        distance = compute_circuit_distance(colorcode, method=method)
+        distance = evaluation["distance"]
 
         # Copy config and add new distance
         result = cfg.copy()
         result[f"distance_d{d}"] = distance
+        if "pruned" in evaluation:
+            result[f"pruned_d{d}"] = evaluation["pruned"]
         results.append(result)
 
+        if distance is not None:
+            best_distance = max(best_distance, distance)
         if verbose:
             print(f"    Distance at d={d}: {distance}")
 
@@ -423,8 +909,10 @@ def get_best_configs(results, distance_key="distance", top_n=None):
         top_n: If set, return top N distances (not just the max)
 
     Returns:
-        List of configs with best distance(s)
+        List of configs with best distance(s), skipping pruned configs
+        (distance None)
     """
+    results = [r for r in results if r.get(distance_key) is not None]
     if not results:
         return []
 
@@ -546,7 +1034,6 @@ def visualize_config_minimal_error(
 
 def main():
     import pickle
-    import os
 
     # ============================================================
     # CONFIGURATION - Change these parameters as needed
@@ -561,6 +1048,11 @@ def main():
     use_custom_error_model = (
         False  # Use DEPOLARIZE1 before/after CNOT (with edge handling)
     )
+    num_workers = os.cpu_count()  # Worker processes for the d1 search
+    prune = False  # Skip the ILP below the best distance (only top tier exact)
+    max_collisions = None  # Skip schedules with more hook collisions
+    ilp_solver = "SCIP"  # ILP backend: 'SCIP', 'CBC' or 'CP-SAT'
+    ilp_workers = 1  # CP-SAT threads per search worker (8 for d2 testing)
     # ============================================================
 
     print("=" * 80)
@@ -569,6 +1061,9 @@ def main():
     print(f"\nConfiguration: d1={d1}, d2={d2}, rounds={rounds}, p_cnot={p_cnot}")
     print(f"Methods: d1={method_d1}, d2={method_d2}")
     print(f"Custom error model: {use_custom_error_model}")
+    print(f"Workers: {num_workers}")
+    print(f"Pruning: {prune}, max collisions: {max_collisions}")
+    print(f"ILP solver: {ilp_solver}")
     print()
 
     # Step 1: Run exhaustive search on d1 (or load from file if exists)
@@ -583,23 +1078,30 @@ def main():
         print(f"Loaded {len(all_results_d1)} configurations from d={d1} search")
 
         # Print distance distribution
-        distances = [r["distance"] for r in all_results_d1]
+        distances = [r["distance"] for r in all_results_d1 if r["distance"] is not None]
         unique_distances = sorted(set(distances), reverse=True)
         print("\nDistance distribution:")
         for dist in unique_distances:
             count = distances.count(dist)
             print(
-                f"  Distance {dist}: {count} configurations ({100*count/len(distances):.1f}%)"
+                f"  Distance {dist}: {count} configurations ({100*count/len(all_results_d1):.1f}%)"
             )
     else:
         print(f"STEP 1: Exhaustive search on d={d1}")
         print("-" * 40)
-        best_configs_d1, all_results_d1 = exhaustive_search(
+        # Resumes from the checkpoint if a previous search was interrupted
+        best_configs_d1, all_results_d1 = parallel_exhaustive_search(
             d=d1,
             rounds=rounds,
             p_cnot=p_cnot,
             method=method_d1,
             use_custom_error_model=use_custom_error_model,
+            checkpoint_file=f"search_results_d{d1}.jsonl",
+            num_workers=num_workers,
+            prune=prune,
+            max_collisions=max_collisions,
+            ilp_solver=ilp_solver,
+            ilp_workers=ilp_workers,
             verbose=True,
         )
 
@@ -613,6 +1115,9 @@ def main():
                 "p_cnot": p_cnot,
                 "method": method_d1,
                 "custom_error_model": use_custom_error_model,
+                "prune": prune,
+                "max_collisions": max_collisions,
+                "ilp_solver": ilp_solver,
             },
         )
 
@@ -655,6 +1160,9 @@ def main():
         p_cnot=p_cnot,
         method=method_d2,
         use_custom_error_model=use_custom_error_model,
+        prune=prune,
+        max_collisions=max_collisions,
+        ilp_solver=ilp_solver,
         verbose=True,
     )
 
@@ -680,7 +1188,7 @@ def main():
     # Sort by d2 distance
     distance_key_d2 = f"distance_d{d2}"
     results_d2_sorted = sorted(
-        results_d2, key=lambda x: x.get(distance_key_d2, 0), reverse=True
+        results_d2, key=lambda x: x.get(distance_key_d2) or 0, reverse=True
     )
 
     print(f"\nTop configs (sorted by d={d2} distance):")
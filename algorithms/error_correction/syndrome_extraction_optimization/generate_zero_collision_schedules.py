@@ -131,6 +131,8 @@ def generate_zero_collision_schedules(results_file="search_results_d7.pkl", d=7)
         data = pickle.load(f)
 
     results = data.get("results") or data.get("all_results")
+    # Configs pruned by a staged search have no distance
+    results = [r for r in results if r["distance"] is not None]
     max_dist = max(r["distance"] for r in results)
     optimal_configs = [r for r in results if r["distance"] == max_dist]
 
@@ -6,8 +6,18 @@ Adapted to use OR-Tools for better cross-platform support (including Apple Silic
 """
 
 from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
 import stim
 
+# Parameters that stop SCIP once a solution at least as good as the given value is
+# found, in SCIP >= 10 and in older versions
+SCIP_PRIMAL_LIMIT_PARAMETERS = ["limits/primal", "limits/objectivestop"]
+
+# With dual reductions, SCIP 10 reports wrong optima (OPTIMAL 4 instead of 3) on
+# some DEMs of the d=5 schedule search. Disabling only the strong or only the weak
+# ones is not enough.
+SCIP_PARAMETERS = "misc/allowstrongdualreds = FALSE\nmisc/allowweakdualreds = FALSE\n"
+
 
 def mip_circuit_distance(
     dem: stim.DetectorErrorModel,
@@ -71,21 +81,29 @@ def mip_circuit_distance(
     solver = pywraplp.Solver.CreateSolver(solver_name)
     if not solver:
         # Fallback to CBC
-        solver = pywraplp.Solver.CreateSolver("CBC")
+        solver_name = "CBC"
+        solver = pywraplp.Solver.CreateSolver(solver_name)
     if not solver:
         return {"status": "NO_SOLVER", "distance": None, "error_indices": None}
-
-    # Upper bounds for slack vars (parity counts)
-    max_pairs = num_errors // 2
+    if solver_name == "SCIP":
+        solver.SetSolverSpecificParametersAsString(SCIP_PARAMETERS)
 
     # Decision variables: x_j ∈ {0,1}, select error mechanisms
     x = [solver.BoolVar(f"x_{j}") for j in range(num_errors)]
 
+    # Upper bounds for slack vars: half the errors touching the detector/logical
+
     # Detector slack vars: y_i ∈ ℤ≥0, enforce even parity (no detector flips)
-    y = [solver.IntVar(0, max_pairs, f"y_det_{i}") for i in range(num_detectors)]
+    y = [
+        solver.IntVar(0, len(det_to_errors[i]) // 2, f"y_det_{i}")
+        for i in range(num_detectors)
+    ]
 
     # Logical slack vars and parity bits
-    s = [solver.IntVar(0, max_pairs, f"s_log_{r}") for r in range(num_observables)]
+    s = [
+        solver.IntVar(0, len(obs_to_errors[r]) // 2, f"s_log_{r}")
+        for r in range(num_observables)
+    ]
     w = [solver.BoolVar(f"w_log_{r}") for r in range(num_observables)]
 
     # Detector parity constraints: sum_j D[i,j] x_j = 2 y_i
@@ -147,6 +165,250 @@ def mip_circuit_distance(
     }
 
 
+class CircuitDistanceSession:
+    """
+    Circuit distance solver that is reused across similar DEMs, e.g., the DEMs of
+    the circuits compared in a schedule search, which have the same detectors and
+    share most of their error mechanisms.
+
+    Error mechanisms are identified by the detectors and observables they flip.
+    The model is built for every DEM from its error mechanisms: with a MIP
+    backend ("SCIP" or "CBC") it is the model of `mip_circuit_distance`, and
+    with "CP-SAT" it has XOR constraints for the parities and is solved by
+    `num_workers` parallel workers.
+
+    Every solve is seeded with the error set found for the previous DEM, restricted
+    to the error mechanisms the new DEM still has. Given a `cutoff`, e.g. the best
+    distance found so far in a search, the solve stops as soon as it finds a
+    logical error with fewer than `cutoff` mechanisms, which proves that the
+    distance is below the cutoff.
+
+    Example:
+        session = CircuitDistanceSession(solver_name="CP-SAT", num_workers=8)
+        for dem in dems:
+            result = session.solve(dem, cutoff=best_distance)
+    """
+
+    def __init__(
+        self,
+        solver_name: str = "SCIP",
+        *,
+        num_workers: int = 8,
+        time_limit: int | None = None,
+        verbose: bool = False,
+    ):
+        """
+        Args:
+            solver_name: "SCIP", "CBC" or "CP-SAT"
+            num_workers: Number of parallel search workers (CP-SAT only)
+            time_limit: Time limit in seconds for every solve
+            verbose: Print the solver logs
+        """
+        self.solver_name = solver_name
+        self.num_workers = num_workers
+        self.time_limit = time_limit
+        self.verbose = verbose
+
+        # Index of the variable of every error mechanism, by (detectors, observables)
+        self._signatures = {}
+        # Error mechanisms of the last solution
+        self._hint = set()
+
+        # Name of the SCIP parameter of the primal limit, "" if there is none
+        self._primal_limit_parameter = None
+        if solver_name != "CP-SAT" and not pywraplp.Solver.CreateSolver(solver_name):
+            raise ValueError(f"Solver {solver_name} is not available")
+
+    def solve(self, dem: stim.DetectorErrorModel, *, cutoff: int | None = None):
+        """
+        Compute the circuit distance of a DEM, as `mip_circuit_distance`.
+
+        Args:
+            dem: Detector error model
+            cutoff: Stop as soon as a logical error with fewer than `cutoff`
+                    error mechanisms is found
+
+        Returns:
+            Dict as returned by `mip_circuit_distance`. If the solve stopped at the
+            cutoff, "status" is "CUTOFF", "distance" is None and "upper_bound" is
+            the size of the logical error found.
+        """
+        err_detectors, err_observables, num_detectors, num_observables = (
+            parse_dem_errors(dem)
+        )
+        if not err_detectors or num_observables == 0:
+            return {"status": None, "distance": None, "error_indices": None}
+
+        # Variable of every error mechanism; duplicated mechanisms share one, since
+        # a minimal logical error never contains both
+        variables = []
+        for dets, obs in zip(err_detectors, err_observables):
+            signature = (tuple(dets), tuple(obs))
+            if signature not in self._signatures:
+                self._signatures[signature] = len(self._signatures)
+            variables.append(self._signatures[signature])
+        active = dict.fromkeys(variables)
+        error_indices_by_variable = {}
+        for j, v in enumerate(variables):
+            error_indices_by_variable.setdefault(v, j)
+        hint = self._hint & active.keys()
+
+        if self.solver_name == "CP-SAT":
+            chosen, status, lower_bound = self._solve_cp_sat(
+                active, num_detectors, num_observables, hint, cutoff
+            )
+        else:
+            chosen, status, lower_bound = self._solve_mip(
+                active, num_detectors, num_observables, hint, cutoff
+            )
+
+        if chosen is None:
+            return {"status": status, "distance": None, "error_indices": None}
+
+        self._hint = set(chosen)
+        error_indices = sorted(error_indices_by_variable[v] for v in chosen)
+        if cutoff is not None and len(chosen) < cutoff and status != "OPTIMAL":
+            return {
+                "status": "CUTOFF",
+                "distance": None,
+                "error_indices": error_indices,
+                "upper_bound": len(chosen),
+                "lower_bound": lower_bound,
+            }
+        return {
+            "status": status,
+            "distance": len(chosen),
+            "error_indices": error_indices,
+            "lower_bound": lower_bound,
+        }
+
+    def _solve_mip(self, active, num_detectors, num_observables, hint, cutoff):
+        signatures = list(self._signatures)
+        solver = pywraplp.Solver.CreateSolver(self.solver_name)
+        x = {j: solver.BoolVar(f"x_{j}") for j in active}
+        det_to_errors = [[] for _ in range(num_detectors)]
+        obs_to_errors = [[] for _ in range(num_observables)]
+        for j in active:
+            dets, obs = signatures[j]
+            for i in dets:
+                det_to_errors[i].append(x[j])
+            for r in obs:
+                obs_to_errors[r].append(x[j])
+
+        # Even parity of every detector, and w_r is the parity of logical r
+        for i, errors in enumerate(det_to_errors):
+            if errors:
+                y = solver.IntVar(0, len(errors) // 2, f"y_det_{i}")
+                solver.Add(sum(errors) == 2 * y)
+        w = [solver.BoolVar(f"w_log_{r}") for r in range(num_observables)]
+        for r, errors in enumerate(obs_to_errors):
+            s = solver.IntVar(0, len(errors) // 2, f"s_log_{r}")
+            solver.Add(sum(errors) == 2 * s + w[r])
+        solver.Add(sum(w) >= 1)
+        solver.Minimize(sum(x.values()))
+
+        if self.verbose:
+            solver.EnableOutput()
+        solver.SetHint(list(x.values()), [1 if j in hint else 0 for j in x])
+        if self.solver_name == "SCIP":
+            self._set_primal_limit(solver, -1e20 if cutoff is None else cutoff - 1)
+        if self.time_limit is not None:
+            solver.SetTimeLimit(self.time_limit * 1000)  # milliseconds
+
+        status = solver.Solve()
+        status_names = {
+            pywraplp.Solver.OPTIMAL: "OPTIMAL",
+            pywraplp.Solver.FEASIBLE: "FEASIBLE",
+            pywraplp.Solver.INFEASIBLE: "INFEASIBLE",
+            pywraplp.Solver.UNBOUNDED: "UNBOUNDED",
+            pywraplp.Solver.ABNORMAL: "ABNORMAL",
+            pywraplp.Solver.NOT_SOLVED: "NOT_SOLVED",
+        }
+        status_str = status_names.get(status, f"UNKNOWN_{status}")
+        if status not in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE]:
+            return None, status_str, None
+
+        chosen = [j for j, var in x.items() if var.solution_value() >= 0.5]
+        return chosen, status_str, solver.Objective().BestBound()
+
+    def _set_primal_limit(self, solver, value):
+        """
+        Stop SCIP once it finds a solution with objective at most `value`, and
+        apply SCIP_PARAMETERS.
+        """
+        if self._primal_limit_parameter == "":
+            solver.SetSolverSpecificParametersAsString(SCIP_PARAMETERS)
+            return
+        names = (
+            SCIP_PRIMAL_LIMIT_PARAMETERS
+            if self._primal_limit_parameter is None
+            else [self._primal_limit_parameter]
+        )
+        # The parameter string replaces the previous one, so it repeats
+        # SCIP_PARAMETERS
+        for name in names:
+            if solver.SetSolverSpecificParametersAsString(
+                f"{SCIP_PARAMETERS}{name} = {value}\n"
+            ):
+                self._primal_limit_parameter = name
+                return
+        # Without the parameter, the solve runs to optimality
+        self._primal_limit_parameter = ""
+        solver.SetSolverSpecificParametersAsString(SCIP_PARAMETERS)
+
+    def _solve_cp_sat(self, active, num_detectors, num_observables, hint, cutoff):
+        signatures = list(self._signatures)
+        model = cp_model.CpModel()
+        x = {j: model.NewBoolVar(f"x_{j}") for j in active}
+        det_to_errors = [[] for _ in range(num_detectors)]
+        obs_to_errors = [[] for _ in range(num_observables)]
+        for j in active:
+            dets, obs = signatures[j]
+            for i in dets:
+                det_to_errors[i].append(x[j])
+            for r in obs:
+                obs_to_errors[r].append(x[j])
+
+        # Even parity of every detector, and w_r is the parity of logical r
+        for errors in det_to_errors:
+            if errors:
+                model.AddBoolXOr(errors + [model.NewConstant(1)])
+        w = [model.NewBoolVar(f"w_log_{r}") for r in range(num_observables)]
+        for r, errors in enumerate(obs_to_errors):
+            model.AddBoolXOr(errors + [w[r].Not()])
+        model.AddBoolOr(w)
+        model.Minimize(sum(x.values()))
+        for j, var in x.items():
+            model.AddHint(var, j in hint)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = self.num_workers
+        solver.parameters.log_search_progress = self.verbose
+        if self.time_limit is not None:
+            solver.parameters.max_time_in_seconds = self.time_limit
+        callback = _CutoffCallback(cutoff) if cutoff is not None else None
+        status = solver.Solve(model, callback)
+
+        status_str = solver.StatusName(status)
+        if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            return None, status_str, None
+
+        chosen = [j for j, var in x.items() if solver.BooleanValue(var)]
+        return chosen, status_str, solver.BestObjectiveBound()
+
+
+class _CutoffCallback(cp_model.CpSolverSolutionCallback):
+    """Stops the CP-SAT search at the first solution below the cutoff."""
+
+    def __init__(self, cutoff: int):
+        super().__init__()
+        self.cutoff = cutoff
+
+    def on_solution_callback(self):
+        if self.ObjectiveValue() < self.cutoff:
+            self.StopSearch()
+
+
 def parse_dem_errors(dem: stim.DetectorErrorModel):
     """
     Extract, for each error mechanism in the DEM:
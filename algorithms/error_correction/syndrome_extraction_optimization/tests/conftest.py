@@ -0,0 +1,10 @@
+"""
+Unit tests of the circuit distance solvers. Run from the repository root with
+
+    python -m pytest algorithms/error_correction/syndrome_extraction_optimization/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
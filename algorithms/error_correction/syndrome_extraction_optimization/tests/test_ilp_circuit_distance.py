@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+import stim
+
+from ilp_circuit_distance import CircuitDistanceSession, mip_circuit_distance
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# d=5 DEMs of bulk schedule combinations of the search, on which SCIP 10 reports
+# OPTIMAL 4 with its default parameters (4, 11, 4) or without strong dual
+# reductions only (4, 3, 2)
+DEMS_D5 = ["dem_d5_4_11_4.dem", "dem_d5_4_3_2.dem"]
+DISTANCE_D5 = 3
+
+
+@pytest.fixture(scope="module", params=DEMS_D5)
+def dem(request):
+    return stim.DetectorErrorModel.from_file(DATA_DIR / request.param)
+
+
+@pytest.mark.parametrize("solver_name", ["SCIP", "CBC"])
+def test_mip_circuit_distance(dem, solver_name):
+    result = mip_circuit_distance(dem, solver_name=solver_name)
+    assert result["status"] == "OPTIMAL"
+    assert result["distance"] == DISTANCE_D5
+
+
+@pytest.mark.parametrize("solver_name", ["SCIP", "CBC", "CP-SAT"])
+def test_session(dem, solver_name):
+    result = CircuitDistanceSession(solver_name, num_workers=1).solve(dem)
+    assert result["status"] == "OPTIMAL"
+    assert result["distance"] == DISTANCE_D5
+
+
+@pytest.mark.parametrize("solver_name", ["SCIP", "CBC", "CP-SAT"])
+def test_session_reused(solver_name):
+    # The third DEM has other detectors and error mechanisms than the d=5 ones
+    dems = [stim.DetectorErrorModel.from_file(DATA_DIR / name) for name in DEMS_D5]
+    dems.append(
+        stim.Circuit.generated(
+            "color_code:memory_xyz",
+            distance=3,
+            rounds=2,
+            after_clifford_depolarization=0.001,
+        ).detector_error_model()
+    )
+    session = CircuitDistanceSession(solver_name, num_workers=1)
+    for dem in dems:
+        result = session.solve(dem)
+        assert result["status"] == "OPTIMAL"
+        assert result["distance"] == mip_circuit_distance(dem)["distance"]
+
+
+def test_session_cutoff(dem):
+    result = CircuitDistanceSession("SCIP").solve(dem, cutoff=DISTANCE_D5 + 1)
+    assert result["distance"] == DISTANCE_D5 or result["upper_bound"] <= DISTANCE_D5
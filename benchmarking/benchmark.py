@@ -1,14 +1,17 @@
 from dataclasses import dataclass, field
 import abc
 
+import pandas as pd
 from classiq import (
     Constraints,
     QuantumProgram,
     ExecutionJob,
-    synthesize,
+    create_model,
     show,
 )
 from errors import StageError
+from synthesis_cache import SYNTHESIS_CACHE
+from tracing import TRACER
 
 
 @dataclass
@@ -41,6 +44,14 @@ class BenchmarkExample(abc.ABC):
         """
         pass
 
+    def shared_job_id(self, rows: list[dict]) -> str | None:
+        """
+        Job of an earlier submission that also executes this example, e.g. the
+        batched job of another trial of the same batch, found among the result
+        rows of the same backend; None if the example has to be submitted.
+        """
+        return None
+
     async def get_job_result(self, job_id: str):
         """
         Helper for concrete benchmarks.
@@ -48,7 +59,8 @@ class BenchmarkExample(abc.ABC):
         """
         try:
             job = ExecutionJob.from_id(job_id)
-            result = await job.result_async()
+            with TRACER.span("result"):
+                result = await job.result_async()
             return job, result
         except Exception as exc:
             raise StageError("retrieve_job", exc) from exc
@@ -62,12 +74,27 @@ class BenchmarkExample(abc.ABC):
         """
         pass
 
+    def ideal_distributions(self) -> list[pd.DataFrame] | None:
+        """
+        Noiseless output distribution of each executed circuit, over all basis
+        states, with one column per output and a "probability" column (like a
+        sampled result dataframe). Used to run the benchmark on a local
+        simulator, see `mock_provider.py`. None if the example has no local
+        model of its circuits.
+        """
+        return None
+
+    def score_distributions(self, dfs: list[pd.DataFrame]) -> dict | None:
+        """
+        Score computed from the sampled result dataframes of the executed
+        circuits, in the order of `ideal_distributions`. None if the example
+        cannot be scored from sampled distributions.
+        """
+        return None
+
     def show(self) -> None:
-        qprog = synthesize(
-            self.main,
-            constraints=self.constraints,
-        )
-        show(qprog)
+        qmod = create_model(self.main, constraints=self.constraints)
+        show(SYNTHESIS_CACHE.synthesize(qmod))
 
     @property
     def default_results_filename(self) -> str:
@@ -2,8 +2,12 @@ from classiq import *
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import outcomes
 
 ADDER_DESCRIPTION = Path("../descriptions/adder.tex").read_text(encoding="utf-8")
 
@@ -35,19 +39,32 @@ class AdderExample(BenchmarkExample):
             job = es.submit_sample()
             return job.id
 
+    def ideal_distributions(self):
+        # Every (x, y) pair; y = x + 2**(n // 2) - 1 (mod 2**n) for uniform x
+        N = 2**self.problem_size
+        x, y = np.divmod(np.arange(N * N), N)
+        target = (x + 2 ** (self.problem_size // 2) - 1) % N
+        return [
+            pd.DataFrame(
+                {"x": x, "y": y, "probability": np.where(y == target, 1 / N, 0.0)}
+            )
+        ]
+
+    def score_distributions(self, dfs):
+        x, probs = outcomes(dfs[0], "x")
+        y, _ = outcomes(dfs[0], "y")
+        mask = (x + 2 ** (self.problem_size // 2) - 1 - y) % 2**self.problem_size == 0
+
+        return {"score": float(probs[mask].sum())}
+
     async def score(self, job_id):
         job = ExecutionJob.from_id(job_id)
         result = await job.result_async()
-        df = result[0].value.dataframe
-
-        mask = (
-            (df["x"] + 2 ** (self.problem_size // 2) - 1 - df["y"])
-            % 2**self.problem_size
-        ) == 0
+        scores = self.score_distributions([result[0].value.dataframe])
 
         exec_minutes = (job.end_time - job.start_time).total_seconds() / 60.0
 
         return {
-            "score": df.loc[mask, "probability"].sum(),
+            **scores,
             "execution_time": exec_minutes,
         }
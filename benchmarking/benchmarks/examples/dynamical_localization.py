@@ -5,6 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import outcomes, probability_of
 
 LOCALIZATION_DESCRIPTION = Path("../descriptions/dynamical_localization.tex").read_text(
     encoding="utf-8"
@@ -47,8 +48,7 @@ class QSMExample(BenchmarkExample):
         df_t_3 = result[0].value.details[1].dataframe
 
         def get_peak_prob(df):
-            match = df.loc[df["p"] == -2, "probability"]
-            return 0.0 if match.empty else float(match.iloc[0])
+            return probability_of(*outcomes(df, "p"), -2)
 
         def normalize_peak(p):
             N = 2**self.problem_size
@@ -3,23 +3,26 @@ import sys
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import (
+    outcomes,
+    parity_expectation,
+    parity_expectation_batch,
+    probability_of,
+)
 
 GHZ_DESCRIPTION = Path("../descriptions/ghz.tex").read_text(encoding="utf-8")
 
 
 def parity_from_df(df):
-    signs = 1 - 2 * df["x"].apply(lambda x: int(x).bit_count() % 2)
-    return (df["probability"] * signs).sum()
+    return parity_expectation(*outcomes(df))
 
 
 def population_from_df(df, n_qubits):
-    return df.loc[
-        (df["x"] == 0) | (df["x"] == 2**n_qubits - 1),
-        "probability",
-    ].sum()
+    return probability_of(*outcomes(df), [0, 2**n_qubits - 1])
 
 
 def fit_coherence(phases, parities, n_qubits):
@@ -43,6 +46,19 @@ def fit_coherence(phases, parities, n_qubits):
     return C, {"a": float(a), "b": float(b), "offset": float(c)}
 
 
+def rotated_ghz_probabilities(n_qubits, theta, phi):
+    """
+    Output distribution of the n-qubit GHZ state after R(theta, phi) on every qubit.
+    """
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    r = np.array([[c, -1j * np.exp(-1j * phi) * s], [-1j * np.exp(1j * phi) * s, c]])
+    state = np.zeros((2,) * n_qubits, dtype=complex)
+    state[(0,) * n_qubits] = state[(1,) * n_qubits] = 1 / np.sqrt(2)
+    for axis in range(n_qubits):
+        state = np.moveaxis(np.tensordot(r, state, axes=(1, axis)), 0, axis)
+    return np.abs(state.reshape(-1)) ** 2
+
+
 class GHZExample(BenchmarkExample):
     """
     Currently, this example is defined with problem_size=3, and 6 different samples of \phi for
@@ -66,29 +82,54 @@ class GHZExample(BenchmarkExample):
 
         return main
 
+    def execution_angles(self) -> list[tuple[float, float]]:
+        """
+        (theta, phi) of each executed circuit: the population circuit, then one
+        parity circuit per phase.
+        """
+        return [(0, np.pi)] + [(-np.pi / 2, p) for p in self.phis]
+
     async def submit(self, qprog: QuantumProgram) -> str:
         with ExecutionSession(qprog) as es:
             job = es.submit_batch_sample(
-                [{"theta": 0, "phi": np.pi}]
-                + [{"theta": -np.pi / 2, "phi": p} for p in self.phis]
+                [{"theta": theta, "phi": phi} for theta, phi in self.execution_angles()]
             )
             return job.id
 
-    async def score(self, job_id):
-        job = ExecutionJob.from_id(job_id)
-        result = await job.result_async()
-
-        P = population_from_df(result[0].value.details[0].dataframe, self.problem_size)
-        parities = [
-            parity_from_df(res.dataframe) for res in result[0].value.details[1:]
+    def ideal_distributions(self):
+        x = np.arange(2**self.problem_size)
+        return [
+            pd.DataFrame(
+                {
+                    "x": x,
+                    "probability": rotated_ghz_probabilities(
+                        self.problem_size, theta, phi
+                    ),
+                }
+            )
+            for theta, phi in self.execution_angles()
         ]
 
+    def score_distributions(self, dfs):
+        P = population_from_df(dfs[0], self.problem_size)
+        parities = parity_expectation_batch([outcomes(df) for df in dfs[1:]])
+
         C, fit_info = fit_coherence(self.phis, parities, self.problem_size)
         F = min(1.0, max(0.0, 0.5 * (P + C)))
 
+        return {"score": F}
+
+    async def score(self, job_id):
+        job = ExecutionJob.from_id(job_id)
+        result = await job.result_async()
+
+        scores = self.score_distributions(
+            [res.dataframe for res in result[0].value.details]
+        )
+
         exec_minutes = (job.end_time - job.start_time).total_seconds() / 60.0
 
         return {
-            "score": F,
+            **scores,
             "execution_time": exec_minutes,
         }
@@ -6,6 +6,7 @@ import numpy as np
 
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import outcomes, probability_of
 
 GROVER_DESCRIPTION = Path("../descriptions/grover.tex").read_text(encoding="utf-8")
 
@@ -64,7 +65,7 @@ class GroverExample(BenchmarkExample):
         result = await job.result_async()
         df = result[0].value.dataframe
 
-        marked_prob_sum = df.loc[df["x"] == MARKED_STATE, "probability"].sum()
+        marked_prob_sum = probability_of(*outcomes(df), MARKED_STATE)
         print(f"marked_prob_sum: {marked_prob_sum}")
 
         _, P_success = num_grover_iterations(self.problem_size)
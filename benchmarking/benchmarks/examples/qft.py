@@ -3,9 +3,11 @@ import sys
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import normalized_tvd_score, outcomes, total_variation_distance
 
 QFT_DESCRIPTION = Path("../descriptions/qft.tex").read_text(encoding="utf-8")
 
@@ -39,29 +41,32 @@ class QFTExample(BenchmarkExample):
             job = es.submit_sample()
             return job.id
 
-    async def score(self, job_id):
-        job = ExecutionJob.from_id(job_id)
-        result = await job.result_async()
-        df = result[0].value.dataframe
-
-        n = self.problem_size
-        N = 2**n
+    def ideal_support(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The QFT of the comb: 2**m equally likely peaks, 2**(n - m) apart.
+        """
+        step = 2 ** (self.problem_size - self.m)
+        states = np.arange(0, 2**self.problem_size, step)
+        return states, np.full(len(states), 1.0 / len(states))
 
-        p = np.zeros(N)
-        p[df["x"]] = df["probability"].to_numpy()
+    def ideal_distributions(self):
+        u = np.zeros(2**self.problem_size)
+        states, probs = self.ideal_support()
+        u[states] = probs
+        return [pd.DataFrame({"x": np.arange(len(u)), "probability": u})]
 
-        u = np.zeros(N)
-        if self.m == 0:
-            u[0] = 1.0
-        else:
-            step = 2 ** (n - self.m)
-            u[np.arange(0, N, step)] = 1.0 / (2**self.m)
+    def score_distributions(self, dfs):
+        tvd = total_variation_distance(*outcomes(dfs[0]), *self.ideal_support())
+        return {"score": normalized_tvd_score(tvd, self.problem_size)}
 
-        score = 1.0 - 0.5 * np.abs(p - u).sum() / (1.0 - 1.0 / n)
+    async def score(self, job_id):
+        job = ExecutionJob.from_id(job_id)
+        result = await job.result_async()
+        scores = self.score_distributions([result[0].value.dataframe])
 
         exec_minutes = (job.end_time - job.start_time).total_seconds() / 60.0
 
         return {
-            "score": float(score),
+            **scores,
             "execution_time": exec_minutes,
         }
@@ -6,17 +6,22 @@ import numpy as np
 
 sys.path.insert(0, "..")
 from benchmark import BenchmarkExample
+from scoring import normalized_tvd_score, outcomes, total_variation_distance_to
 
 SP_DESCRIPTION = Path("../descriptions/state_preparation.tex").read_text(
     encoding="utf-8"
 )
 
 
-def linear_amplitudes_probabilities(n):
+def linear_amplitudes_probability(states, n):
+    """
+    Probability of each state in the linear-amplitude state, without building
+    the 2^n probability vector.
+    """
     N = 2**n
-    amps = np.arange(N)
-    amps = amps / np.linalg.norm(amps)
-    return np.abs(amps) ** 2
+    norm = (N - 1) * N * (2 * N - 1) / 6  # sum of x^2 for x < N
+    states = np.asarray(states)
+    return np.where((states >= 0) & (states < N), states.astype(float) ** 2 / norm, 0.0)
 
 
 class SPExample(BenchmarkExample):
@@ -47,14 +52,11 @@ class SPExample(BenchmarkExample):
         df = result[0].value.dataframe
 
         n = self.problem_size
-        N = 2**n
 
-        p = np.zeros(N)
-        p[df["x"]] = df["probability"].to_numpy()
-
-        u = linear_amplitudes_probabilities(self.problem_size)
-        d_tv = 0.5 * np.sum(np.abs(p - u))
-        score = 1.0 - d_tv / (1.0 - 1.0 / n)
+        d_tv = total_variation_distance_to(
+            *outcomes(df), lambda states: linear_amplitudes_probability(states, n)
+        )
+        score = normalized_tvd_score(d_tv, n)
 
         exec_minutes = (job.end_time - job.start_time).total_seconds() / 60.0
 
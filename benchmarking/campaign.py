@@ -0,0 +1,275 @@
+"""
+Campaign runner: runs a sweep of (example, width, trial, backend) tasks in
+several worker processes that share the result files.
+
+    python campaign.py campaign.json --workers 4 --cpu-workers 2
+
+Each worker runs its shard of the tasks in its own event loop, with its own
+collectors and scheduler; result files and the submission ledger are shared
+through inter-process locks (see `storage.interprocess_lock`), so the
+submission budget of the data directory holds across workers. With
+`--cpu-workers`, every worker also moves CPU-bound stages to a process pool
+(see `cpu_pool.py`). Tasks skipped for a full submission budget, or still
+running, are retried every `--retry-interval` seconds until all are done;
+interrupted campaigns resume when started again.
+
+The campaign is described by a JSON file; relative paths are resolved
+against its directory:
+
+    {
+      "data_dir": "data/sweep",
+      "results_suffix": ".sqlite",
+      "max_submitted_jobs_in_dir": 3,
+      "max_concurrency": 8,
+      "poll_interval": 5.0,
+      "runners": [
+        {"backend_service_provider": "Classiq", "backend_name": "simulator",
+         "max_timeout": 3600, "num_shots": 1000},
+        {"mock": true, "job_failure_rate": 0.01}
+      ],
+      "examples": [
+        {"example": "ghz:GHZExample", "widths": [3, 4]},
+        {"example": "qft:QFTExample", "widths": [4, 5], "kwargs": {"m": 2}},
+        {"example": "qv_example:QVExample", "name": "qv_", "widths": [2, 3],
+         "trials": 100, "base_seed": 1}
+      ]
+    }
+
+Examples are given as "module:Class" from `benchmarks/examples` or
+`protocols`, and are built with `problem_size=<width>` and `kwargs`; with
+`trials`, also with `trial_id` and a seed as in the Quantum Volume protocol.
+Each example entry and width gets the result file
+`<data_dir>/<name><width><results_suffix>`, where `name` defaults to the
+module name. Runners with `"mock": true` are `MockRunner`s, whose latencies
+are given in seconds or as distributions like `{"lognormal": [30, 1.0]}`;
+the others are `HardwareRunner`s.
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+BENCHMARKING_DIR = Path(__file__).resolve().parent
+BENCHMARKS_DIR = BENCHMARKING_DIR / "benchmarks"
+for path in [
+    BENCHMARKING_DIR,
+    BENCHMARKS_DIR / "examples",
+    BENCHMARKING_DIR / "protocols",
+]:
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from collector import ResultCollector, ReportWorker
+from cpu_pool import set_cpu_workers
+from hardware import HardwareRunner
+import mock_provider
+from mock_provider import MockRunner
+from poller import JobPoller
+from scheduler import ExecutionScheduler
+from storage import status_counts_in_dir
+
+# (example entry index, width or None, trial id or None, runner index)
+Task = tuple[int, int | None, int | None, int]
+
+
+def load_spec(filename: str | Path) -> dict:
+    filename = Path(filename).resolve()
+    spec = json.loads(filename.read_text(encoding="utf-8"))
+    spec["data_dir"] = str(filename.parent / spec.get("data_dir", "data"))
+    spec.setdefault("results_suffix", ".sqlite")
+    spec.setdefault("max_submitted_jobs_in_dir", 3)
+    spec.setdefault("max_concurrency", 8)
+    spec.setdefault("poll_interval", 5.0)
+    return spec
+
+
+def expand_tasks(spec: dict) -> list[Task]:
+    tasks = []
+    for entry_id, entry in enumerate(spec["examples"]):
+        for width in entry.get("widths", [None]):
+            for trial in range(entry["trials"]) if "trials" in entry else [None]:
+                for runner_id in range(len(spec["runners"])):
+                    tasks.append((entry_id, width, trial, runner_id))
+    return tasks
+
+
+def make_example(spec: dict, entry_id: int, width: int | None, trial: int | None):
+    entry = spec["examples"][entry_id]
+    module_name, class_name = entry["example"].split(":")
+    cls = getattr(importlib.import_module(module_name), class_name)
+
+    kwargs = dict(entry.get("kwargs", {}))
+    if width is not None:
+        kwargs["problem_size"] = width
+    if trial is not None:
+        kwargs["trial_id"] = trial
+        kwargs["seed"] = entry.get("base_seed", 0) + 100_000 * (width or 0) + trial
+    return cls(**kwargs)
+
+
+def results_filename(spec: dict, entry_id: int, width: int | None) -> str:
+    entry = spec["examples"][entry_id]
+    name = entry.get("name", entry["example"].split(":")[0])
+    suffix = "" if width is None else str(width)
+    return str(Path(spec["data_dir"]) / f"{name}{suffix}{spec['results_suffix']}")
+
+
+def make_runner(spec: dict, runner_id: int, shard: int) -> HardwareRunner:
+    kwargs = dict(spec["runners"][runner_id])
+    if not kwargs.pop("mock", False):
+        return HardwareRunner(**kwargs)
+    # Latencies are seconds, or e.g. {"lognormal": [median, sigma]}
+    for key in ["job_latency", "submit_latency"]:
+        value = kwargs.get(key)
+        if isinstance(value, (int, float)):
+            kwargs[key] = mock_provider.fixed(value)
+        elif isinstance(value, dict):
+            ((name, params),) = value.items()
+            params = params if isinstance(params, list) else [params]
+            kwargs[key] = getattr(mock_provider, name)(*params)
+    # Distinct mock job ids in every worker
+    if kwargs.get("seed") is not None:
+        kwargs["seed"] += shard
+    return MockRunner(**kwargs)
+
+
+async def _run_tasks(
+    spec: dict, tasks: list[Task], shard: int, retry_interval: float
+) -> Counter:
+    scheduler = ExecutionScheduler(max_concurrency=spec["max_concurrency"])
+    poller = JobPoller(min_interval=spec["poll_interval"])
+    runners = {}
+    examples = {}
+    collectors = {}
+
+    for entry_id, width, trial, runner_id in tasks:
+        if runner_id not in runners:
+            runners[runner_id] = make_runner(spec, runner_id, shard)
+        if (entry_id, width, trial) not in examples:
+            examples[entry_id, width, trial] = make_example(
+                spec, entry_id, width, trial
+            )
+        filename = results_filename(spec, entry_id, width)
+        if filename not in collectors:
+            collectors[filename] = ResultCollector(
+                filename,
+                skip_report=True,
+                data_dir=spec["data_dir"],
+                max_submitted_jobs_in_dir=spec["max_submitted_jobs_in_dir"],
+                scheduler=scheduler,
+                poller=poller,
+            )
+
+    statuses = Counter()
+    while True:
+        results = await asyncio.gather(
+            *(
+                collectors[results_filename(spec, entry_id, width)].run(
+                    runners[runner_id], examples[entry_id, width, trial]
+                )
+                for entry_id, width, trial, runner_id in tasks
+            )
+        )
+        statuses.update(r.get("status") for r in results if r is not None)
+
+        # Tasks skipped for a full submission budget or still running
+        tasks = [task for task, result in zip(tasks, results) if result is None]
+        if not tasks or retry_interval <= 0:
+            break
+        await asyncio.sleep(retry_interval)
+
+    statuses["PENDING"] += len(tasks)
+    return +statuses
+
+
+def run_shard(
+    spec: dict,
+    tasks: list[Task],
+    shard: int,
+    cpu_workers: int = 0,
+    retry_interval: float = 0.0,
+) -> Counter:
+    """Run one worker's tasks; the entry point of the worker processes."""
+    # The examples read their descriptions relative to the benchmarks directory
+    os.chdir(BENCHMARKS_DIR)
+    set_cpu_workers(cpu_workers)
+    try:
+        return asyncio.run(_run_tasks(spec, tasks, shard, retry_interval))
+    finally:
+        set_cpu_workers(None)
+
+
+async def write_report(spec: dict, tasks: list[Task], root: str) -> None:
+    """Write the report sections of all campaign results."""
+    worker = ReportWorker(root=root, debounce=0.0)
+    for entry_id, width, trial in sorted({task[:3] for task in tasks}, key=str):
+        worker.mark_dirty(
+            results_filename(spec, entry_id, width),
+            make_example(spec, entry_id, width, trial),
+        )
+    await worker.flush()
+
+
+def main(argv: list[str] | None = None) -> Counter:
+    parser = argparse.ArgumentParser(
+        description="Run a benchmark campaign in several worker processes."
+    )
+    parser.add_argument("spec", help="campaign JSON file")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=0,
+        help="processes per worker for CPU-bound stages (0 runs them inline)",
+    )
+    parser.add_argument(
+        "--retry-interval",
+        type=float,
+        default=0.0,
+        help="seconds between passes over pending tasks (0 runs a single pass)",
+    )
+    parser.add_argument(
+        "--report-root", help="also write the report sections to this directory"
+    )
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    tasks = expand_tasks(spec)
+    num_workers = max(1, min(args.workers, len(tasks)))
+    # Interleaved shards, so every worker gets a mix of backends and widths
+    shards = [tasks[i::num_workers] for i in range(num_workers)]
+    print(f"Running {len(tasks)} tasks in {num_workers} worker processes")
+
+    totals = Counter()
+    with ProcessPoolExecutor(num_workers) as pool:
+        futures = [
+            pool.submit(
+                run_shard, spec, shard, i, args.cpu_workers, args.retry_interval
+            )
+            for i, shard in enumerate(shards)
+        ]
+        for future in as_completed(futures):
+            totals.update(future.result())
+
+    print(f"Task results: {dict(totals)}")
+    print(f"Rows in {spec['data_dir']}: {status_counts_in_dir(spec['data_dir'])}")
+
+    if args.report_root:
+        report_root = str(Path(args.report_root).resolve())
+        os.chdir(BENCHMARKS_DIR)
+        asyncio.run(write_report(spec, tasks, report_root))
+
+    return totals
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+from pathlib import Path
+
+import hashlib
+import json
+import os
+import re
+
+from classiq import QuantumProgram
+
+# Instructions that do not count towards the circuit depth (as in Qiskit's
+# `depth(filter_function=...)`), but still synchronize the bits they touch
+NON_GATE_INSTRUCTIONS = frozenset({"measure", "barrier", "reset"})
+
+_DECLARATIONS = frozenset({"OPENQASM", "include", "qreg", "creg", "qubit", "bit"})
+
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_DEFINITION = re.compile(r"\b(?:gate|opaque)\b[^;{]*(?:\{[^}]*\}|;)", re.S)
+_QASM2_REGISTER = re.compile(r"^(qreg|creg)\s+(\w+)\s*\[\s*(\d+)\s*\]$")
+_QASM3_REGISTER = re.compile(r"^(qubit|bit)\s*(?:\[\s*(\d+)\s*\])?\s+(\w+)$")
+_CONDITION = re.compile(r"^if\s*\(\s*(\w+)[^)]*\)\s*")
+# OpenQASM 3 gate modifiers, e.g. "ctrl @", "negctrl(2) @", "inv @", "pow(1/2) @"
+_MODIFIERS = re.compile(
+    r"^(?:(?:ctrl|negctrl|inv|pow)\s*(?:\((?:[^()]|\([^()]*\))*\))?\s*@\s*)+"
+)
+_INSTRUCTION_NAME = re.compile(r"^(\w+)\s*")
+_OPERAND = re.compile(r"(\w+)\s*(?:\[\s*(\d+)\s*\])?")
+
+# Metrics by SHA-256 of the circuit code, shared by all runs of the same program;
+# also stored in METRICS_CACHE_DIR, so resumed runs do not parse circuits again
+METRICS_CACHE_DIR = Path(__file__).resolve().parent / ".metrics_cache"
+_METRICS_BY_HASH: dict[str, dict] = {}
+# Part of the cache key, to be bumped whenever the metrics of a circuit change
+_METRICS_VERSION = 2
+
+
+def _split_instruction(statement: str) -> tuple[str, str] | None:
+    """
+    Name and operands of an instruction, skipping its gate modifiers and its
+    parameters, which may contain nested parentheses, e.g.
+    "u3(pi*(1/2),0,pi) q[0]". A modified gate is counted by the name of the
+    gate, e.g. "ctrl @ x q[0], q[1]" as a two-qubit "x".
+    """
+    statement = _MODIFIERS.sub("", statement)
+    match = _INSTRUCTION_NAME.match(statement)
+    if match is None:
+        return None
+    rest = statement[match.end() :]
+    if rest.startswith("("):
+        level = 0
+        for end, char in enumerate(rest):
+            if char == "(":
+                level += 1
+            elif char == ")":
+                level -= 1
+                if level == 0:
+                    break
+        rest = rest[end + 1 :]
+    return match.group(1), rest.strip()
+
+
+def _expand(operands: str, registers: dict[str, int]) -> list[list[tuple[str, int]]]:
+    """
+    Bits of each operand; a whole register stands for all of its bits.
+    """
+    expanded = []
+    for name, index in _OPERAND.findall(operands):
+        if index:
+            expanded.append([(name, int(index))])
+        else:
+            expanded.append([(name, i) for i in range(registers.get(name, 1))])
+    return expanded
+
+
+def _broadcast(operands: list[list[tuple[str, int]]]) -> list[list[tuple[str, int]]]:
+    """
+    Split a gate applied to whole registers into one application per bit.
+    """
+    size = max(len(bits) for bits in operands)
+    return [
+        [bits[i] if len(bits) > 1 else bits[0] for bits in operands]
+        for i in range(size)
+    ]
+
+
+def _compute_qasm_metrics(qasm: str) -> dict:
+    code = _DEFINITION.sub("", _COMMENT.sub("", qasm))
+
+    registers: dict[str, int] = {}
+    depth: dict[tuple[str, int], int] = {}  # per qubit and classical bit
+    depth_2q: dict[tuple[str, int], int] = {}
+    used_qubits: set[tuple[str, int]] = set()
+    gate_counts: dict[str, int] = {}
+    two_qubit_gate_count = 0
+
+    for statement in code.split(";"):
+        statement = statement.strip()
+        if not statement:
+            continue
+
+        match = _QASM2_REGISTER.match(statement)
+        if match:
+            registers[match.group(2)] = int(match.group(3))
+            continue
+        match = _QASM3_REGISTER.match(statement)
+        if match:
+            registers[match.group(3)] = int(match.group(2) or 1)
+            continue
+
+        condition_bits: list[tuple[str, int]] = []
+        match = _CONDITION.match(statement)
+        if match:
+            condition_bits = _expand(match.group(1), registers)[0]
+            statement = statement[match.end() :]
+
+        # "measure q -> c" (OpenQASM 2) or "c = measure q" (OpenQASM 3)
+        clbit_operands = ""
+        if "->" in statement:
+            statement, clbit_operands = statement.split("->", 1)
+        elif "=" in statement and "measure" in statement:
+            clbit_operands, statement = statement.split("=", 1)
+            statement = statement.strip()
+
+        instruction = _split_instruction(statement)
+        if instruction is None or instruction[0] in _DECLARATIONS:
+            continue
+        name, operands = instruction
+        qubit_operands = _expand(operands, registers)
+        if not qubit_operands:
+            continue
+        applications = _broadcast(qubit_operands)
+        clbit_operands = _expand(clbit_operands, registers)
+        clbit_applications = (
+            _broadcast(clbit_operands) if clbit_operands else [[]] * len(applications)
+        )
+
+        for qubits, clbits in zip(applications, clbit_applications):
+            bits = qubits + clbits + condition_bits
+            num_qubits = len(qubits)
+            used_qubits.update(qubits)
+            gate_counts[name] = gate_counts.get(name, 0) + 1
+
+            is_gate = name not in NON_GATE_INSTRUCTIONS
+            level = max(depth.get(bit, 0) for bit in bits) + is_gate
+            for bit in bits:
+                depth[bit] = level
+
+            if is_gate and num_qubits >= 2:
+                if num_qubits == 2:
+                    two_qubit_gate_count += 1
+                level_2q = max(depth_2q.get(qubit, 0) for qubit in qubits) + 1
+                for qubit in qubits:
+                    depth_2q[qubit] = level_2q
+
+    return {
+        "circuit_depth": max(depth.values(), default=0),
+        "circuit_width": len(used_qubits),
+        "two_qubit_gate_count": two_qubit_gate_count,
+        "two_qubit_depth": max(depth_2q.values(), default=0),
+        "gate_counts": gate_counts,
+    }
+
+
+def _load_metrics(key: str) -> dict | None:
+    if key in _METRICS_BY_HASH:
+        return _METRICS_BY_HASH[key]
+    try:
+        metrics = json.loads((METRICS_CACHE_DIR / f"{key}.json").read_text())
+    except (OSError, ValueError):
+        # Missing, or corrupt: compute the metrics again
+        return None
+    _METRICS_BY_HASH[key] = metrics
+    return metrics
+
+
+def _store_metrics(key: str, metrics: dict) -> None:
+    _METRICS_BY_HASH[key] = metrics
+    try:
+        METRICS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = METRICS_CACHE_DIR / f"{key}.json"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(metrics))
+        os.replace(tmp, path)
+    except OSError:
+        # The disk cache is an optimization only
+        pass
+
+
+def qasm_metrics(qasm: str) -> dict:
+    """
+    Depth, width, two-qubit gate count, two-qubit depth and per-gate counts
+    of an OpenQASM 2/3 circuit, computed in a single pass over its
+    instructions. Results are memoized by the hash of the code, in memory
+    and in METRICS_CACHE_DIR.
+    """
+    key = hashlib.sha256(f"{_METRICS_VERSION}\n{qasm}".encode("utf-8")).hexdigest()
+    metrics = _load_metrics(key)
+    if metrics is None:
+        metrics = _compute_qasm_metrics(qasm)
+        _store_metrics(key, metrics)
+    return metrics
+
+
+def program_qasm(qprog: QuantumProgram) -> str | None:
+    """
+    OpenQASM code of the transpiled circuit of a synthesized program, if
+    available.
+    """
+    try:
+        return (qprog.transpiled_circuit or qprog).qasm
+    except Exception:
+        return None
+
+
+def program_metrics_columns(qasm: str | None) -> dict:
+    """
+    `metrics_columns` of the circuit of a synthesized program, given by
+    `program_qasm`; empty if the circuit is not available.
+    """
+    if qasm is None:
+        return {}
+    try:
+        return metrics_columns([qasm_metrics(qasm)])
+    except Exception:
+        # Metrics are informative only and must not fail a submitted job
+        return {}
+
+
+def metrics_columns(metrics: list[dict]) -> dict:
+    """
+    Result columns for the metrics of the circuits of one job. The standard
+    columns describe the first circuit; jobs with several circuits (batched
+    executions) also store the metrics of every circuit as JSON.
+    """
+    if not metrics:
+        return {}
+    columns = {**metrics[0], "gate_counts": json.dumps(metrics[0]["gate_counts"])}
+    if len(metrics) > 1:
+        columns["num_circuits"] = len(metrics)
+        columns["circuit_metrics"] = json.dumps(metrics)
+    return columns
+
+
+def qasm_metrics_columns(qasms: list[str]) -> dict:
+    """
+    `metrics_columns` of the circuits of one job, given as OpenQASM code.
+    """
+    return metrics_columns([qasm_metrics(qasm) for qasm in qasms])
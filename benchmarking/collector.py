@@ -2,6 +2,7 @@ from dataclasses import dataclass
 
 import datetime
 import asyncio
+import time
 import traceback
 
 from reporting import *
@@ -10,25 +11,261 @@ from pathlib import Path
 from benchmark import BenchmarkExample
 from hardware import HardwareRunner
 from errors import StageError, RESULT_TIMEOUT
+from scheduler import ExecutionScheduler, backend_key
+from poller import JobPoller
 from storage import (
-    load_results,
+    RESULT_CACHE,
+    ResultStore,
     make_df_for_example,
+    result_key,
     section_name,
-    dump_results,
     section_title,
-    count_submitted_jobs_in_dir,
+    count_submitted_jobs_in_dir_async,
+    interprocess_lock_async,
+    submission_ledger,
 )
+from tracing import TRACER
 
 #
 # Locks
 #
-EXECUTION_SEMAPHORE = asyncio.Semaphore(8)
+# Shared by all collectors that are not given their own scheduler
+DEFAULT_SCHEDULER = ExecutionScheduler(max_concurrency=8)
+# Shared by all collectors that are not given their own poller
+DEFAULT_POLLER = JobPoller()
 FILE_LOCK = asyncio.Lock()
 REPORT_LOCK = asyncio.Lock()
 
 SUBMISSION_LOCK = asyncio.Lock()
 
 
+@dataclass
+class _ReportSection:
+    filename: str
+    example_name: str
+    problem_size: int
+    family_title: str
+    family_description: str
+    instance_title: str
+
+
+def _write_report_section(
+    section: _ReportSection, all_results: list[dict], root: str
+) -> None:
+    df = make_df_for_example(all_results, section.example_name, section.problem_size)
+
+    # set num_shots for subtitle
+    matching_results = [
+        r
+        for r in all_results
+        if r.get("example") == section.example_name
+        and r.get("problem_size") == section.problem_size
+    ]
+
+    shots_values = sorted(
+        {r.get("num_shots") for r in matching_results if r.get("num_shots") is not None}
+    )
+
+    title = section.instance_title
+    if len(shots_values) == 1:
+        title += f" ({shots_values[0]} shots)"
+
+    add_text_block(
+        name=f"10_{section.example_name}",
+        title=section.family_title,
+        text=section.family_description,
+        root=root,
+        level="section",
+    )
+
+    add_section(
+        name=f"10_{section.example_name}_{section.problem_size:03d}",
+        title=title,
+        df=df,
+        numeric_cols={
+            "Score",
+            "Time Elapsed (min)",
+            "Width",
+            "Depth",
+            "2Q Gate Count",
+        },
+        root=root,
+        level="subsection",
+    )
+
+
+@dataclass
+class ReportWorker:
+    """
+    Regenerates report sections in the background.
+
+    Collectors only mark an (example, problem size) section as dirty. The
+    first section marked while the worker is idle opens a window of
+    `debounce` seconds; the sections marked until it closes are written
+    together with the include file. `latexmk` runs at most once every
+    `min_build_interval` seconds when a build was requested. Builds are
+    incremental and are skipped when no report input changed. Failed updates
+    are retried up to `max_attempts` times; after that the sections stay dirty
+    until the next update.
+    """
+
+    root: str = "../report"
+    debounce: float = 2.0
+    min_build_interval: float = 60.0
+    precompile_preamble: bool = False
+    max_attempts: int = 3
+
+    def __post_init__(self):
+        self._dirty: dict[str, _ReportSection] = {}
+        self._build_requested = False
+        self._last_build: float | None = None
+        self._failures = 0
+        # Events and task of the event loop the worker runs in. Workers are
+        # shared by module, so they are recreated when another loop (e.g. a
+        # later asyncio.run) uses the worker.
+        self._bound_loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._idle: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._bound_loop is loop:
+            return
+        self._bound_loop = loop
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = None
+        # Updates left over by a loop that stopped are made in this one
+        if self._dirty or self._build_requested:
+            self._wake()
+
+    def _wake(self) -> None:
+        self._idle.clear()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = self._bound_loop.create_task(self._loop())
+
+    def mark_dirty(
+        self, filename: str, example: BenchmarkExample, build: bool = False
+    ) -> None:
+        section = _ReportSection(
+            filename=filename,
+            example_name=example.name,
+            problem_size=example.problem_size,
+            family_title=example.report_family_title,
+            family_description=example.report_family_description,
+            instance_title=example.report_instance_title,
+        )
+        self._dirty[f"{example.name}_{example.problem_size:03d}"] = section
+        self._build_requested = self._build_requested or build
+        self._failures = 0
+        self._bind_loop()
+        self._wake()
+
+    async def flush(self) -> None:
+        """
+        Wait until all pending sections are written and requested builds are
+        done, or until the worker gave up after `max_attempts` failures.
+        """
+        self._bind_loop()
+        await self._idle.wait()
+
+    async def _loop(self) -> None:
+        TRACER.begin_run("report")
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            self._wakeup.clear()
+
+            try:
+                await self._write_dirty_sections()
+
+                if self._build_requested:
+                    delay = 0.0
+                    if self._last_build is not None:
+                        delay = self._last_build + self.min_build_interval
+                        delay -= time.monotonic()
+                    if delay > 0:
+                        # Sections arriving meanwhile are written before the build
+                        self._wakeup.set()
+                        await asyncio.sleep(delay)
+                        continue
+
+                    await self._build()
+                self._failures = 0
+            except Exception as exc:
+                print(f"Report update failed: {type(exc).__name__}: {exc}")
+                self._failures += 1
+                if self._failures < self.max_attempts:
+                    self._wakeup.set()
+                    continue
+
+            if self._failures or (not self._dirty and not self._build_requested):
+                self._idle.set()
+
+    async def _build(self) -> None:
+        # Cleared before the build, so a build requested meanwhile runs again
+        self._build_requested = False
+        self._last_build = time.monotonic()
+        try:
+            async with TRACER.locked(REPORT_LOCK, "report_lock"):
+                with TRACER.span("build_report"):
+                    built = await asyncio.to_thread(
+                        build_report,
+                        self.root,
+                        False,
+                        self.precompile_preamble,
+                    )
+        except BaseException:
+            self._build_requested = True
+            raise
+        if built:
+            print(f"** Report updated: {self.root}")
+
+    async def _write_dirty_sections(self) -> None:
+        if not self._dirty:
+            return
+
+        dirty, self._dirty = self._dirty, {}
+        try:
+            async with TRACER.locked(REPORT_LOCK, "report_lock"):
+                async with TRACER.locked(FILE_LOCK, "file_lock"):
+                    results_by_section = {
+                        name: RESULT_CACHE.rows(
+                            section.filename,
+                            filters=[
+                                ("example", "==", section.example_name),
+                                ("problem_size", "==", section.problem_size),
+                            ],
+                        )
+                        for name, section in dirty.items()
+                    }
+
+                with TRACER.span("write_sections", num_sections=len(dirty)):
+                    for name, section in dirty.items():
+                        _write_report_section(
+                            section, results_by_section[name], self.root
+                        )
+                    write_includes(root=self.root)
+        except BaseException:
+            # Sections marked meanwhile are newer
+            self._dirty = {**dirty, **self._dirty}
+            raise
+
+
+# One worker per report root, shared by all collectors writing to it
+_REPORT_WORKERS: dict[str, ReportWorker] = {}
+
+
+def report_worker_for(root: str) -> ReportWorker:
+    key = str(Path(root).resolve())
+    if key not in _REPORT_WORKERS:
+        _REPORT_WORKERS[key] = ReportWorker(root=root)
+    return _REPORT_WORKERS[key]
+
+
 @dataclass
 class ResultCollector:
     filename: str
@@ -40,6 +277,9 @@ class ResultCollector:
     # New
     max_submitted_jobs_in_dir: int | None = 3
     data_dir: str | None = None
+    scheduler: ExecutionScheduler | None = None
+    poller: JobPoller | None = None
+    report_worker: ReportWorker | None = None
 
     def __post_init__(self):
         p = Path(self.filename)
@@ -50,9 +290,34 @@ class ResultCollector:
         if self.data_dir is None:
             self.data_dir = str(p.parent)
 
+        if self.scheduler is None:
+            self.scheduler = DEFAULT_SCHEDULER
+
+        if self.poller is None:
+            self.poller = DEFAULT_POLLER
+
+        if self.report_worker is None:
+            self.report_worker = report_worker_for(self.report_root)
+
+        # The file suffix selects the backend, e.g. "qv_4.sqlite" for an indexed store
+        self.store: ResultStore = RESULT_CACHE.store(self.filename)
+
     async def reset_file(self) -> None:
-        async with FILE_LOCK:
-            dump_results(self.filename, [])
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            await RESULT_CACHE.reset_async(self.filename)
+            await submission_ledger(self.data_dir).forget_file_async(self.filename)
+
+    async def export_csv(self, csv_filename: str) -> None:
+        """
+        Write all results to a CSV file. Use a path outside `data_dir`,
+        otherwise the exported rows are counted twice in the submission budget.
+        """
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            self.store.export_csv(csv_filename)
+
+    async def compact(self) -> None:
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            self.store.compact()
 
     def _append_error_log(
         self,
@@ -102,6 +367,7 @@ class ResultCollector:
             "error_stage": stage,
             "error_type": type(exc).__name__,
             "error_message": str(exc),
+            **TRACER.stage_times(),
             **extra_data,
         }
 
@@ -121,11 +387,21 @@ class ResultCollector:
     ) -> str | None:
         # No directory-level limit configured
         if self.max_submitted_jobs_in_dir is None:
+            job_id = await self._join_shared_job(runner, example)
+            if job_id is not None:
+                return job_id
             return await self._submit_and_write(runner, example)
 
-        async with SUBMISSION_LOCK:
-            async with FILE_LOCK:
-                num_submitted = count_submitted_jobs_in_dir(self.data_dir)
+        # The budget is shared with collectors in other processes (see campaign.py)
+        budget_lock = interprocess_lock_async(Path(self.data_dir) / "submission_budget")
+        async with TRACER.locked(SUBMISSION_LOCK, "submission_lock"), budget_lock:
+            # An example whose job already exists (a batch) takes no budget
+            job_id = await self._join_shared_job(runner, example)
+            if job_id is not None:
+                return job_id
+
+            async with TRACER.locked(FILE_LOCK, "file_lock"):
+                num_submitted = await count_submitted_jobs_in_dir_async(self.data_dir)
 
             if num_submitted >= self.max_submitted_jobs_in_dir:
                 print(
@@ -140,8 +416,8 @@ class ResultCollector:
     async def run(
         self, runner: HardwareRunner, example: BenchmarkExample
     ) -> dict | None:
-        await EXECUTION_SEMAPHORE.acquire()
-        try:
+        TRACER.begin_run(f"{example.name}-{example.problem_size} {backend_key(runner)}")
+        async with self.scheduler.slot(runner):
             #
             # Step 1 - load existing data, or submit if needed
             #
@@ -190,7 +466,20 @@ class ResultCollector:
             #
             # Step 2 - Wait for execution and score
             #
+            # The poller checks all outstanding jobs in batches; results are
+            # only fetched once the job is final. A job still running after
+            # `max_timeout` stays SUBMITTED, and the next run resumes polling.
             try:
+                with TRACER.span("job_wait"):
+                    finished = await self.poller.wait(
+                        job_id, runner.fetch_job_statuses, timeout=runner.max_timeout
+                    )
+                if not finished:
+                    print(
+                        f"Job {job_id} is still running after {runner.max_timeout}s. "
+                        "Polling resumes on the next run."
+                    )
+                    return None
                 scores = await asyncio.wait_for(
                     runner.score(example, job_id),
                     timeout=runner.max_timeout,
@@ -228,6 +517,7 @@ class ResultCollector:
                     status=status,
                     timestamp=completed_ts,
                     **scores,
+                    **TRACER.stage_times(),
                 )
             except Exception as exc:
                 return await self._record_error(
@@ -240,113 +530,74 @@ class ResultCollector:
                 )
 
             #
-            # Step 4 - Update report / build PDF (serialized)
+            # Step 4 - Queue a report update (written by the background report worker)
             #
             if not self.skip_report:
-                try:
-                    async with REPORT_LOCK:
-                        async with FILE_LOCK:
-                            all_results = load_results(self.filename)
-
-                        df = make_df_for_example(
-                            all_results, example.name, example.problem_size
-                        )
-
-                        # set num_shots for subtitle
-                        matching_results = [
-                            r
-                            for r in all_results
-                            if r.get("example") == example.name
-                            and r.get("problem_size") == example.problem_size
-                        ]
-
-                        shots_values = sorted(
-                            {
-                                r.get("num_shots")
-                                for r in matching_results
-                                if r.get("num_shots") is not None
-                            }
-                        )
-
-                        title = example.report_instance_title
-                        if len(shots_values) == 1:
-                            title += f" ({shots_values[0]} shots)"
-
-                        add_text_block(
-                            name=f"10_{example.name}",
-                            title=example.report_family_title,
-                            text=example.report_family_description,
-                            root=self.report_root,
-                            level="section",
-                        )
-
-                        add_section(
-                            name=f"10_{example.name}_{example.problem_size:03d}",
-                            title=title,
-                            df=df,
-                            numeric_cols={
-                                "Score",
-                                "Time Elapsed (min)",
-                                "Width",
-                                "Depth",
-                                "2Q Gate Count",
-                            },
-                            root=self.report_root,
-                            level="subsection",
-                        )
-
-                        write_includes(root=self.report_root)
-
-                        if self.build_each_time:
-                            await asyncio.to_thread(
-                                build_report, self.report_root, True
-                            )
-                            print(
-                                f"** Report updated: {example.name}-{example.problem_size} "
-                                f"for {runner.backend_service_provider} - {runner.backend_name}"
-                            )
-                except Exception as exc:
-                    return await self._record_error(
-                        runner,
-                        example,
-                        "report",
-                        exc,
-                        job_id=job_id,
-                        **scores,
-                    )
+                self.report_worker.mark_dirty(
+                    self.filename, example, build=self.build_each_time
+                )
 
             return final_result
 
-        finally:
-            EXECUTION_SEMAPHORE.release()
+    async def flush_report(self) -> None:
+        """
+        Wait for the background report worker to write all pending updates.
+        """
+        await self.report_worker.flush()
 
     async def _upsert_and_write(
         self, runner: HardwareRunner, example: BenchmarkExample, **extra_data
     ) -> dict:
         new_entry = runner.to_dict(example, **extra_data)
-        base_dict = runner.to_dict(example)
 
-        async with FILE_LOCK:
-            results = load_results(self.filename)
-
-            updated = False
-            for i, res in enumerate(results):
-                if base_dict.items() <= res.items():
-                    results[i].update(new_entry)
-                    new_entry = results[i]
-                    updated = True
-                    break
-
-            if not updated:
-                results.append(new_entry)
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            with TRACER.span("results_io"):
+                # Locks held by other processes are awaited, not blocked on
+                merged = await RESULT_CACHE.upsert_async(self.filename, new_entry)
+                if "status" in extra_data:
+                    await submission_ledger(self.data_dir).record_async(
+                        self.filename, merged
+                    )
+            return merged
 
-            dump_results(self.filename, results)
+    async def _join_shared_job(
+        self, runner: HardwareRunner, example: BenchmarkExample
+    ) -> str | None:
+        """
+        Record the example as SUBMITTED with the job that already executes it
+        (see `BenchmarkExample.shared_job_id`), without synthesis or a new
+        submission. Returns None if there is no such job.
+        """
+        filters = [
+            ("backend_service_provider", "==", runner.backend_service_provider),
+            ("backend_name", "==", runner.backend_name),
+            ("num_shots", "==", runner.num_shots),
+        ]
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            rows = RESULT_CACHE.rows(self.filename, filters)
+        job_id = example.shared_job_id(rows)
+        if job_id is None:
+            return None
 
-        return new_entry
+        submitted_ts = datetime.datetime.now()
+        print(
+            f"{submitted_ts}: Join job {job_id} with {example.name}-{example.problem_size} "
+            f"for {runner.backend_service_provider} - {runner.backend_name}"
+        )
+        await self._upsert_and_write(
+            runner,
+            example,
+            status="SUBMITTED",
+            job_id=job_id,
+            submitted_timestamp=submitted_ts,
+            **TRACER.stage_times(),
+        )
+        return job_id
 
     async def _submit_and_write(
         self, runner: HardwareRunner, example: BenchmarkExample
     ) -> str:
+        await self.scheduler.wait_for_submission(runner)
         job_id, metrics = await runner.submit_execution(example)
 
         submitted_ts = datetime.datetime.now()
@@ -362,25 +613,22 @@ class ResultCollector:
             job_id=job_id,
             submitted_timestamp=submitted_ts,
             **metrics,
+            **TRACER.stage_times(),
         )
         return job_id
 
     async def _load_existing_data(
         self, runner: HardwareRunner, example: BenchmarkExample
     ) -> dict | None:
-        example_dict = runner.to_dict(example)
+        key = result_key(runner.to_dict(example))
 
-        async with FILE_LOCK:
-            results = load_results(self.filename)
-
-        for res in results:
-            if example_dict.items() <= res.items():
-                return res
-        return None
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            with TRACER.span("results_io"):
+                return RESULT_CACHE.get(self.filename, key)
 
     async def print_status(self) -> None:
-        async with FILE_LOCK:
-            results = load_results(self.filename)
+        async with TRACER.locked(FILE_LOCK, "file_lock"):
+            results = RESULT_CACHE.rows(self.filename)
 
         print("=" * 10 + f" ({datetime.datetime.now()})   " + "=" * 10)
         if not results:
@@ -0,0 +1,28 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import asyncio
+
+# Process pool for CPU-bound stages, or None to run them inline
+_EXECUTOR: ProcessPoolExecutor | None = None
+
+
+def set_cpu_workers(max_workers: int | None) -> None:
+    """
+    Run CPU-bound stages (circuit metrics, QV heavy-output sets) in a pool of
+    `max_workers` processes, so they do not stall the event loop of the
+    collectors. 0 or None runs them inline, which is the default.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    _EXECUTOR = ProcessPoolExecutor(max_workers) if max_workers else None
+
+
+async def run_cpu_bound(fn, *args):
+    """
+    Call `fn(*args)` in the CPU pool if one is configured, otherwise inline.
+    `fn` and its arguments must be picklable.
+    """
+    if _EXECUTOR is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, fn, *args)
@@ -1,7 +1,6 @@
 from dataclasses import dataclass, field
 from classiq import (
     create_model,
-    synthesize_async,
     Preferences,
     set_quantum_program_execution_preferences,
     ExecutionPreferences,
@@ -11,6 +10,11 @@ from classiq import (
 from hardwares_preferences import execution_preferences_wrapper
 from benchmark import BenchmarkExample
 from errors import StageError
+from synthesis_cache import SYNTHESIS_CACHE
+from tracing import TRACER
+from circuit_metrics import program_metrics_columns, program_qasm, qasm_metrics_columns
+from cpu_pool import run_cpu_bound
+from poller import fetch_classiq_job_statuses
 
 
 @dataclass
@@ -21,6 +25,10 @@ class HardwareRunner:
     num_shots: int
     backend_kwargs: dict = field(default_factory=dict)
 
+    # Batched status check used by the job poller; runners of other job
+    # sources override it
+    fetch_job_statuses = staticmethod(fetch_classiq_job_statuses)
+
     @property
     def _synthesis_preferences(self) -> Preferences:
         if self.backend_service_provider == "Classiq":
@@ -48,7 +56,7 @@ class HardwareRunner:
                 preferences=self._synthesis_preferences,
                 constraints=example.constraints,
             )
-            qprog = await synthesize_async(qmod)
+            qprog = await SYNTHESIS_CACHE.synthesize_async(qmod)
             qprog = set_quantum_program_execution_preferences(
                 qprog, self._execution_preferences
             )
@@ -57,39 +65,32 @@ class HardwareRunner:
             raise StageError("synthesis", exc) from exc
 
     async def _extract_circuit_metrics(self, job_id: str) -> dict:
-        _empty = {
-            "circuit_depth": None,
-            "circuit_width": None,
-            "two_qubit_gate_count": None,
-        }
+        """
+        Metrics of every circuit submitted by the job. If the circuits are not
+        available, the metrics recorded at submission time are kept.
+        """
         try:
             job = await ExecutionJob.from_id_async(job_id)
             circuits = await job.get_submitted_circuits_async()
         except Exception:
-            return _empty
-        if not circuits:
-            return _empty
+            return {}
 
-        qc = circuits[0].to_qiskit()
-        depth = qc.depth(
-            filter_function=lambda instr: instr.operation.name
-            not in ("measure", "barrier", "reset")
-        )
-        width = len({q for instr in qc.data for q in instr.qubits})
-        two_qubit_gate_count = sum(
-            1 for instr in qc.data if instr.operation.num_qubits == 2
+        return await run_cpu_bound(
+            qasm_metrics_columns, [c.to_qasm() for c in circuits]
         )
-        return {
-            "circuit_depth": depth,
-            "circuit_width": width,
-            "two_qubit_gate_count": two_qubit_gate_count,
-        }
 
     async def submit_execution(self, example: BenchmarkExample) -> tuple[str, dict]:
         try:
-            qprog = await self._synthesize(example)
-            job_id = await example.submit(qprog)
-            return job_id, {}
+            with TRACER.span("synthesize"):
+                qprog = await self._synthesize(example)
+            with TRACER.span("submit"):
+                job_id = await example.submit(qprog)
+            # Metrics of the synthesized circuit, refined at scoring time
+            with TRACER.span("metrics"):
+                metrics = await run_cpu_bound(
+                    program_metrics_columns, program_qasm(qprog)
+                )
+            return job_id, metrics
         except StageError:
             raise
         except Exception as exc:
@@ -97,8 +98,10 @@ class HardwareRunner:
 
     async def score(self, example: BenchmarkExample, job_id: str) -> dict:
         try:
-            scores = await example.score(job_id)
-            metrics = await self._extract_circuit_metrics(job_id)
+            with TRACER.span("score"):
+                scores = await example.score(job_id)
+            with TRACER.span("metrics"):
+                metrics = await self._extract_circuit_metrics(job_id)
             return {**scores, **metrics}
         except StageError:
             raise
@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark import BenchmarkExample
+from errors import StageError
+from hardware import HardwareRunner
+from tracing import TRACER
+
+# Draws a duration in seconds
+Distribution = Callable[[np.random.Generator], float]
+
+
+def fixed(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def exponential(mean: float) -> Distribution:
+    return lambda rng: rng.exponential(mean)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """Heavy-tailed durations, like real provider queues."""
+    return lambda rng: median * rng.lognormal(0.0, sigma)
+
+
+@dataclass
+class MockJob:
+    job_id: str
+    ready_at: float  # time.monotonic() when the job is final
+    latency: float  # seconds
+    failed: bool
+
+
+# Jobs of all mock runners; they are lost when the process exits
+MOCK_JOBS: dict[str, MockJob] = {}
+
+
+async def fetch_mock_job_statuses(job_ids: list[str]) -> dict[str, bool]:
+    """Status check for the job poller. Unknown jobs are final (and fail scoring)."""
+    now = time.monotonic()
+    return {
+        job_id: job_id not in MOCK_JOBS or MOCK_JOBS[job_id].ready_at <= now
+        for job_id in job_ids
+    }
+
+
+def sample_distribution(
+    df: pd.DataFrame, num_shots: int, fidelity: float, rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Sample a result dataframe from an ideal distribution under global
+    depolarizing noise: with probability 1 - fidelity, a shot is replaced by
+    a uniformly random basis state. Only observed states are kept, with
+    "count" and "probability" columns as in Classiq results.
+    """
+    ideal = df["probability"].to_numpy(dtype=float)
+    probs = fidelity * ideal / ideal.sum() + (1.0 - fidelity) / len(ideal)
+    counts = rng.multinomial(num_shots, probs / probs.sum())
+    observed = np.flatnonzero(counts)
+
+    sampled = df.drop(columns="probability").iloc[observed].reset_index(drop=True)
+    sampled["count"] = counts[observed]
+    sampled["probability"] = counts[observed] / num_shots
+    return sampled
+
+
+@dataclass
+class MockRunner(HardwareRunner):
+    """
+    Local stand-in for a provider, to exercise the collector, scheduler and
+    report pipeline without a network. Nothing is synthesized: the example's
+    ideal output distributions (`BenchmarkExample.ideal_distributions`) are
+    sampled with depolarizing noise. The trials of a batch (`example.batch`)
+    share one mock job, and examples without such distributions fail at
+    submission. Submission and job latencies, and failures, are drawn from the
+    configured distributions.
+    """
+
+    backend_service_provider: str = "Mock"
+    backend_name: str = "local_simulator"
+    max_timeout: int = 600
+    num_shots: int = 1000
+
+    error_rate: float = 0.01  # per qubit; the fidelity is (1 - error_rate) ** n
+    job_latency: Distribution = field(default=exponential(1.0))
+    submit_latency: Distribution = field(default=fixed(0.0))
+    submit_failure_rate: float = 0.0
+    job_failure_rate: float = 0.0
+    seed: int | None = None
+
+    fetch_job_statuses = staticmethod(fetch_mock_job_statuses)
+
+    def __post_init__(self):
+        self._rng = np.random.default_rng(self.seed)
+        # Batched examples share one job per batch, like `QVBatch.submit`
+        self._batch_jobs: dict[object, asyncio.Task] = {}
+
+    async def submit_execution(self, example: BenchmarkExample) -> tuple[str, dict]:
+        # Checked without building the distributions, which score() does once
+        if type(example).ideal_distributions is BenchmarkExample.ideal_distributions:
+            raise StageError(
+                "submit_job",
+                NotImplementedError(
+                    f"{type(example).__name__} has no local model of its circuits"
+                ),
+            )
+
+        with TRACER.span("submit"):
+            batch = getattr(example, "batch", None)
+            if batch is None:
+                job_id = await self._submit_job()
+            else:
+                task = self._batch_jobs.get(batch)
+                if task is None or (task.done() and task.exception()):
+                    task = asyncio.ensure_future(self._submit_job())
+                    self._batch_jobs[batch] = task
+                job_id = await asyncio.shield(task)
+        return job_id, {}
+
+    async def _submit_job(self) -> str:
+        await asyncio.sleep(max(0.0, self.submit_latency(self._rng)))
+        if self._rng.random() < self.submit_failure_rate:
+            raise StageError("submit_job", RuntimeError("Mock submission failed"))
+
+        job_id = f"mock-{self._rng.bytes(8).hex()}"
+        latency = max(0.0, self.job_latency(self._rng))
+        MOCK_JOBS[job_id] = MockJob(
+            job_id=job_id,
+            ready_at=time.monotonic() + latency,
+            latency=latency,
+            failed=self._rng.random() < self.job_failure_rate,
+        )
+        return job_id
+
+    async def score(self, example: BenchmarkExample, job_id: str) -> dict:
+        job = MOCK_JOBS.get(job_id)
+        if job is None:
+            raise StageError("retrieve_job", KeyError(f"Unknown mock job {job_id}"))
+
+        with TRACER.span("result"):
+            await asyncio.sleep(max(0.0, job.ready_at - time.monotonic()))
+        if job.failed:
+            raise StageError("retrieve_job", RuntimeError(f"Mock job {job_id} failed"))
+
+        try:
+            with TRACER.span("score"):
+                fidelity = (1.0 - self.error_rate) ** example.problem_size
+                dfs = [
+                    sample_distribution(df, self.num_shots, fidelity, self._rng)
+                    for df in example.ideal_distributions() or []
+                ]
+                scores = example.score_distributions(dfs) if dfs else None
+            if scores is None:
+                raise NotImplementedError(
+                    f"{type(example).__name__} cannot be scored from sampled distributions"
+                )
+        except Exception as exc:
+            raise StageError("score", exc) from exc
+
+        return {**scores, "execution_time": job.latency / 60.0}
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import asyncio
+import math
+
+from classiq import ExecutionJob, get_execution_jobs_async
+
+# Maps job ids to whether each job reached a final status
+StatusFetcher = Callable[[list[str]], Awaitable[dict[str, bool]]]
+
+
+async def fetch_classiq_job_statuses(
+    job_ids: list[str], page_size: int = 50
+) -> dict[str, bool]:
+    """
+    Whether each Classiq execution job reached a final status.
+
+    The user's most recent jobs are listed page by page, so a single request
+    covers many outstanding jobs. Jobs not found in the first pages are
+    looked up individually; jobs that cannot be looked up are reported as
+    final, so that scoring surfaces the error.
+    """
+    pending = set(job_ids)
+    statuses: dict[str, bool] = {}
+
+    max_pages = 1 + math.ceil(2 * len(job_ids) / page_size)
+    for page in range(max_pages):
+        jobs = await get_execution_jobs_async(offset=page * page_size, limit=page_size)
+        for job in jobs:
+            if job.id in pending:
+                statuses[job.id] = job.status.is_final()
+                pending.discard(job.id)
+        if not pending or len(jobs) < page_size:
+            break
+
+    missing = sorted(pending)
+    jobs = await asyncio.gather(
+        *(ExecutionJob.from_id_async(job_id) for job_id in missing),
+        return_exceptions=True,
+    )
+    for job_id, job in zip(missing, jobs):
+        statuses[job_id] = isinstance(job, Exception) or job.status.is_final()
+
+    return statuses
+
+
+@dataclass
+class JobPoller:
+    """
+    Waits for submitted jobs by polling their status in batches.
+
+    All jobs waited on are checked together in one round, first right away
+    (jobs of a resumed campaign may already be done) and then every
+    `interval` seconds. The interval starts at `min_interval`, grows by
+    `backoff` after every round in which no job finished, up to
+    `max_interval`, and is reset when a job finishes. Results are only
+    fetched (by the caller) once a job is final.
+    """
+
+    min_interval: float = 5.0
+    max_interval: float = 120.0
+    backoff: float = 1.5
+
+    def __post_init__(self):
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self._fetchers: dict[str, StatusFetcher] = {}
+        self._interval = self.min_interval
+        self._task: asyncio.Task | None = None
+
+    def pending(self) -> list[str]:
+        return list(self._waiters)
+
+    async def wait(
+        self,
+        job_id: str,
+        fetch: StatusFetcher = fetch_classiq_job_statuses,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Wait until the job reaches a final status. Returns False if `timeout`
+        seconds pass first; the job can then be waited on again later.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(fut)
+        self._fetchers[job_id] = fetch
+
+        if self._task is None or self._task.done():
+            self._interval = self.min_interval
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+        try:
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(job_id, [])
+            if fut in waiters:
+                waiters.remove(fut)
+            if not waiters:
+                self._waiters.pop(job_id, None)
+                self._fetchers.pop(job_id, None)
+
+    async def _fetch_all(self) -> dict[str, bool]:
+        groups: dict[StatusFetcher, list[str]] = {}
+        for job_id in self._waiters:
+            groups.setdefault(self._fetchers[job_id], []).append(job_id)
+
+        statuses: dict[str, bool] = {}
+        for fetch, job_ids in groups.items():
+            try:
+                statuses.update(await fetch(job_ids))
+            except Exception as exc:
+                # Without status information, let scoring wait for the results
+                print(f"Job status polling failed: {type(exc).__name__}: {exc}")
+                statuses.update({job_id: True for job_id in job_ids})
+        return statuses
+
+    async def _loop(self) -> None:
+        while self._waiters:
+            statuses = await self._fetch_all()
+
+            finished = [job_id for job_id, final in statuses.items() if final]
+            for job_id in finished:
+                for fut in self._waiters.pop(job_id, []):
+                    if not fut.done():
+                        fut.set_result(None)
+                self._fetchers.pop(job_id, None)
+
+            if finished:
+                self._interval = self.min_interval
+            else:
+                self._interval = min(self._interval * self.backoff, self.max_interval)
+
+            if self._waiters:
+                await asyncio.sleep(self._interval)
@@ -37,11 +37,20 @@ import sys
 sys.path.insert(0, "..")
 from collector import ResultCollector
 from hardware import HardwareRunner
-from storage import load_results
-from reporting import write_includes, add_section, build_report, add_text_block
-from qv_example import QVExample
+from scheduler import ExecutionScheduler, backend_key
+from storage import RESULT_CACHE
+from tracing import TRACER
+from reporting import (
+    write_includes,
+    add_section,
+    build_report,
+    add_text_block,
+    write_if_changed,
+)
+from qv_example import QVBatch, QVExample, compute_heavy_states
+from qv_stats import SUMMARY_COLUMNS, sequential_decisions, summarize_trials
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import numpy as np
@@ -52,6 +61,17 @@ import pandas as pd
 MAX_TRIAL_ERROR_RATE = 0.15
 NUM_TRIALS_THRESHOLD = 100
 
+# Result columns read by the summaries; other columns are not loaded
+RESULT_COLUMNS = [
+    "problem_size",
+    "backend_service_provider",
+    "backend_name",
+    "num_shots",
+    "status",
+    "heavy_output_probability",
+    "execution_time",
+]
+
 
 @dataclass
 class QuantumVolumeProtocol:
@@ -71,19 +91,44 @@ class QuantumVolumeProtocol:
 
     # --- File and directory paths ---
     results_dir: str = "protocols/data"  # Where per-width CSV results are stored
+    # Result file suffix; ".sqlite" keeps upserts O(1) for large campaigns
+    results_suffix: str = ".csv"
     report_root: str = "../report"  # Root directory for LaTeX report output
 
     # --- Reproducibility ---
     base_seed: int = 1234  # Base seed; each trial derives a unique seed from this
 
+    # --- Batching ---
+    # If set, trials of a width are grouped into batches of this size, and each
+    # batch runs as one parametrized job per backend (see QVBatch)
+    batch_size: int | None = None
+    # Processes used to simulate the ideal distributions (None: one per CPU)
+    simulation_workers: int | None = None
+
     # --- Statistical thresholds ---
     # A width passes if the lower confidence bound of the mean heavy-output
     # probability exceeds success_threshold (default 2/3 per the QV definition).
     success_threshold: float = 2 / 3
     # Number of standard errors subtracted from the mean to form the lower bound.
     sigma_factor: float = 2.0
+    # If positive, summaries include a percentile bootstrap interval of the
+    # heavy-output fraction from this many replicates (trials and shots resampled)
+    bootstrap_samples: int = 0
+    bootstrap_confidence: float = 0.95
+
+    # --- Early stopping ---
+    # If enabled, trials are run in waves of wave_size, and a backend stops
+    # running trials at a width once an anytime-valid confidence sequence
+    # (error rate early_stopping_alpha) decides pass or fail. Backends that
+    # fail a width are not run at higher widths. num_trials is the maximum.
+    # With batch_size, waves are rounded up to whole batches.
+    early_stopping: bool = False
+    wave_size: int = 10
+    early_stopping_alpha: float = 0.05
     # Maximum concurrent submitted jobs per results directory
     max_submitted_jobs_in_dir: int = 3
+    # Per-backend concurrency and submission rate limits (None: shared default)
+    scheduler: ExecutionScheduler | None = None
 
     # --- Report metadata ---
     report_family_title: str = "Quantum Volume"
@@ -91,6 +136,17 @@ class QuantumVolumeProtocol:
     update_report_each_time: bool = True
     build_report_each_time: bool = False
 
+    # --- Tracing ---
+    # If set, a Chrome trace of the campaign's stage timings is written here
+    trace_filename: str | None = None
+
+    # Batches are kept between runs so resumed polls reuse submitted jobs
+    _batches: dict[tuple[int, int], QVBatch] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    # Backends ("provider/backend") that failed a width with early stopping
+    _failed_backends: set[str] = field(default_factory=set, init=False, repr=False)
+
     def widths(self) -> list[int]:
         """Return the list of circuit widths to sweep over."""
         return list(range(self.min_problem_size, self.max_problem_size + 1))
@@ -103,8 +159,8 @@ class QuantumVolumeProtocol:
         return "multiple shot counts"
 
     def filename_for_width(self, problem_size: int) -> str:
-        """CSV file path for storing results of a given width."""
-        return str(Path(self.results_dir) / f"qv_{problem_size}.csv")
+        """Result file path for storing results of a given width."""
+        return str(Path(self.results_dir) / f"qv_{problem_size}{self.results_suffix}")
 
     def collector_for_width(self, problem_size: int) -> ResultCollector:
         """Create a ResultCollector that saves trial results for a given width."""
@@ -112,12 +168,21 @@ class QuantumVolumeProtocol:
             filename=self.filename_for_width(problem_size),
             skip_report=True,
             max_submitted_jobs_in_dir=self.max_submitted_jobs_in_dir,
+            scheduler=self.scheduler,
         )
 
     def seed_for_trial(self, problem_size: int, trial_id: int) -> int:
         """Deterministic seed for a specific (width, trial) pair."""
         return self.base_seed + 100_000 * problem_size + trial_id
 
+    def seed_for_batch(self, problem_size: int, batch_id: int) -> int:
+        """Deterministic seed for the qubit pairing of a (width, batch) pair."""
+        return int(
+            np.random.SeedSequence(
+                [self.base_seed, problem_size, batch_id]
+            ).generate_state(1)[0]
+        )
+
     def make_example(self, problem_size: int, trial_id: int) -> QVExample:
         """Instantiate a QV circuit example for a given width and trial."""
         return QVExample(
@@ -126,6 +191,29 @@ class QuantumVolumeProtocol:
             seed=self.seed_for_trial(problem_size, trial_id),
         )
 
+    def make_batch_examples(self, problem_size: int) -> list[QVExample]:
+        """Instantiate all trials of a width, grouped into QVBatch objects."""
+        examples = []
+        for batch_id, start in enumerate(range(0, self.num_trials, self.batch_size)):
+            key = (problem_size, batch_id)
+            if key not in self._batches:
+                batch = QVBatch(
+                    problem_size=problem_size,
+                    pairing_seed=self.seed_for_batch(problem_size, batch_id),
+                )
+                for trial_id in range(
+                    start, min(start + self.batch_size, self.num_trials)
+                ):
+                    QVExample(
+                        problem_size=problem_size,
+                        trial_id=trial_id,
+                        seed=self.seed_for_trial(problem_size, trial_id),
+                        batch=batch,
+                    )
+                self._batches[key] = batch
+            examples.extend(self._batches[key].trials)
+        return examples
+
     async def reset_files(self) -> None:
         """Clear all per-width result files to start fresh."""
         Path(self.results_dir).mkdir(parents=True, exist_ok=True)
@@ -140,19 +228,98 @@ class QuantumVolumeProtocol:
         filename = Path(self.filename_for_width(problem_size))
         before_mtime = filename.stat().st_mtime if filename.exists() else None
 
-        tasks = []
-        for runner in self.runners:
-            for trial_id in range(self.num_trials):
-                example = self.make_example(problem_size, trial_id)
-                tasks.append(collector.run(runner, example))
+        if self.batch_size is not None:
+            examples = self.make_batch_examples(problem_size)
+        else:
+            examples = [
+                self.make_example(problem_size, trial_id)
+                for trial_id in range(self.num_trials)
+            ]
+
+        runners = [
+            runner
+            for runner in self.runners
+            if backend_key(runner) not in self._failed_backends
+        ]
+
+        if self.early_stopping:
+            results = await self._run_waves(collector, runners, examples)
+        else:
+            # Ideal heavy-output sets of all trials, simulated locally in parallel
+            await asyncio.to_thread(
+                compute_heavy_states, examples, self.simulation_workers
+            )
+
+            tasks = []
+            for runner in runners:
+                for example in examples:
+                    tasks.append(collector.run(runner, example))
 
-        results = await asyncio.gather(*tasks)
+            results = await asyncio.gather(*tasks)
 
         after_mtime = filename.stat().st_mtime if filename.exists() else None
         had_updates = before_mtime != after_mtime
 
         return results, had_updates
 
+    async def _run_waves(
+        self,
+        collector: ResultCollector,
+        runners: list[HardwareRunner],
+        examples: list[QVExample],
+    ) -> list[dict | None]:
+        """Run the trials of a width in waves until every backend is decided."""
+        problem_size = examples[0].problem_size if examples else None
+        results = []
+        active = list(runners)
+
+        # The first trial of a batch submits the whole batch, so a wave must not
+        # end inside a batch
+        wave_size = self.wave_size
+        if self.batch_size is not None:
+            wave_size = -(-wave_size // self.batch_size) * self.batch_size
+
+        for start in range(0, len(examples), wave_size):
+            wave = examples[start : start + wave_size]
+            await asyncio.to_thread(compute_heavy_states, wave, self.simulation_workers)
+            results += await asyncio.gather(
+                *(
+                    collector.run(runner, example)
+                    for runner in active
+                    for example in wave
+                )
+            )
+
+            decisions = self.sequential_decisions(problem_size)
+            for runner in list(active):
+                decision = decisions.get(backend_key(runner))
+                if not decision:
+                    continue
+                active.remove(runner)
+                if decision == "failed":
+                    self._failed_backends.add(backend_key(runner))
+                print(
+                    f"Width {problem_size}: {backend_key(runner)} {decision} "
+                    f"after {start + len(wave)} trials, stopping early"
+                )
+
+            if not active:
+                break
+
+        return results
+
+    def sequential_decisions(self, problem_size: int) -> dict[str, str]:
+        """Early-stopping decision ("passed", "failed" or "") per backend at a width."""
+        summary = self.summarize_width(problem_size)
+        decisions = sequential_decisions(
+            summary,
+            self.success_threshold,
+            self.early_stopping_alpha,
+            self.num_trials,
+        )
+        keys = summary["backend_service_provider"] + "/" + summary["backend_name"]
+        return dict(zip(keys, decisions))
+
     async def run(self) -> dict[int, pd.DataFrame]:
         summaries: dict[int, pd.DataFrame] = {}
 
@@ -165,213 +332,77 @@ class QuantumVolumeProtocol:
                 if self.build_report_each_time:
                     print(f"Report updated and built for width {problem_size}")
 
+        if self.trace_filename is not None:
+            TRACER.export_chrome_trace(self.trace_filename)
+
         return summaries
 
     def _load_width_df(self, problem_size: int) -> pd.DataFrame:
-        """Load raw trial results from the CSV file for a given width."""
+        """Load raw trial results from the result file for a given width.
+
+        Served from the shared result cache, so repeated summaries only
+        reparse the file when it has changed on disk.  Only RESULT_COLUMNS
+        are returned; Parquet result files read nothing else from disk.
+        """
         filename = Path(self.filename_for_width(problem_size))
         if not filename.exists():
             return pd.DataFrame()
 
-        results = load_results(str(filename))
-        if not results:
-            return pd.DataFrame()
+        return RESULT_CACHE.dataframe(filename, columns=RESULT_COLUMNS)
+
+    def _summarize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Summarize trial rows of any number of widths in one vectorized pass."""
+        summary = summarize_trials(
+            df,
+            num_trials=self.num_trials,
+            sigma_factor=self.sigma_factor,
+            success_threshold=self.success_threshold,
+            min_completed=int(np.ceil(self.num_trials * (1 - MAX_TRIAL_ERROR_RATE))),
+            # Pooled binomial bound (Algorithm 1 in Cross et al.) when the shot
+            # counts are known and there are enough trials; normal
+            # approximation otherwise
+            pooled="num_shots" in df.columns
+            and self.num_trials >= NUM_TRIALS_THRESHOLD,
+            bootstrap_samples=self.bootstrap_samples,
+            bootstrap_confidence=self.bootstrap_confidence,
+            seed=self.base_seed,
+        )
 
-        return pd.DataFrame(results)
+        if self.early_stopping and not summary.empty:
+            # Cells stopped early ran fewer than num_trials trials; require the
+            # completion rate on the trials that were actually run
+            min_completed = np.ceil(summary["num_total"] * (1 - MAX_TRIAL_ERROR_RATE))
+            summary["passed"] = (summary["num_completed"] >= min_completed) & (
+                summary["lower_confidence_bound"] > self.success_threshold
+            )
+
+        return summary
 
     def summarize_width(self, problem_size: int) -> pd.DataFrame:
         """Aggregate trial results for a single width into a per-backend summary.
 
         For each backend, computes:
           - mean, std, and stderr of the heavy-output probability
-          - a lower confidence bound (mean - sigma_factor * stderr)
+          - a lower confidence bound (mean - sigma_factor * stderr, or the
+            pooled binomial bound)
           - whether the width passes: enough trials completed (within
             MAX_TRIAL_ERROR_RATE tolerance) AND the lower bound exceeds 2/3
-          - counts of trials by status (SUBMITTED, COMPLETED, TIMEOUT, ERROR)
-        """
-        df = self._load_width_df(problem_size)
-
-        out_cols = [
-            "problem_size",
-            "backend_service_provider",
-            "backend_name",
-            "num_trials_requested",
-            "num_completed",
-            "num_total",
-            "mean_score",
-            "std_score",
-            "stderr_score",
-            "lower_confidence_bound",
-            "passed",
-        ]
-
-        if df.empty:
-            return pd.DataFrame(columns=out_cols)
-
-        group_cols = ["backend_service_provider", "backend_name"]
-
-        metric_col = "heavy_output_probability"
-
-        if metric_col in df.columns:
-            df[metric_col] = pd.to_numeric(df[metric_col], errors="coerce")
-
-        # Count how many trials ended in each status per backend
-        status_counts = (
-            df.groupby(group_cols + ["status"], dropna=False)
-            .size()
-            .unstack(fill_value=0)
-            .reset_index()
-        )
-        status_value_cols = [
-            col for col in status_counts.columns if col not in group_cols
-        ]
-        status_counts["num_total"] = (
-            status_counts[status_value_cols].sum(axis=1).astype(int)
-        )
-
-        completed = df[df["status"] == "COMPLETED"].copy()
-
-        if completed.empty:
-            # No trials completed — fill in zeros/NaNs and mark as not passed
-            summary = status_counts.copy()
-            summary["problem_size"] = problem_size
-            summary["num_trials_requested"] = self.num_trials
-            summary["num_completed"] = 0
-            summary["mean_score"] = np.nan
-            summary["std_score"] = np.nan
-            summary["stderr_score"] = np.nan
-            summary["lower_confidence_bound"] = np.nan
-            summary["passed"] = False
-        else:
-            # Ensure num_shots is numeric for the pooled confidence bound
-            if "num_shots" in completed.columns:
-                completed["num_shots"] = pd.to_numeric(
-                    completed["num_shots"], errors="coerce"
-                )
-
-            # Compute statistics of the heavy-output probability per backend
-            score_summary = (
-                completed.groupby(group_cols, dropna=False)[metric_col]
-                .agg(num_completed="count", mean_score="mean", std_score="std")
-                .reset_index()
-            )
-
-            score_summary["std_score"] = score_summary["std_score"].fillna(0.0)
-            score_summary["stderr_score"] = score_summary["std_score"] / np.sqrt(
-                score_summary["num_completed"]
-            )
+          - the number of completed trials with a score, and of all trials
+          - optionally, a bootstrap interval (see `bootstrap_samples`)
 
-            # Lower confidence bound using the pooled binomial formula from
-            # Algorithm 1 in Cross et al. (arXiv:1811.12926):
-            #   (n_h - sigma * sqrt(n_h * (n_s - n_h / n_c))) / (n_c * n_s) > 2/3
-            # where n_h = total heavy output counts across all circuits,
-            #       n_c = number of circuits (trials),
-            #       n_s = number of shots per circuit.
-            def _pooled_lower_bound(group: pd.DataFrame) -> float:
-                n_c = len(group)
-                n_s_values = group["num_shots"].values
-                # All trials for a given backend should have the same num_shots,
-                # but handle the general case by summing per-trial heavy counts.
-                h_per_trial = group[metric_col].values * n_s_values
-                n_h = h_per_trial.sum()
-                total_shots = n_s_values.sum()  # n_c * n_s when uniform
-                if total_shots == 0:
-                    return 0.0
-                variance_term = n_h * (total_shots - n_h / n_c)
-                if variance_term < 0:
-                    variance_term = 0.0
-                return (n_h - self.sigma_factor * np.sqrt(variance_term)) / total_shots
-
-            if (
-                "num_shots" in completed.columns
-                and self.num_trials >= NUM_TRIALS_THRESHOLD
-            ):
-                lcb = (
-                    completed.groupby(group_cols, dropna=False)
-                    .apply(_pooled_lower_bound, include_groups=False)
-                    .reset_index(name="lower_confidence_bound")
-                )
-                score_summary = score_summary.merge(lcb, on=group_cols, how="left")
-            else:
-                # Fallback to normal approximation if num_shots is unavailable
-                score_summary["lower_confidence_bound"] = (
-                    score_summary["mean_score"]
-                    - self.sigma_factor * score_summary["stderr_score"]
-                )
-            score_summary["problem_size"] = problem_size
-            score_summary["num_trials_requested"] = self.num_trials
-
-            # A width passes if:
-            #   1. Enough trials completed (within MAX_TRIAL_ERROR_RATE tolerance)
-            #   2. The lower confidence bound exceeds the success threshold (2/3)
-            min_completed = int(np.ceil(self.num_trials * (1 - MAX_TRIAL_ERROR_RATE)))
-            score_summary["passed"] = (
-                score_summary["num_completed"] >= min_completed
-            ) & (score_summary["lower_confidence_bound"] > self.success_threshold)
-
-            # Merge status counts with score statistics
-            summary = status_counts.merge(
-                score_summary,
-                on=group_cols,
-                how="outer",
-            )
-
-            # Fill NaNs for backends that appear in one table but not the other
-            summary["problem_size"] = summary["problem_size"].fillna(problem_size)
-            summary["num_trials_requested"] = summary["num_trials_requested"].fillna(
-                self.num_trials
-            )
-            summary["num_completed"] = summary["num_completed"].fillna(0).astype(int)
-            summary["passed"] = summary["passed"].fillna(False)
-
-        # Select and order the final output columns
-        summary = summary[
-            [
-                "problem_size",
-                "backend_service_provider",
-                "backend_name",
-                "num_trials_requested",
-                "num_completed",
-                "num_total",
-                "mean_score",
-                "std_score",
-                "stderr_score",
-                "lower_confidence_bound",
-                "passed",
-            ]
-        ].sort_values(
-            by=["backend_service_provider", "backend_name"],
-            kind="stable",
-        )
-
-        return summary.reset_index(drop=True)
+        The statistics are computed by the `qv_stats` kernel.
+        """
+        return self._summarize(self._load_width_df(problem_size))
 
     def all_width_summaries(self) -> pd.DataFrame:
-        """Concatenate per-width summaries for all widths into a single DataFrame."""
-        dfs = []
-        for problem_size in self.widths():
-            s = self.summarize_width(problem_size)
-            if not s.empty:
-                dfs.append(s)
+        """Summaries for all widths, computed in a single pass over all trials."""
+        dfs = [self._load_width_df(problem_size) for problem_size in self.widths()]
+        dfs = [df for df in dfs if not df.empty]
 
         if not dfs:
-            return pd.DataFrame(
-                columns=[
-                    "problem_size",
-                    "backend_service_provider",
-                    "backend_name",
-                    "num_trials_requested",
-                    "num_completed",
-                    "num_total",
-                    "mean_score",
-                    "std_score",
-                    "stderr_score",
-                    "lower_confidence_bound",
-                    "passed",
-                ]
-            )
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
 
-        return pd.concat(dfs, ignore_index=True)
+        return self._summarize(pd.concat(dfs, ignore_index=True))
 
     def quantum_volume_summary(self) -> pd.DataFrame:
         """Determine the quantum volume for each backend.
@@ -639,7 +670,7 @@ class QuantumVolumeProtocol:
         data_dir.mkdir(parents=True, exist_ok=True)
 
         csv_path = data_dir / "quantum_volume.csv"
-        df.to_csv(csv_path, index=False)
+        write_if_changed(csv_path, df.to_csv(index=False))
 
         add_text_block(
             name="20_quantum_volume",
@@ -661,6 +692,6 @@ class QuantumVolumeProtocol:
         write_includes(root=str(root))
 
         if build:
-            await asyncio.to_thread(build_report, str(root), True)
+            await asyncio.to_thread(build_report, str(root), False)
 
         return df
@@ -0,0 +1,289 @@
+"""Vectorized statistics for Quantum Volume results.
+
+All (width, backend) cells of a campaign are summarized in one pass over
+columnar NumPy arrays: trials are mapped to integer cell codes once, and every
+per-cell sum is a single `np.bincount`.  No pandas `groupby` is involved.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_COLUMNS = [
+    "problem_size",
+    "backend_service_provider",
+    "backend_name",
+    "num_trials_requested",
+    "num_completed",
+    "num_total",
+    "mean_score",
+    "std_score",
+    "stderr_score",
+    "lower_confidence_bound",
+    "passed",
+]
+
+
+@dataclass
+class QVTrials:
+    """Columnar view of QV trial rows (one entry per trial and backend)."""
+
+    problem_size: np.ndarray  # int
+    provider: np.ndarray  # str
+    backend: np.ndarray  # str
+    status: np.ndarray  # str
+    heavy_output_probability: np.ndarray  # float, NaN when missing
+    num_shots: np.ndarray  # float, NaN when missing
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "QVTrials":
+        def numeric(col: str) -> np.ndarray:
+            if col not in df.columns:
+                return np.full(len(df), np.nan)
+            return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+        def text(col: str) -> np.ndarray:
+            if col not in df.columns:
+                return np.full(len(df), "", dtype=object)
+            return df[col].astype(str).to_numpy(dtype=object)
+
+        return cls(
+            problem_size=numeric("problem_size").astype(np.int64),
+            provider=text("backend_service_provider"),
+            backend=text("backend_name"),
+            status=text("status"),
+            heavy_output_probability=numeric("heavy_output_probability"),
+            num_shots=numeric("num_shots"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.problem_size)
+
+
+@dataclass
+class QVCells:
+    """Integer cell code of every trial, and the key of every cell."""
+
+    codes: np.ndarray
+    problem_size: np.ndarray
+    provider: np.ndarray
+    backend: np.ndarray
+
+    @classmethod
+    def from_trials(cls, trials: QVTrials) -> "QVCells":
+        providers, provider_idx = np.unique(trials.provider, return_inverse=True)
+        backends, backend_idx = np.unique(trials.backend, return_inverse=True)
+        widths, width_idx = np.unique(trials.problem_size, return_inverse=True)
+
+        # Cells are ordered by (width, provider, backend)
+        num_p, num_b = len(providers), len(backends)
+        cell_ids = (width_idx * num_p + provider_idx) * num_b + backend_idx
+        unique_cells, codes = np.unique(cell_ids, return_inverse=True)
+
+        return cls(
+            codes=codes,
+            problem_size=widths[unique_cells // (num_p * num_b)],
+            provider=providers[unique_cells // num_b % num_p],
+            backend=backends[unique_cells % num_b],
+        )
+
+    def __len__(self) -> int:
+        return len(self.problem_size)
+
+
+def cell_statistics(
+    trials: QVTrials,
+    cells: QVCells,
+    sigma_factor: float,
+    pooled: bool,
+) -> dict[str, np.ndarray]:
+    """Mean, std, stderr and lower confidence bound of every cell.
+
+    Only completed trials with a heavy-output probability contribute.  With
+    `pooled=True` the lower bound is the pooled binomial bound of Algorithm 1
+    in Cross et al.; otherwise it is mean - sigma_factor * stderr.
+    """
+    m = len(cells)
+    hop = trials.heavy_output_probability
+    valid = (trials.status == "COMPLETED") & ~np.isnan(hop)
+    codes = cells.codes[valid]
+    hop = hop[valid]
+
+    n = np.bincount(codes, minlength=m)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=hop, minlength=m) / n
+        squares = np.bincount(codes, weights=(hop - mean[codes]) ** 2, minlength=m)
+        # A single trial has zero spread, as with pandas std().fillna(0)
+        std = np.where(n > 1, np.sqrt(squares / np.maximum(n - 1, 1)), 0.0)
+        std = np.where(n > 0, std, np.nan)
+        stderr = std / np.sqrt(n)
+
+        if pooled:
+            #   (n_h - sigma * sqrt(n_h * (n_s - n_h / n_c))) / (n_c * n_s)
+            # where n_h = total heavy output counts across all circuits,
+            #       n_c = number of circuits, n_s = number of shots per circuit
+            shots = np.nan_to_num(trials.num_shots[valid])
+            n_h = np.bincount(codes, weights=hop * shots, minlength=m)
+            total_shots = np.bincount(codes, weights=shots, minlength=m)
+            variance = np.maximum(n_h * (total_shots - n_h / n), 0.0)
+            lower = (n_h - sigma_factor * np.sqrt(variance)) / total_shots
+            lower = np.where(total_shots > 0, lower, 0.0)
+            lower = np.where(n > 0, lower, np.nan)
+        else:
+            lower = mean - sigma_factor * stderr
+
+    return {
+        "num_completed": n,
+        "mean_score": mean,
+        "std_score": std,
+        "stderr_score": stderr,
+        "lower_confidence_bound": lower,
+    }
+
+
+def bootstrap_interval(
+    trials: QVTrials,
+    cells: QVCells,
+    num_samples: int,
+    confidence: float = 0.95,
+    seed: int | None = None,
+    batch_size: int = 256,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap interval of the heavy-output fraction of every cell.
+
+    Each replicate resamples the completed trials of every cell with
+    replacement, and then the shots of every resampled trial (binomially, from
+    its measured heavy-output probability).  Replicates are drawn
+    `batch_size` at a time as (replicates x trials) arrays.  Trials without a
+    shot count are resampled as if they had a single shot.
+    """
+    m = len(cells)
+    hop = trials.heavy_output_probability
+    valid = (trials.status == "COMPLETED") & ~np.isnan(hop)
+
+    order = np.argsort(cells.codes[valid], kind="stable")
+    codes = cells.codes[valid][order]
+    hop = np.clip(hop[valid][order], 0.0, 1.0)
+    shots = trials.num_shots[valid][order]
+    shots = np.where(np.isnan(shots) | (shots < 1), 1, shots).astype(np.int64)
+
+    counts = np.bincount(codes, minlength=m)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    occupied = counts > 0
+    rng = np.random.default_rng(seed)
+
+    fractions = np.empty((num_samples, m))
+    fractions[:, ~occupied] = np.nan
+    for first in range(0, num_samples, batch_size):
+        size = min(batch_size, num_samples - first)
+        picks = starts[codes] + (rng.random((size, len(codes))) * counts[codes]).astype(
+            np.int64
+        )
+        heavy = rng.binomial(shots[picks], hop[picks])
+        if occupied.any():
+            heavy_sums = np.add.reduceat(heavy, starts[occupied], axis=1)
+            shot_sums = np.add.reduceat(shots[picks], starts[occupied], axis=1)
+            fractions[first : first + size, occupied] = heavy_sums / shot_sums
+
+    alpha = (1.0 - confidence) / 2.0
+    lower, upper = np.quantile(fractions, [alpha, 1.0 - alpha], axis=0)
+    return lower, upper
+
+
+def summarize_trials(
+    df: pd.DataFrame,
+    num_trials: int,
+    sigma_factor: float,
+    success_threshold: float,
+    min_completed: int,
+    pooled: bool,
+    bootstrap_samples: int = 0,
+    bootstrap_confidence: float = 0.95,
+    seed: int | None = None,
+) -> pd.DataFrame:
+    """Per-(width, backend) summary of QV trial rows, with SUMMARY_COLUMNS.
+
+    A cell passes if at least `min_completed` trials completed and its lower
+    confidence bound exceeds `success_threshold`.  With `bootstrap_samples`
+    set, `bootstrap_lower` and `bootstrap_upper` columns are added.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    trials = QVTrials.from_frame(df)
+    cells = QVCells.from_trials(trials)
+    stats = cell_statistics(trials, cells, sigma_factor, pooled)
+
+    summary = pd.DataFrame(
+        {
+            "problem_size": cells.problem_size,
+            "backend_service_provider": cells.provider,
+            "backend_name": cells.backend,
+            "num_trials_requested": num_trials,
+            "num_completed": stats["num_completed"],
+            "num_total": np.bincount(cells.codes, minlength=len(cells)),
+            "mean_score": stats["mean_score"],
+            "std_score": stats["std_score"],
+            "stderr_score": stats["stderr_score"],
+            "lower_confidence_bound": stats["lower_confidence_bound"],
+            "passed": (stats["num_completed"] >= min_completed)
+            & (stats["lower_confidence_bound"] > success_threshold),
+        }
+    )
+
+    if bootstrap_samples > 0:
+        lower, upper = bootstrap_interval(
+            trials, cells, bootstrap_samples, bootstrap_confidence, seed
+        )
+        summary["bootstrap_lower"] = lower
+        summary["bootstrap_upper"] = upper
+
+    return summary
+
+
+def confidence_sequence_radius(
+    std: np.ndarray, n: np.ndarray, alpha: float, n_opt: int
+) -> np.ndarray:
+    """Half-width of a two-sided asymptotic confidence sequence for the mean.
+
+    Uses the normal-mixture boundary of Waudby-Smith et al. (arXiv:2103.06476,
+    Thm. 2.2), tuned to be tightest after `n_opt` trials.  Unlike a fixed-n
+    interval it stays valid when the data are checked after every wave of
+    trials.  The spread is regularized with a prior of 1/4 (the largest
+    variance of a [0, 1] variable), so a few identical scores do not
+    decide a cell.
+    """
+    log_term = -2.0 * np.log(alpha)
+    rho2 = (log_term + np.log(log_term + 1.0)) / n_opt
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (0.25 + np.maximum(n - 1, 0) * np.nan_to_num(std) ** 2) / (n + 1)
+        radius = np.sqrt(
+            variance
+            * 2.0
+            * (n * rho2 + 1.0)
+            / (n**2 * rho2)
+            * np.log(np.sqrt(n * rho2 + 1.0) / alpha)
+        )
+    return np.where(n > 0, radius, np.inf)
+
+
+def sequential_decisions(
+    summary: pd.DataFrame, threshold: float, alpha: float, n_opt: int
+) -> np.ndarray:
+    """ "passed", "failed" or "" (undecided) for every row of a summary.
+
+    A cell is decided once the confidence sequence around its mean score lies
+    entirely above or below `threshold`.
+    """
+    n = summary["num_completed"].to_numpy(dtype=float)
+    mean = summary["mean_score"].to_numpy(dtype=float)
+    radius = confidence_sequence_radius(
+        summary["std_score"].to_numpy(dtype=float), n, alpha, n_opt
+    )
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [mean - radius > threshold, mean + radius < threshold],
+            ["passed", "failed"],
+            default="",
+        )
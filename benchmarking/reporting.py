@@ -1,4 +1,6 @@
 from __future__ import annotations
+import hashlib
+import os
 import subprocess
 import shutil
 from pathlib import Path
@@ -19,6 +21,21 @@ _LATEX_ESCAPE_MAP = {
 }
 
 
+INPUTS_HASH_FILENAME = ".inputs.sha256"
+PREAMBLE_FORMAT = "report_preamble"
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """
+    Write text to path unless the file already holds exactly this content.
+    Unchanged files keep their mtime, so latexmk does not consider them modified.
+    """
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
 def get_classiq_version() -> str:
     try:
         return version("classiq")
@@ -35,9 +52,9 @@ def write_version_file(root: str | Path = "../report") -> None:
     root = ensure_report_dirs(root)
     version_path = root / "sections" / "_version.tex"
     classiq_version = latex_escape(get_classiq_version())
-    version_path.write_text(
+    write_if_changed(
+        version_path,
         rf"\newcommand{{\classiqversion}}{{{classiq_version}}}" + "\n",
-        encoding="utf-8",
     )
 
 
@@ -165,7 +182,7 @@ def add_text_block(
         tex.append(text)
         tex.append("")
 
-    section_path.write_text("\n".join(tex), encoding="utf-8")
+    write_if_changed(section_path, "\n".join(tex))
 
 
 def add_section(
@@ -187,7 +204,7 @@ def add_section(
             data_path.unlink()
         return
 
-    df.to_csv(data_path, index=False)
+    write_if_changed(data_path, df.to_csv(index=False))
 
     heading = r"\subsection*{" if level == "subsection" else r"\section*{"
 
@@ -201,7 +218,7 @@ def add_section(
         tex.append(df_to_latex_table_mixed(df, numeric_cols=numeric_cols))
 
     tex.append("")
-    section_path.write_text("\n".join(tex), encoding="utf-8")
+    write_if_changed(section_path, "\n".join(tex))
 
 
 def write_includes(root: str | Path = "../report") -> None:
@@ -217,7 +234,7 @@ def write_includes(root: str | Path = "../report") -> None:
     for name in tex_files:
         lines.append(rf"\input{{sections/{name}}}")
 
-    include_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    write_if_changed(include_path, "\n".join(lines) + "\n")
 
 
 def add_heading(
@@ -232,14 +249,95 @@ def add_heading(
     tex.append("% Auto-generated. Do not edit by hand.")
     tex.append(heading + latex_escape(title) + r"}")
     tex.append("")
-    section_path.write_text("\n".join(tex), encoding="utf-8")
+    write_if_changed(section_path, "\n".join(tex))
 
 
-def build_report(root: str | Path = "../report", force: bool = True) -> None:
+def report_inputs_hash(root: str | Path = "../report") -> str:
+    """
+    Hash of everything the report is compiled from: report.tex, the
+    background image and all generated section files.
+    """
+    root = Path(root)
+    paths = [root / "report.tex", root / "background.pdf"]
+    paths += sorted((root / "sections").glob("*.tex"))
+
+    h = hashlib.sha256()
+    for path in paths:
+        if path.exists():
+            h.update(path.name.encode("utf-8"))
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _precompile_preamble(root: Path) -> bool:
+    """
+    Dump everything before \\begin{document} in report.tex into a pdflatex
+    format file (via mylatexformat), rebuilt only when the preamble changes.
+    Returns False if the format could not be built.
+    """
+    tex = (root / "report.tex").read_text(encoding="utf-8")
+    preamble = tex.split(r"\begin{document}")[0]
+    digest = hashlib.sha256(preamble.encode("utf-8")).hexdigest()
+
+    fmt_path = root / "build" / f"{PREAMBLE_FORMAT}.fmt"
+    stamp_path = root / "build" / f"{PREAMBLE_FORMAT}.sha256"
+    if (
+        fmt_path.exists()
+        and stamp_path.exists()
+        and stamp_path.read_text(encoding="utf-8") == digest
+    ):
+        return True
+
+    cmd = [
+        "pdflatex",
+        "-ini",
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        f"-jobname={PREAMBLE_FORMAT}",
+        "-output-directory=build",
+        "&pdflatex",
+        "mylatexformat.ltx",
+        "report.tex",
+    ]
+    try:
+        subprocess.run(cmd, cwd=str(root), check=True, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Could not precompile the report preamble, using a full build: {e}")
+        return False
+
+    stamp_path.write_text(digest, encoding="utf-8")
+    return True
+
+
+def build_report(
+    root: str | Path = "../report",
+    force: bool = True,
+    precompile_preamble: bool = False,
+) -> bool:
+    """
+    Compile report.tex with latexmk and copy the PDF to the report root.
+
+    With force=False the build is incremental: it is skipped entirely when the
+    report inputs are unchanged since the last successful build, and latexmk
+    runs without -g so it only recompiles what changed. With
+    precompile_preamble=True the static preamble is loaded from a precompiled
+    format file. Returns whether latexmk was run.
+    """
     root = Path(root)
     ensure_report_dirs(root)
     write_version_file(root)
 
+    final_pdf = root / "report.pdf"
+    hash_path = root / "build" / INPUTS_HASH_FILENAME
+    inputs_hash = report_inputs_hash(root)
+    if (
+        not force
+        and final_pdf.exists()
+        and hash_path.exists()
+        and hash_path.read_text(encoding="utf-8") == inputs_hash
+    ):
+        return False
+
     cmd = [
         "latexmk",
         "-pdf",
@@ -247,24 +345,34 @@ def build_report(root: str | Path = "../report", force: bool = True) -> None:
         "-halt-on-error",
         "-outdir=build",
     ]
+    env = None
+    if precompile_preamble and _precompile_preamble(root):
+        cmd.append(f"-pdflatex=pdflatex -fmt={PREAMBLE_FORMAT} %O %S")
+        # search the build directory first, then the default format locations
+        env = {**os.environ, "TEXFORMATS": str(root / "build") + os.pathsep}
     if force:
         cmd.append("-g")
     cmd.append("report.tex")
 
     try:
-        subprocess.run(cmd, cwd=str(root), check=True, capture_output=True, text=True)
+        subprocess.run(
+            cmd, cwd=str(root), check=True, capture_output=True, text=True, env=env
+        )
 
         built_pdf = root / "build" / "report.pdf"
-        final_pdf = root / "report.pdf"
 
         if built_pdf.exists():
             shutil.copy2(built_pdf, final_pdf)
 
+        hash_path.write_text(inputs_hash, encoding="utf-8")
+
     except subprocess.CalledProcessError as e:
         print(e.stdout)
         print(e.stderr)
         raise
 
+    return True
+
 
 def reset_report(root: str | Path = "../report") -> None:
     root = Path(root).resolve()
@@ -0,0 +1,193 @@
+from dataclasses import dataclass, field
+from contextlib import asynccontextmanager
+from itertools import count
+
+import asyncio
+import heapq
+import time
+
+from hardware import HardwareRunner
+from tracing import TRACER
+
+
+def backend_key(runner: HardwareRunner) -> str:
+    return f"{runner.backend_service_provider}/{runner.backend_name}"
+
+
+def _lookup(mapping: dict, runner: HardwareRunner):
+    """
+    Per-backend settings are keyed by "provider/backend" or by "provider";
+    the more specific key wins.
+    """
+    key = backend_key(runner)
+    if key in mapping:
+        return mapping[key]
+    return mapping.get(runner.backend_service_provider)
+
+
+@dataclass
+class _TokenBucket:
+    rate: float  # tokens per second
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(init=False)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class ExecutionScheduler:
+    """
+    Limits how many `ResultCollector.run` calls are active at the same time.
+
+    - `max_concurrency` bounds the total number of active runs.
+    - `backend_limits` bounds active runs per backend, e.g.
+      {"IonQ": 2, "Classiq/simulator": 16}.
+    - `submission_rate` (submissions per second, token bucket with
+      `submission_burst` capacity) throttles job submissions;
+      `backend_submission_rates` overrides it per backend.
+    - Waiting runs are started in order of expected completion time, taken
+      from `expected_durations` (seconds) or else from the average duration
+      observed so far for the backend, so fast simulator runs are not stuck
+      behind slow hardware queues.
+    """
+
+    max_concurrency: int = 8
+    backend_limits: dict[str, int] = field(default_factory=dict)
+    submission_rate: float | None = None
+    submission_burst: int = 1
+    backend_submission_rates: dict[str, float] = field(default_factory=dict)
+    expected_durations: dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._waiters: list[tuple[float, int, str, asyncio.Future, int | None]] = []
+        self._counter = count()
+        self._in_flight: dict[str, int] = {}
+        self._total_in_flight = 0
+        self._observed: dict[str, tuple[int, float]] = {}
+        self._buckets: dict[str | None, _TokenBucket] = {}
+
+    def expected_duration(self, runner: HardwareRunner) -> float:
+        expected = _lookup(self.expected_durations, runner)
+        if expected is not None:
+            return float(expected)
+        num_runs, total = self._observed.get(backend_key(runner), (0, 0.0))
+        return total / num_runs if num_runs else 0.0
+
+    def _has_capacity(self, key: str, limit: int | None) -> bool:
+        if self._total_in_flight >= self.max_concurrency:
+            return False
+        return limit is None or self._in_flight.get(key, 0) < limit
+
+    def _start(self, key: str) -> None:
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        self._total_in_flight += 1
+
+    def _finish(self, key: str) -> None:
+        self._in_flight[key] -= 1
+        self._total_in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        blocked = []
+        while self._waiters and self._total_in_flight < self.max_concurrency:
+            item = heapq.heappop(self._waiters)
+            _, _, key, fut, limit = item
+            if fut.done():
+                # the waiting run was cancelled
+                continue
+            if not self._has_capacity(key, limit):
+                blocked.append(item)
+                continue
+            self._start(key)
+            fut.set_result(None)
+
+        for item in blocked:
+            heapq.heappush(self._waiters, item)
+
+    @asynccontextmanager
+    async def slot(self, runner: HardwareRunner):
+        """
+        Wait for a free execution slot for `runner` and hold it for the block.
+        """
+        key = backend_key(runner)
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (
+                self.expected_duration(runner),
+                next(self._counter),
+                key,
+                fut,
+                _lookup(self.backend_limits, runner),
+            ),
+        )
+        self._dispatch()
+
+        wait_start = time.perf_counter()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._finish(key)
+            raise
+        TRACER.record("scheduler_wait", wait_start, time.perf_counter())
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            num_runs, total = self._observed.get(key, (0, 0.0))
+            self._observed[key] = (num_runs + 1, total + time.monotonic() - started)
+            self._finish(key)
+
+    async def wait_for_submission(self, runner: HardwareRunner) -> None:
+        """
+        Block until the submission rate limit allows submitting a job to `runner`.
+        """
+        rate = _lookup(self.backend_submission_rates, runner)
+        bucket_key = backend_key(runner) if rate is not None else None
+        if rate is None:
+            rate = self.submission_rate
+        if rate is None:
+            return
+
+        if bucket_key not in self._buckets:
+            self._buckets[bucket_key] = _TokenBucket(rate, self.submission_burst)
+        await self._buckets[bucket_key].acquire()
+
+    def stats(self) -> dict:
+        """
+        Current queue depth and in-flight runs, in total and per backend.
+        """
+        queued: dict[str, int] = {}
+        for _, _, key, fut, _ in self._waiters:
+            if not fut.done():
+                queued[key] = queued.get(key, 0) + 1
+
+        backends = sorted(set(queued) | set(self._in_flight))
+        return {
+            "in_flight": self._total_in_flight,
+            "queued": sum(queued.values()),
+            "backends": {
+                key: {
+                    "in_flight": self._in_flight.get(key, 0),
+                    "queued": queued.get(key, 0),
+                }
+                for key in backends
+            },
+        }
@@ -0,0 +1,171 @@
+"""
+Vectorized scoring kernels shared by the benchmark examples.
+
+All kernels work on integer-encoded outcomes: an array of measured states
+(`outcomes` converts a result dataframe column) and an array with the
+probability of each. Ideal distributions are given sparsely, by their support
+and probabilities, or as a function of the states, so no dense 2^n array is
+built and scoring costs about as much as reading the result. The `*_batch`
+kernels score many results (e.g. one per execution parameter set) in one pass.
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# A measured or ideal distribution: states and their probabilities
+Histogram = tuple[np.ndarray, np.ndarray]
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount(states: np.ndarray) -> np.ndarray:
+    """
+    Number of set bits of every state (up to 64 bits), with the SWAR bit
+    tricks on uint64. Negative states count their two's complement bits.
+    """
+    x = np.asarray(states).astype(np.int64).view(np.uint64)
+    x = x - ((x >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.int64)
+
+
+def outcomes(df: pd.DataFrame, column: str = "x") -> Histogram:
+    """
+    Integer-encoded states of a result dataframe column, and their
+    probabilities. Bit-list columns (QArray outputs) are encoded with bit i
+    as the i-th entry.
+    """
+    values = df[column]
+    if len(values) and isinstance(values.iloc[0], (list, tuple)):
+        bits = np.asarray(values.tolist(), dtype=np.int64)
+        states = bits @ (np.int64(1) << np.arange(bits.shape[1], dtype=np.int64))
+    else:
+        states = values.to_numpy().astype(np.int64)
+    return states, df["probability"].to_numpy(dtype=float)
+
+
+def _aggregate(states: np.ndarray, probs: np.ndarray) -> Histogram:
+    """Merge repeated states, summing their probabilities."""
+    unique, inverse = np.unique(states, return_inverse=True)
+    return unique, np.bincount(inverse, weights=probs, minlength=len(unique))
+
+
+def _segments(histograms: list[Histogram]) -> tuple[np.ndarray, ...]:
+    """Concatenated states and probabilities, and the result index of each entry."""
+    states = np.concatenate([np.asarray(s, dtype=np.int64) for s, _ in histograms])
+    probs = np.concatenate([np.asarray(p, dtype=float) for _, p in histograms])
+    sizes = [len(s) for s, _ in histograms]
+    return states, probs, np.repeat(np.arange(len(histograms)), sizes)
+
+
+def parity_expectation(states: np.ndarray, probs: np.ndarray) -> float:
+    """Expectation of the Z parity, sum_x p(x) (-1)^popcount(x)."""
+    signs = 1 - 2 * (popcount(states) & 1)
+    return float(np.dot(probs, signs))
+
+
+def parity_expectation_batch(histograms: list[Histogram]) -> np.ndarray:
+    """`parity_expectation` of every result, in one pass."""
+    states, probs, segment = _segments(histograms)
+    signs = 1 - 2 * (popcount(states) & 1)
+    return np.bincount(segment, weights=probs * signs, minlength=len(histograms))
+
+
+def probability_of(states: np.ndarray, probs: np.ndarray, targets) -> float:
+    """Total probability of the measured states that are among `targets`."""
+    return float(probs[np.isin(states, targets)].sum())
+
+
+def total_variation_distance(
+    states: np.ndarray,
+    probs: np.ndarray,
+    ideal_states: np.ndarray,
+    ideal_probs: np.ndarray,
+) -> float:
+    """
+    Total variation distance between a measured and an ideal distribution,
+    both given sparsely. Costs O(k log k) in the number of listed states.
+    """
+    merged, inverse = np.unique(
+        np.concatenate([states, ideal_states]), return_inverse=True
+    )
+    diff = np.bincount(
+        inverse,
+        weights=np.concatenate([probs, -np.asarray(ideal_probs, dtype=float)]),
+        minlength=len(merged),
+    )
+    return 0.5 * float(np.abs(diff).sum())
+
+
+def total_variation_distance_to(
+    states: np.ndarray,
+    probs: np.ndarray,
+    ideal_probability: Callable[[np.ndarray], np.ndarray],
+) -> float:
+    """
+    Total variation distance to a normalized ideal distribution given by the
+    probability of each state. Only the measured states are evaluated: the
+    ideal mass on unmeasured states is 1 minus the mass on measured ones.
+    """
+    states, probs = _aggregate(states, probs)
+    ideal = ideal_probability(states)
+    unmeasured = max(0.0, 1.0 - float(ideal.sum()))
+    return 0.5 * (float(np.abs(probs - ideal).sum()) + unmeasured)
+
+
+def classical_fidelity(
+    states: np.ndarray,
+    probs: np.ndarray,
+    ideal_states: np.ndarray,
+    ideal_probs: np.ndarray,
+) -> float:
+    """
+    Classical (Hellinger) fidelity (sum_x sqrt(p(x) q(x)))^2 between a
+    measured and an ideal distribution, both given sparsely. Only states in
+    both supports contribute.
+    """
+    states, probs = _aggregate(states, probs)
+    ideal_states, ideal_probs = _aggregate(ideal_states, ideal_probs)
+    _, measured, ideal = np.intersect1d(
+        states, ideal_states, assume_unique=True, return_indices=True
+    )
+    return float(np.sqrt(probs[measured] * ideal_probs[ideal]).sum() ** 2)
+
+
+def classical_fidelity_batch(
+    histograms: list[Histogram], ideal_states: np.ndarray, ideal_probs: np.ndarray
+) -> np.ndarray:
+    """`classical_fidelity` of every result to the same ideal distribution, in one pass."""
+    states, probs, segment = _segments(histograms)
+    # Merge repeated states within each result
+    order = np.lexsort((states, segment))
+    states, probs, segment = states[order], probs[order], segment[order]
+    first = np.ones(len(states), dtype=bool)
+    first[1:] = (states[1:] != states[:-1]) | (segment[1:] != segment[:-1])
+    probs = np.bincount(np.cumsum(first) - 1, weights=probs)
+    states, segment = states[first], segment[first]
+
+    ideal_states, ideal_probs = _aggregate(ideal_states, ideal_probs)
+    ideal = np.zeros(len(states))
+    if len(ideal_states):
+        pos = np.minimum(np.searchsorted(ideal_states, states), len(ideal_states) - 1)
+        found = ideal_states[pos] == states
+        ideal[found] = ideal_probs[pos[found]]
+    overlap = np.bincount(
+        segment, weights=np.sqrt(probs * ideal), minlength=len(histograms)
+    )
+    return overlap**2
+
+
+def normalized_tvd_score(tvd: float, num_qubits: int) -> float:
+    """
+    Score of the QFT and state preparation examples, 1 - TVD / (1 - 1/n) for
+    n qubits.
+    """
+    return 1.0 - tvd / (1.0 - 1.0 / num_qubits)
@@ -0,0 +1,171 @@
+"""
+Fixtures of the self-benchmark suite: synthetic result files and regression
+thresholds. Run from the repository root with
+
+    python -m pytest benchmarking/self_benchmarks
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BENCHMARKING_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BENCHMARKING_DIR))
+sys.path.insert(0, str(BENCHMARKING_DIR / "protocols"))
+
+from storage import RESULT_CACHE, SQLiteResultStore, dump_results, open_result_store
+
+# Set $SELF_BENCHMARK_MAX_ROWS to skip the larger files in quick runs
+ROW_COUNTS = [
+    n
+    for n in [10**2, 10**3, 10**4, 10**5]
+    if n <= int(os.environ.get("SELF_BENCHMARK_MAX_ROWS", 10**5))
+]
+STORE_SUFFIXES = [".csv", ".sqlite", ".parquet"]
+
+EXAMPLES = ["ghz", "qft", "adder", "grover", "state_preparation", "localization"]
+WIDTHS = list(range(2, 10))
+NUM_BACKENDS = 16
+STATUSES = ["COMPLETED", "SUBMITTED", "TIMEOUT", "ERROR"]
+STATUS_WEIGHTS = [0.8, 0.1, 0.05, 0.05]
+
+# Maximal mean seconds per operation and number of rows, multiplied by
+# $SELF_BENCHMARK_SLACK (default 1) to account for slower machines
+THRESHOLDS = json.loads((Path(__file__).parent / "thresholds.json").read_text())
+
+
+def _backends(num_backends: int) -> list[tuple[str, str]]:
+    providers = ["IBM Quantum", "IonQ", "Classiq", "Amazon Braket"]
+    return [
+        (providers[i % len(providers)], f"backend_{i}") for i in range(num_backends)
+    ]
+
+
+def synthetic_results(num_rows: int, seed: int = 0) -> list[dict]:
+    """
+    Result rows spread over EXAMPLES x WIDTHS x NUM_BACKENDS, made unique by
+    their number of shots, with a realistic mix of statuses.
+    """
+    rng = np.random.default_rng(seed)
+    backends = _backends(NUM_BACKENDS)
+    cells = [(e, w, b) for e in EXAMPLES for w in WIDTHS for b in backends]
+    statuses = rng.choice(STATUSES, size=num_rows, p=STATUS_WEIGHTS)
+    start = datetime.datetime(2025, 1, 1)
+
+    rows = []
+    for i in range(num_rows):
+        example, width, (provider, backend) = cells[i % len(cells)]
+        row = {
+            "example": example,
+            "problem_size": width,
+            "backend_service_provider": provider,
+            "backend_name": backend,
+            "num_shots": 1000 + i // len(cells),
+            "status": str(statuses[i]),
+            "job_id": f"job-{i:08d}",
+            "submitted_timestamp": start + datetime.timedelta(seconds=i),
+        }
+        if row["status"] != "SUBMITTED":
+            row["timestamp"] = start + datetime.timedelta(seconds=i + 60)
+        if row["status"] == "COMPLETED":
+            row.update(
+                score=float(rng.random()),
+                execution_time=float(rng.exponential(2.0)),
+                circuit_depth=int(10 * width),
+                circuit_width=width,
+                two_qubit_gate_count=int(5 * width),
+            )
+        rows.append(row)
+    return rows
+
+
+def synthetic_qv_trials(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    """QV trial rows over WIDTHS x 8 backends, as loaded by the QV protocol."""
+    rng = np.random.default_rng(seed)
+    backends = _backends(8)
+    cells = [(w, b) for w in WIDTHS for b in backends]
+    width, backend = zip(*(cells[i % len(cells)] for i in range(num_rows)))
+    return pd.DataFrame(
+        {
+            "example": [f"qv_{w}_{i}" for i, w in enumerate(width)],
+            "problem_size": width,
+            "backend_service_provider": [p for p, _ in backend],
+            "backend_name": [b for _, b in backend],
+            "status": rng.choice(STATUSES, size=num_rows, p=STATUS_WEIGHTS),
+            "heavy_output_probability": rng.uniform(0.5, 0.85, size=num_rows),
+            "num_shots": 1000,
+        }
+    )
+
+
+def write_result_file(filename: Path, rows: list[dict]) -> None:
+    """Write rows in bulk, bypassing the row-by-row upserts of the stores."""
+    suffix = filename.suffix
+    if suffix == ".csv":
+        dump_results(str(filename), rows)
+    elif suffix == ".sqlite":
+        store = SQLiteResultStore(str(filename))
+        conn = sqlite3.connect(filename)
+        with conn:
+            conn.executemany(
+                "INSERT INTO results (example, problem_size, "
+                "backend_service_provider, backend_name, num_shots, seq, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        r["example"],
+                        r["problem_size"],
+                        r["backend_service_provider"],
+                        r["backend_name"],
+                        r["num_shots"],
+                        seq,
+                        store._encode(r),
+                    )
+                    for seq, r in enumerate(rows)
+                ],
+            )
+        conn.close()
+    else:
+        open_result_store(filename)._write([dict(r) for r in rows])
+
+
+@pytest.fixture(scope="session")
+def results_by_size() -> dict[int, list[dict]]:
+    return {n: synthetic_results(n) for n in ROW_COUNTS}
+
+
+@pytest.fixture
+def result_file(tmp_path, results_by_size, request) -> Path:
+    """A synthetic result file; parametrize with (suffix, num_rows)."""
+    suffix, num_rows = request.param
+    filename = tmp_path / "data" / f"results{suffix}"
+    filename.parent.mkdir()
+    write_result_file(filename, results_by_size[num_rows])
+    RESULT_CACHE.invalidate()
+    yield filename
+    RESULT_CACHE.invalidate()
+
+
+@pytest.fixture
+def check_threshold(benchmark):
+    """Fail if the mean time of `benchmark` exceeds THRESHOLDS[name][num_rows]."""
+
+    def check(name: str, num_rows: int) -> None:
+        if benchmark.disabled or benchmark.stats is None:
+            return
+        slack = float(os.environ.get("SELF_BENCHMARK_SLACK", "1"))
+        limit = THRESHOLDS[name][str(num_rows)] * slack
+        mean = benchmark.stats.stats.mean
+        assert mean <= limit, (
+            f"{name} with {num_rows} rows took {mean:.4f}s on average, "
+            f"above the regression threshold of {limit:.4f}s"
+        )
+
+    return check
@@ -0,0 +1,63 @@
+import pytest
+from conftest import EXAMPLES, ROW_COUNTS, WIDTHS, synthetic_qv_trials
+
+from collector import _ReportSection, _write_report_section
+from qv_stats import summarize_trials
+from reporting import write_includes
+from storage import RESULT_CACHE
+
+
+@pytest.mark.parametrize("num_rows", ROW_COUNTS)
+def test_qv_summary(benchmark, check_threshold, num_rows):
+    df = synthetic_qv_trials(num_rows)
+    summary = benchmark(
+        summarize_trials,
+        df,
+        num_trials=num_rows // 64,
+        sigma_factor=2.0,
+        success_threshold=2 / 3,
+        min_completed=1,
+        pooled=False,
+    )
+    assert len(summary) == len(WIDTHS) * 8
+    check_threshold("qv_summary", num_rows)
+
+
+@pytest.mark.parametrize(
+    "result_file",
+    [(".csv", n) for n in ROW_COUNTS],
+    ids=[f"csv-{n}" for n in ROW_COUNTS],
+    indirect=True,
+)
+def test_report_regeneration(benchmark, check_threshold, tmp_path, result_file):
+    # Rewrite every section from the result file, as the report worker does
+    # after a campaign has touched all of them
+    root = str(tmp_path / "report")
+    sections = [
+        _ReportSection(
+            filename=str(result_file),
+            example_name=example,
+            problem_size=width,
+            family_title=example.capitalize(),
+            family_description="",
+            instance_title=f"{example} - {width} qubits",
+        )
+        for example in EXAMPLES
+        for width in WIDTHS
+    ]
+
+    def regenerate():
+        for section in sections:
+            rows = RESULT_CACHE.rows(
+                section.filename,
+                filters=[
+                    ("example", "==", section.example_name),
+                    ("problem_size", "==", section.problem_size),
+                ],
+            )
+            _write_report_section(section, rows, root)
+        write_includes(root=root)
+
+    benchmark(regenerate)
+    assert (tmp_path / "report" / "sections" / "_includes.tex").exists()
+    check_threshold("report_regeneration", len(RESULT_CACHE.rows(result_file)))
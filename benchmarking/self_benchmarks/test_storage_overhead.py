@@ -0,0 +1,82 @@
+import itertools
+
+import pytest
+from conftest import ROW_COUNTS, STORE_SUFFIXES, synthetic_results
+
+from storage import (
+    RESULT_CACHE,
+    dump_results,
+    load_results,
+    make_df_for_example,
+    open_result_store,
+    status_counts_in_dir,
+)
+
+STORE_CASES = list(itertools.product(STORE_SUFFIXES, ROW_COUNTS))
+STORE_IDS = [f"{suffix[1:]}-{n}" for suffix, n in STORE_CASES]
+
+
+@pytest.mark.parametrize("result_file", STORE_CASES, ids=STORE_IDS, indirect=True)
+def test_load(benchmark, check_threshold, result_file):
+    # A fresh store per round, so in-memory copies are not reused
+    rows = benchmark(lambda: open_result_store(result_file).load())
+    assert len(rows) > 0
+    check_threshold(f"load{result_file.suffix}", len(rows))
+
+
+@pytest.mark.parametrize("result_file", STORE_CASES, ids=STORE_IDS, indirect=True)
+def test_upsert(benchmark, check_threshold, result_file):
+    # Status updates of existing rows through the cache, as the collector does
+    rows = RESULT_CACHE.rows(result_file)
+    targets = itertools.cycle(rows[:: max(1, len(rows) // 50)])
+
+    def upsert():
+        row = next(targets)
+        return RESULT_CACHE.upsert(result_file, {**row, "status": "COMPLETED"})
+
+    benchmark(upsert)
+    check_threshold(f"upsert{result_file.suffix}", len(rows))
+
+
+@pytest.mark.parametrize("result_file", STORE_CASES, ids=STORE_IDS, indirect=True)
+def test_status_counts(benchmark, check_threshold, result_file):
+    # Cold cache: the result files are read on every round
+    counts = benchmark.pedantic(
+        status_counts_in_dir,
+        args=(result_file.parent,),
+        setup=RESULT_CACHE.invalidate,
+        rounds=5,
+    )
+    num_rows = sum(counts.values())
+    check_threshold(f"status_counts{result_file.suffix}", num_rows)
+
+
+@pytest.mark.parametrize("num_rows", ROW_COUNTS)
+def test_dump_results(benchmark, check_threshold, tmp_path, results_by_size, num_rows):
+    filename = str(tmp_path / "results.csv")
+    benchmark(dump_results, filename, results_by_size[num_rows])
+    assert len(load_results(filename)) == num_rows
+    check_threshold("dump_results", num_rows)
+
+
+@pytest.mark.parametrize("num_rows", ROW_COUNTS)
+def test_make_df_for_example(benchmark, check_threshold, results_by_size, num_rows):
+    rows = results_by_size[num_rows]
+    df = benchmark(make_df_for_example, rows, "ghz", 2)
+    assert not df.empty
+    check_threshold("make_df_for_example", num_rows)
+
+
+def test_synthetic_rows_are_unique():
+    rows = synthetic_results(ROW_COUNTS[-1])
+    keys = {
+        (
+            r["example"],
+            r["problem_size"],
+            r["backend_service_provider"],
+            r["backend_name"],
+            r["num_shots"],
+        )
+        for r in rows
+    }
+    assert len(keys) == len(rows)
@@ -1,11 +1,105 @@
+import abc
 import csv
+import json
 import os
 import datetime
+import sqlite3
+import asyncio
 
 from reporting import *
 from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: files are then only safe within one process
+    fcntl = None
+
+# Fields that identify a single benchmark/backend row in a result file.
+RESULT_KEY_FIELDS = (
+    "example",
+    "problem_size",
+    "backend_service_provider",
+    "backend_name",
+    "num_shots",
+)
+
+# Result fields that are numeric regardless of the benchmark example.
+NUMERIC_RESULT_FIELDS = (
+    "problem_size",
+    "num_shots",
+    "score",
+    "execution_time",
+    "heavy_output_probability",
+    "circuit_depth",
+    "circuit_width",
+    "two_qubit_gate_count",
+    "two_qubit_depth",
+    "num_circuits",
+)
+
+SQLITE_SUFFIXES = (".sqlite", ".db")
+PARQUET_SUFFIXES = (".parquet",)
+RESULT_FILE_PATTERNS = (
+    "*.csv",
+    *(f"*{suffix}" for suffix in SQLITE_SUFFIXES + PARQUET_SUFFIXES),
+)
+
+# Column types of Parquet result files ("string", "int64", "float64" or
+# "timestamp"). Columns not listed here or in an example schema are inferred.
+RESULT_SCHEMA = {
+    "example": "string",
+    "problem_size": "int64",
+    "backend_service_provider": "string",
+    "backend_name": "string",
+    "num_shots": "int64",
+    "status": "string",
+    "job_id": "string",
+    "submitted_timestamp": "timestamp",
+    "timestamp": "timestamp",
+    "score": "float64",
+    "execution_time": "float64",
+    "circuit_depth": "int64",
+    "circuit_width": "int64",
+    "two_qubit_gate_count": "int64",
+    "two_qubit_depth": "int64",
+    "num_circuits": "int64",
+    "gate_counts": "string",
+    "circuit_metrics": "string",
+    "error_stage": "string",
+    "error_type": "string",
+    "error_message": "string",
+}
+
+# Additional column types per example, keyed by example name prefix
+EXAMPLE_RESULT_SCHEMAS: dict[str, dict[str, str]] = {}
+
+
+def register_result_schema(example_prefix: str, fields: dict[str, str]) -> None:
+    """
+    Declare the types of the example-specific result columns of all examples
+    whose name starts with `example_prefix`, e.g. ("qv_", {"heavy_output_probability": "float64"}).
+    """
+    EXAMPLE_RESULT_SCHEMAS.setdefault(example_prefix, {}).update(fields)
+
+
+def _coerce_row(row: dict) -> dict:
+    for k in ["problem_size", "num_shots"]:
+        if row.get(k):
+            row[k] = int(float(row[k]))
+
+    for k in ["score", "execution_time"]:
+        if row.get(k):
+            row[k] = float(row[k])
+
+    for k in ["submitted_timestamp", "timestamp"]:
+        if row.get(k) and not isinstance(row[k], datetime.datetime):
+            row[k] = datetime.datetime.fromisoformat(row[k])
+
+    return row
+
 
 def load_results(filename: str) -> list[dict]:
     if not os.path.exists(filename) or os.stat(filename).st_size == 0:
@@ -14,19 +108,7 @@ def load_results(filename: str) -> list[dict]:
     results = []
     with open(filename, "r", encoding="utf-8", newline="") as f:
         for row in csv.DictReader(f):
-            for k in ["problem_size", "num_shots"]:
-                if row.get(k):
-                    row[k] = int(float(row[k]))
-
-            for k in ["score", "execution_time"]:
-                if row.get(k):
-                    row[k] = float(row[k])
-
-            for k in ["submitted_timestamp", "timestamp"]:
-                if row.get(k):
-                    row[k] = datetime.datetime.fromisoformat(row[k])
-
-            results.append(row)
+            results.append(_coerce_row(row))
     return results
 
 
@@ -59,6 +141,702 @@ def dump_results(filename: str, results: list[dict]) -> None:
     os.replace(tmp_path, filename)
 
 
+def _lock_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(f".{path.name}.lock")
+
+
+@contextmanager
+def interprocess_lock(path: str | Path):
+    """
+    Exclusive lock on `path` shared by all processes, held on a hidden
+    `.<name>.lock` file next to it. Used for the read-modify-write updates of
+    files that several campaign workers write. The lock is not reentrant.
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = _lock_path(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def interprocess_lock_async(path: str | Path, poll_interval: float = 0.05):
+    """
+    `interprocess_lock` for coroutines: waits for the lock without blocking
+    the event loop, so it can be held across awaits.
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_path = _lock_path(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _json_default(v):
+    # numpy scalars (e.g. np.int64 circuit metrics) are not JSON serializable
+    if hasattr(v, "item"):
+        return v.item()
+    return str(v)
+
+
+def result_key(row: dict) -> tuple:
+    return tuple(row.get(k) for k in RESULT_KEY_FIELDS)
+
+
+# Row filters are (column, op, value) tuples with op "==", "!=" or "in", as in
+# pyarrow's `filters` argument; all filters must match.
+Filters = list[tuple[str, str, object]]
+
+
+def _row_matches(row: dict, filters: Filters) -> bool:
+    for col, op, value in filters:
+        if op == "==" and row.get(col) != value:
+            return False
+        if op == "!=" and row.get(col) == value:
+            return False
+        if op == "in" and row.get(col) not in value:
+            return False
+    return True
+
+
+def _filter_frame(df: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index)
+        if op == "==":
+            mask &= values == value
+        elif op == "!=":
+            mask &= values != value
+        elif op == "in":
+            mask &= values.isin(list(value))
+    return df[mask]
+
+
+def _typed_frame(rows: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    for col in NUMERIC_RESULT_FIELDS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+class ResultStore(abc.ABC):
+    """
+    Persistent storage for the result rows of a single result file.
+    Rows are identified by RESULT_KEY_FIELDS; `upsert` merges new fields into
+    the existing row with the same key, or appends a new row.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = str(filename)
+
+    @abc.abstractmethod
+    def load(self) -> list[dict]:
+        pass
+
+    @abc.abstractmethod
+    def get(self, key: tuple) -> dict | None:
+        pass
+
+    @abc.abstractmethod
+    def upsert(self, row: dict) -> dict:
+        """
+        Merge `row` into the stored row with the same key and return the merged row.
+        """
+        pass
+
+    @abc.abstractmethod
+    def reset(self) -> None:
+        pass
+
+    def compact(self) -> None:
+        """
+        Reclaim space left behind by overwritten rows. No-op by default.
+        """
+        pass
+
+    def export_csv(self, csv_filename: str | Path) -> None:
+        dump_results(str(csv_filename), self.load())
+
+    def version(self) -> int | None:
+        """
+        Counter of the writes to the store, or None if the store cannot list
+        the rows written since a version (see `rows_since`).
+        """
+        return None
+
+    def rows_since(self, version: int) -> tuple[list[dict], int] | None:
+        """
+        Rows inserted or updated after `version` and the current version, or
+        None if rows were removed since then.
+        """
+        return None
+
+    # Whether `read_frame` reads only the requested columns and rows from disk
+    supports_pushdown = False
+
+    def read_frame(
+        self, columns: list[str] | None = None, filters: Filters | None = None
+    ) -> pd.DataFrame:
+        """
+        Typed DataFrame of the rows matching `filters`, restricted to the
+        existing ones among `columns`.
+        """
+        df = _typed_frame(self.load())
+        if filters:
+            df = _filter_frame(df, filters)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df.reset_index(drop=True)
+
+
+class CSVResultStore(ResultStore):
+    """
+    Plain CSV file. Every upsert rewrites the whole file, so prefer
+    SQLiteResultStore for campaigns with many rows.
+    """
+
+    def load(self) -> list[dict]:
+        return load_results(self.filename)
+
+    def get(self, key: tuple) -> dict | None:
+        for res in self.load():
+            if result_key(res) == key:
+                return res
+        return None
+
+    def upsert(self, row: dict) -> dict:
+        key = result_key(row)
+        results = self.load()
+
+        for i, res in enumerate(results):
+            if result_key(res) == key:
+                res.update(row)
+                dump_results(self.filename, results)
+                return res
+
+        results.append(row)
+        dump_results(self.filename, results)
+        return row
+
+    def reset(self) -> None:
+        dump_results(self.filename, [])
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite file with a primary-key index on RESULT_KEY_FIELDS, so lookups and
+    upserts do not depend on the number of stored rows. Each row is stored as
+    a JSON document; `seq` keeps the original insertion order.
+
+    Every upsert stamps its row with the next write `version` (kept in the
+    `changes` table, with the version of the last reset), so the rows written
+    by other processes can be read without loading the whole file.
+    """
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "example TEXT, problem_size INTEGER, "
+                "backend_service_provider TEXT, backend_name TEXT, "
+                "num_shots INTEGER, seq INTEGER, data TEXT NOT NULL, "
+                "version INTEGER, "
+                "PRIMARY KEY (example, problem_size, backend_service_provider, "
+                "backend_name, num_shots))"
+            )
+            columns = {c[1] for c in conn.execute("PRAGMA table_info(results)")}
+            if "version" not in columns:
+                # Files written before versions were stored
+                conn.execute("ALTER TABLE results ADD COLUMN version INTEGER")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_version ON results (version)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "version INTEGER NOT NULL, reset_version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT INTO changes SELECT 0, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM changes)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.filename, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(row: dict) -> str:
+        return json.dumps(
+            {
+                k: (v.isoformat() if isinstance(v, datetime.datetime) else v)
+                for k, v in row.items()
+            },
+            default=_json_default,
+        )
+
+    @staticmethod
+    def _decode(data: str) -> dict:
+        return _coerce_row(json.loads(data))
+
+    def load(self) -> list[dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM results ORDER BY seq").fetchall()
+        return [self._decode(data) for (data,) in rows]
+
+    def get(self, key: tuple) -> dict | None:
+        with self._connect() as conn:
+            return self._get(conn, key)
+
+    def version(self) -> int | None:
+        with self._connect() as conn:
+            return conn.execute("SELECT version FROM changes").fetchone()[0]
+
+    def rows_since(self, version: int) -> tuple[list[dict], int] | None:
+        with self._connect() as conn:
+            current, reset_version = conn.execute(
+                "SELECT version, reset_version FROM changes"
+            ).fetchone()
+            if reset_version > version:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM results WHERE version > ? ORDER BY seq", (version,)
+            ).fetchall()
+        return [self._decode(data) for (data,) in rows], current
+
+    def _get(self, conn: sqlite3.Connection, key: tuple) -> dict | None:
+        found = conn.execute(
+            "SELECT data FROM results WHERE example IS ? AND problem_size IS ? "
+            "AND backend_service_provider IS ? AND backend_name IS ? "
+            "AND num_shots IS ?",
+            key,
+        ).fetchone()
+        return None if found is None else self._decode(found[0])
+
+    def upsert(self, row: dict) -> dict:
+        key = result_key(row)
+        with self._connect() as conn:
+            # Take the write lock before reading, so concurrent writers from
+            # other processes cannot interleave between lookup and insert
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE changes SET version = version + 1")
+            (version,) = conn.execute("SELECT version FROM changes").fetchone()
+            existing = self._get(conn, key)
+            if existing is None:
+                merged = dict(row)
+                (seq,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM results"
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO results (example, problem_size, "
+                    "backend_service_provider, backend_name, num_shots, seq, "
+                    "data, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, seq, self._encode(merged), version),
+                )
+            else:
+                merged = {**existing, **row}
+                conn.execute(
+                    "UPDATE results SET data = ?, version = ? WHERE example IS ? "
+                    "AND problem_size IS ? AND backend_service_provider IS ? "
+                    "AND backend_name IS ? AND num_shots IS ?",
+                    (self._encode(merged), version, *key),
+                )
+        return _coerce_row(merged)
+
+    def reset(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+            conn.execute(
+                "UPDATE changes SET version = version + 1, "
+                "reset_version = version + 1"
+            )
+
+    def compact(self) -> None:
+        conn = sqlite3.connect(self.filename, timeout=60)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+
+class ParquetResultStore(ResultStore):
+    """
+    Columnar Parquet file with a typed schema (RESULT_SCHEMA plus the
+    registered example schemas), loaded into pandas through Arrow without
+    parsing strings. `read_frame` pushes column selection and row filters
+    down to the Parquet reader. Every upsert rewrites the file, as for CSV;
+    the rows are kept in memory between writes. Requires `pyarrow`.
+    """
+
+    supports_pushdown = True
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as exc:
+            raise ImportError(
+                "Parquet result files require pyarrow: pip install pyarrow"
+            ) from exc
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._rows: list[dict] | None = None
+        self._signature: tuple[int, int] | None = None
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _arrow_type(self, name: str):
+        return {
+            "string": self._pa.string(),
+            "int64": self._pa.int64(),
+            "float64": self._pa.float64(),
+            "timestamp": self._pa.timestamp("us"),
+        }[name]
+
+    def _schema(self, rows: list[dict]):
+        types = dict(RESULT_SCHEMA)
+        examples = {str(r.get("example", "")) for r in rows}
+        for prefix, fields in EXAMPLE_RESULT_SCHEMAS.items():
+            if any(example.startswith(prefix) for example in examples):
+                types.update(fields)
+
+        columns = []
+        for row in rows:
+            for col in row:
+                if col not in columns:
+                    columns.append(col)
+
+        fields = []
+        for col in columns:
+            if col not in types:
+                values = [row[col] for row in rows if row.get(col) is not None]
+                if all(isinstance(v, bool) for v in values):
+                    types[col] = "string"
+                elif all(isinstance(v, (int, float)) for v in values):
+                    types[col] = "float64"
+                else:
+                    types[col] = "string"
+            fields.append(self._pa.field(col, self._arrow_type(types[col])))
+        return self._pa.schema(fields), types
+
+    @staticmethod
+    def _convert(value, type_name: str):
+        if value is None or (isinstance(value, float) and value != value):
+            return None
+        if type_name == "timestamp":
+            if isinstance(value, datetime.datetime):
+                return value
+            return datetime.datetime.fromisoformat(str(value))
+        if type_name == "int64":
+            return int(float(value))
+        if type_name == "float64":
+            return float(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=_json_default)
+        return str(value)
+
+    def _write(self, rows: list[dict]) -> None:
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        schema, types = self._schema(rows)
+        table = self._pa.table(
+            {
+                field.name: [
+                    self._convert(r.get(field.name), types[field.name]) for r in rows
+                ]
+                for field in schema
+            },
+            schema=schema,
+        )
+        tmp_path = self.filename + ".tmp"
+        self._pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.filename)
+        self._rows = rows
+        self._signature = self._file_signature()
+
+    def _read_table(self, columns=None, filters=None):
+        if columns is not None:
+            available = set(self._pq.read_schema(self.filename).names)
+            columns = [col for col in columns if col in available]
+        return self._pq.read_table(self.filename, columns=columns, filters=filters)
+
+    def load(self) -> list[dict]:
+        signature = self._file_signature()
+        if signature is None or signature[1] == 0:
+            return []
+        if self._rows is None or signature != self._signature:
+            self._rows = [
+                {k: v for k, v in row.items() if v is not None}
+                for row in self._read_table().to_pylist()
+            ]
+            self._signature = signature
+        return [dict(row) for row in self._rows]
+
+    def get(self, key: tuple) -> dict | None:
+        for res in self.load():
+            if result_key(res) == key:
+                return res
+        return None
+
+    def upsert(self, row: dict) -> dict:
+        key = result_key(row)
+        results = self.load()
+
+        for res in results:
+            if result_key(res) == key:
+                res.update(row)
+                self._write(results)
+                return dict(res)
+
+        results.append(dict(row))
+        self._write(results)
+        return dict(row)
+
+    def reset(self) -> None:
+        self._write([])
+
+    def read_frame(
+        self, columns: list[str] | None = None, filters: Filters | None = None
+    ) -> pd.DataFrame:
+        signature = self._file_signature()
+        if signature is None or signature[1] == 0:
+            return pd.DataFrame(columns=columns)
+        table = self._read_table(columns, filters or None)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def open_result_store(filename: str | Path) -> ResultStore:
+    """
+    Pick the storage backend from the file suffix: `.sqlite`/`.db` files use
+    SQLiteResultStore, `.parquet` files use ParquetResultStore, anything else
+    is treated as CSV.
+    """
+    suffix = Path(filename).suffix
+    if suffix in SQLITE_SUFFIXES:
+        return SQLiteResultStore(str(filename))
+    if suffix in PARQUET_SUFFIXES:
+        return ParquetResultStore(str(filename))
+    return CSVResultStore(str(filename))
+
+
+@dataclass
+class _CacheEntry:
+    signature: tuple[int, int] | None
+    rows: list[dict]
+    index: dict[tuple, dict]
+    df: pd.DataFrame | None = None
+    # Store version the rows are at least as recent as (see ResultStore.version)
+    version: int | None = None
+
+
+class ResultCache:
+    """
+    Process-wide cache of parsed result files, keyed by the resolved filename.
+
+    An entry is reused as long as the file's (mtime, size) signature is
+    unchanged. Writes made through `upsert`/`reset` update the entry in place,
+    so a collector never reparses a file only because it wrote to it. Writes
+    hold an `interprocess_lock` on the file, and files changed by other
+    processes are reparsed, so campaign workers can share result files; stores
+    that track their writes (SQLite) only read the rows changed since.
+    Returned rows are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _CacheEntry] = {}
+        self._stores: dict[str, ResultStore] = {}
+
+    @staticmethod
+    def _key(filename: str | Path) -> str:
+        return str(Path(filename).resolve())
+
+    @staticmethod
+    def _signature(filename: str | Path) -> tuple[int, int] | None:
+        try:
+            st = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def store(self, filename: str | Path) -> ResultStore:
+        key = self._key(filename)
+        if key not in self._stores:
+            self._stores[key] = open_result_store(filename)
+        return self._stores[key]
+
+    def _entry(self, filename: str | Path) -> _CacheEntry:
+        key = self._key(filename)
+        signature = self._signature(filename)
+        entry = self._entries.get(key)
+        if entry is not None and entry.signature == signature:
+            return entry
+        store = self.store(filename)
+        if signature is not None and self._catch_up(store, entry):
+            entry.signature = signature
+            return entry
+
+        # Read before the rows, so that the entry is never newer than its version
+        version = store.version() if signature is not None else None
+        rows = store.load() if signature is not None else []
+        entry = _CacheEntry(
+            signature=signature,
+            rows=rows,
+            index={result_key(r): r for r in rows},
+            version=version,
+        )
+        self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _catch_up(store: ResultStore, entry: _CacheEntry | None) -> bool:
+        """
+        Merge the rows written since the entry's version into it; False if the
+        store cannot list them and the file must be reloaded.
+        """
+        if entry is None or entry.version is None:
+            return False
+        changes = store.rows_since(entry.version)
+        if changes is None:
+            return False
+        rows, entry.version = changes
+        for row in rows:
+            row_key = result_key(row)
+            existing = entry.index.get(row_key)
+            if existing is None:
+                entry.rows.append(row)
+                entry.index[row_key] = row
+            else:
+                existing.update(row)
+        entry.df = None
+        return True
+
+    def rows(self, filename: str | Path, filters: Filters | None = None) -> list[dict]:
+        rows = self._entry(filename).rows
+        if filters:
+            return [r for r in rows if _row_matches(r, filters)]
+        return list(rows)
+
+    def get(self, filename: str | Path, key: tuple) -> dict | None:
+        return self._entry(filename).index.get(key)
+
+    def dataframe(
+        self,
+        filename: str | Path,
+        columns: list[str] | None = None,
+        filters: Filters | None = None,
+    ) -> pd.DataFrame:
+        """
+        Typed DataFrame view of the file; numeric fields are already converted.
+        Only the existing ones among `columns` and the rows matching `filters`
+        are returned. A copy is returned, so callers may modify it freely.
+
+        Stores with pushdown (Parquet) read just the requested columns and
+        rows from disk instead of parsing the whole file into the cache.
+        """
+        key = self._key(filename)
+        entry = self._entries.get(key)
+        fresh = entry is not None and entry.signature == self._signature(filename)
+        store = self.store(filename)
+        if (columns is not None or filters) and not fresh and store.supports_pushdown:
+            if self._signature(filename) is None:
+                return pd.DataFrame(columns=columns)
+            return store.read_frame(columns, filters)
+
+        entry = self._entry(filename)
+        if entry.df is None:
+            entry.df = _typed_frame(entry.rows)
+        df = entry.df
+        if filters:
+            df = _filter_frame(df, filters)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df.copy()
+
+    def upsert(self, filename: str | Path, row: dict) -> dict:
+        with interprocess_lock(filename):
+            return self._upsert(filename, row)
+
+    async def upsert_async(self, filename: str | Path, row: dict) -> dict:
+        """
+        `upsert` for coroutines: waits for a file lock held by another process
+        without blocking the event loop.
+        """
+        async with interprocess_lock_async(filename):
+            return self._upsert(filename, row)
+
+    def _upsert(self, filename: str | Path, row: dict) -> dict:
+        key = self._key(filename)
+        entry = self._entries.get(key)
+        was_fresh = entry is not None and entry.signature == self._signature(filename)
+
+        store = self.store(filename)
+        merged = store.upsert(row)
+
+        if not was_fresh and not self._catch_up(store, entry):
+            self._entries.pop(key, None)
+            return merged
+
+        row_key = result_key(merged)
+        existing = entry.index.get(row_key)
+        if existing is None:
+            entry.rows.append(merged)
+            entry.index[row_key] = merged
+        else:
+            existing.update(merged)
+        entry.signature = self._signature(filename)
+        entry.df = None
+        return merged
+
+    def reset(self, filename: str | Path) -> None:
+        with interprocess_lock(filename):
+            self.store(filename).reset()
+        self.invalidate(filename)
+
+    async def reset_async(self, filename: str | Path) -> None:
+        async with interprocess_lock_async(filename):
+            self.store(filename).reset()
+        self.invalidate(filename)
+
+    def invalidate(self, filename: str | Path | None = None) -> None:
+        if filename is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(self._key(filename), None)
+
+
+RESULT_CACHE = ResultCache()
+
+
 def status_counts_in_dir(data_dir: str | Path) -> dict[str, int]:
     counts = Counter()
     data_dir = Path(data_dir)
@@ -66,9 +844,12 @@ def status_counts_in_dir(data_dir: str | Path) -> dict[str, int]:
     if not data_dir.exists():
         return {}
 
-    for path in data_dir.glob("*.csv"):
+    paths = sorted(
+        p for pattern in RESULT_FILE_PATTERNS for p in data_dir.glob(pattern)
+    )
+    for path in paths:
         try:
-            results = load_results(str(path))
+            results = RESULT_CACHE.rows(path)
         except Exception:
             continue
 
@@ -80,8 +861,222 @@ def status_counts_in_dir(data_dir: str | Path) -> dict[str, int]:
     return dict(counts)
 
 
+SUBMISSION_LEDGER_FILENAME = ".submission_ledger.json"
+
+
+class SubmissionLedger:
+    """
+    Persistent index of the SUBMITTED rows of all result files in a directory.
+
+    Collectors record every status transition here, so the submission budget
+    is checked without parsing every result file. The ledger is written
+    atomically next to the result files, with the job id of every SUBMITTED
+    row by file, and the (mtime, size) signature of every result file as of
+    its last recorded transition. The first check of a ledger object (e.g. at
+    the start of a process) and `rebuild` rescan the files whose signature
+    differs, e.g. edited or reset by hand, written by a process that crashed
+    before recording the row, or created before the ledger existed, and drop
+    the entries of deleted files. Later checks only reread the ledger file if
+    another process changed it. Public methods hold an `interprocess_lock` on
+    the ledger file, so campaign workers in other processes can share it; the
+    `*_async` variants wait for it without blocking the event loop.
+    """
+
+    def __init__(self, data_dir: str | Path):
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / SUBMISSION_LEDGER_FILENAME
+        # Job id of every SUBMITTED row, by file name and result_key
+        self._submitted: dict[str, dict[tuple, str | None]] = {}
+        # Signature of every indexed result file, by file name
+        self._files: dict[str, tuple[int, int]] = {}
+        self._signature: tuple[int, int] | None = None
+        self._loaded = False
+        self._synced = False
+
+    def _refresh(self) -> None:
+        signature = ResultCache._signature(self.path)
+        if not (self._loaded and signature == self._signature):
+            self._submitted = {}
+            self._files = {}
+            if signature is not None:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._load(json.load(f))
+            self._signature = signature
+            self._loaded = True
+
+        if not self._synced:
+            self._synced = True
+            if self._sync_files() or signature is None:
+                self._write()
+
+    def _load(self, data: dict) -> None:
+        for name, entries in data["submitted"].items():
+            if not isinstance(entries, list):
+                # Ledgers written before the per-file index: {entry_id: job_id}
+                name, *key = json.loads(name)
+                entries = [[key, entries]]
+            for key, job_id in entries:
+                self._submitted.setdefault(name, {})[tuple(key)] = job_id
+        # Ledgers without signatures rescan all files once
+        self._files = {
+            name: tuple(file_signature)
+            for name, file_signature in data.get("files", {}).items()
+        }
+
+    def _sync_files(self) -> bool:
+        """
+        Rescan the result files whose signature differs from the indexed one,
+        and drop the entries of deleted files. Returns whether anything changed.
+        """
+        paths = {}
+        if self.data_dir.exists():
+            paths = {
+                p.name: p
+                for pattern in RESULT_FILE_PATTERNS
+                for p in self.data_dir.glob(pattern)
+            }
+
+        changed = False
+        for name in [name for name in self._files if name not in paths]:
+            self._drop_file(name)
+            changed = True
+        for name, path in sorted(paths.items()):
+            signature = ResultCache._signature(path)
+            if signature is not None and self._files.get(name) == signature:
+                continue
+            self._drop_file(name)
+            changed = True
+            if signature is None:
+                continue
+            try:
+                results = RESULT_CACHE.rows(path)
+            except Exception:
+                # Unreadable (e.g. being replaced): rescanned on the next rebuild
+                continue
+            entries = {
+                result_key(res): res.get("job_id")
+                for res in results
+                if res.get("status") == "SUBMITTED"
+            }
+            if entries:
+                self._submitted[name] = entries
+            # Taken before reading, so a concurrent change is rescanned later
+            self._files[name] = signature
+        return changed
+
+    def _drop_file(self, name: str) -> None:
+        self._files.pop(name, None)
+        self._submitted.pop(name, None)
+
+    def _write(self) -> None:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        submitted = {
+            name: [[list(key), job_id] for key, job_id in entries.items()]
+            for name, entries in self._submitted.items()
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"submitted": submitted, "files": self._files}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self._signature = ResultCache._signature(self.path)
+        self._loaded = True
+
+    def rebuild(self) -> None:
+        """
+        Rescan the result files that changed since their last recorded
+        transition, e.g. after editing them by hand while collectors run.
+        """
+        with interprocess_lock(self.path):
+            self._refresh()
+            if self._sync_files():
+                self._write()
+
+    def record(self, filename: str | Path, row: dict) -> None:
+        """
+        Record the current status of a result row after it was written.
+        """
+        with interprocess_lock(self.path):
+            self._record(filename, row)
+
+    async def record_async(self, filename: str | Path, row: dict) -> None:
+        async with interprocess_lock_async(self.path):
+            self._record(filename, row)
+
+    def _record(self, filename: str | Path, row: dict) -> None:
+        self._refresh()
+        name = Path(filename).name
+        key = result_key(row)
+        entries = self._submitted.get(name, {})
+        if row.get("status") == "SUBMITTED":
+            if entries.get(key, "") != row.get("job_id"):
+                self._submitted.setdefault(name, {})[key] = row.get("job_id")
+        elif key in entries:
+            del entries[key]
+            if not entries:
+                del self._submitted[name]
+
+        # The transition accounts for the file's change, so the next startup
+        # check does not rescan it
+        signature = ResultCache._signature(filename)
+        if Path(filename).resolve().parent == self.data_dir.resolve():
+            if signature is not None:
+                self._files[name] = signature
+        self._write()
+
+    def forget_file(self, filename: str | Path) -> None:
+        with interprocess_lock(self.path):
+            self._forget_file(filename)
+
+    async def forget_file_async(self, filename: str | Path) -> None:
+        async with interprocess_lock_async(self.path):
+            self._forget_file(filename)
+
+    def _forget_file(self, filename: str | Path) -> None:
+        self._refresh()
+        name = Path(filename).name
+        if name in self._submitted or name in self._files:
+            self._drop_file(name)
+            self._write()
+
+    def num_submitted(self) -> int:
+        """
+        Number of distinct submitted jobs; rows sharing a batched job count once.
+        """
+        with interprocess_lock(self.path):
+            self._refresh()
+        return self._num_jobs()
+
+    async def num_submitted_async(self) -> int:
+        async with interprocess_lock_async(self.path):
+            self._refresh()
+        return self._num_jobs()
+
+    def _num_jobs(self) -> int:
+        return len(
+            {
+                (name, key) if job_id is None else job_id
+                for name, entries in self._submitted.items()
+                for key, job_id in entries.items()
+            }
+        )
+
+
+_LEDGERS: dict[str, SubmissionLedger] = {}
+
+
+def submission_ledger(data_dir: str | Path) -> SubmissionLedger:
+    key = str(Path(data_dir).resolve())
+    if key not in _LEDGERS:
+        _LEDGERS[key] = SubmissionLedger(data_dir)
+    return _LEDGERS[key]
+
+
 def count_submitted_jobs_in_dir(data_dir: str | Path) -> int:
-    return status_counts_in_dir(data_dir).get("SUBMITTED", 0)
+    return submission_ledger(data_dir).num_submitted()
+
+
+async def count_submitted_jobs_in_dir_async(data_dir: str | Path) -> int:
+    return await submission_ledger(data_dir).num_submitted_async()
 
 
 def make_df_for_example(
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import asyncio
+import hashlib
+import json
+import os
+
+import classiq
+from classiq import QuantumProgram, synthesize, synthesize_async
+
+SYNTHESIS_CACHE_DIR = Path(__file__).resolve().parent / ".synthesis_cache"
+
+# Model fields that change between otherwise identical `create_model` calls:
+# statement ids, debug info, source locations and the random synthesis seed
+# drawn by `Preferences()`
+_VOLATILE_MODEL_KEYS = frozenset(
+    {"uuid", "compressed_debug_info", "source_ref", "back_ref", "random_seed"}
+)
+
+
+def _canonical_model(obj):
+    if isinstance(obj, dict):
+        return {
+            key: _canonical_model(value)
+            for key, value in obj.items()
+            if key not in _VOLATILE_MODEL_KEYS
+        }
+    if isinstance(obj, list):
+        return [_canonical_model(value) for value in obj]
+    return obj
+
+
+def model_hash(qmod: str) -> str:
+    """
+    Content hash of a serialized model, including its `Constraints` and
+    `Preferences`. The random synthesis seed, source locations, statement
+    ids and debug info are left out, so the same circuit built twice maps to
+    the same key.
+    """
+    canonical = json.dumps(_canonical_model(json.loads(qmod)), sort_keys=True)
+    return hashlib.sha256(
+        f"{classiq.__version__}\n{canonical}".encode("utf-8")
+    ).hexdigest()
+
+
+class SynthesisCache:
+    """
+    Content-addressed cache of synthesized `QuantumProgram`s, one JSON file
+    per model hash. Programs are returned as copies, so callers may set
+    their execution preferences freely.
+    """
+
+    def __init__(self, cache_dir: str | Path = SYNTHESIS_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._programs: dict[str, QuantumProgram] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self, key: str) -> QuantumProgram | None:
+        if key in self._programs:
+            return self._programs[key]
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            qprog = QuantumProgram.model_validate_json(path.read_text())
+        except Exception:
+            # Corrupt or written by an incompatible version: synthesize again
+            return None
+        self._programs[key] = qprog
+        return qprog
+
+    def _store(self, key: str, qprog: QuantumProgram) -> None:
+        self._programs[key] = qprog
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(qprog.model_dump_json())
+        os.replace(tmp, path)
+
+    def get(self, qmod: str) -> QuantumProgram | None:
+        qprog = self._load(model_hash(qmod))
+        return qprog.model_copy(deep=True) if qprog is not None else None
+
+    def synthesize(self, qmod: str) -> QuantumProgram:
+        key = model_hash(qmod)
+        qprog = self._load(key)
+        if qprog is None:
+            qprog = synthesize(qmod)
+            self._store(key, qprog)
+        return qprog.model_copy(deep=True)
+
+    async def _synthesize_and_store(self, key: str, qmod: str) -> QuantumProgram:
+        try:
+            qprog = await synthesize_async(qmod)
+            self._store(key, qprog)
+            return qprog
+        finally:
+            self._pending.pop(key, None)
+
+    async def synthesize_async(self, qmod: str) -> QuantumProgram:
+        """
+        Return the cached program for `qmod`, or synthesize it. Concurrent
+        requests for the same model share one synthesis.
+        """
+        key = model_hash(qmod)
+        qprog = self._load(key)
+        if qprog is None:
+            if key not in self._pending:
+                self._pending[key] = asyncio.ensure_future(
+                    self._synthesize_and_store(key, qmod)
+                )
+            qprog = await asyncio.shield(self._pending[key])
+        return qprog.model_copy(deep=True)
+
+    def clear(self) -> None:
+        self._programs.clear()
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink()
+
+
+SYNTHESIS_CACHE = SynthesisCache()
@@ -0,0 +1,12 @@
+"""
+Unit tests of the benchmarking framework. Run from the repository root with
+
+    python -m pytest benchmarking/tests
+"""
+
+import sys
+from pathlib import Path
+
+BENCHMARKING_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BENCHMARKING_DIR))
+sys.path.insert(0, str(BENCHMARKING_DIR / "protocols"))
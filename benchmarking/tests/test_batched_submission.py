@@ -0,0 +1,142 @@
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from benchmark import BenchmarkExample
+from collector import ResultCollector
+from errors import StageError
+from mock_provider import MockRunner, fixed
+from poller import JobPoller
+from qv_example import QVBatch, QVExample
+from scheduler import ExecutionScheduler
+from storage import RESULT_CACHE
+
+NUM_TRIALS = 3
+
+
+def batched_trials(problem_size: int = 2) -> list[QVExample]:
+    batch = QVBatch(problem_size, pairing_seed=7)
+    return [
+        QVExample(problem_size, trial_id=i, seed=100 + i, batch=batch)
+        for i in range(NUM_TRIALS)
+    ]
+
+
+def make_collector(tmp_path, max_submitted_jobs_in_dir) -> ResultCollector:
+    return ResultCollector(
+        str(tmp_path / "qv_2.csv"),
+        skip_report=True,
+        data_dir=str(tmp_path),
+        max_submitted_jobs_in_dir=max_submitted_jobs_in_dir,
+        scheduler=ExecutionScheduler(max_concurrency=8),
+        poller=JobPoller(min_interval=0.01),
+    )
+
+
+def make_runner() -> MockRunner:
+    return MockRunner(job_latency=fixed(0.05), seed=0)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    RESULT_CACHE.invalidate()
+
+
+def test_batch_takes_one_slot_of_the_budget(tmp_path):
+    collector = make_collector(tmp_path, max_submitted_jobs_in_dir=1)
+    runner = make_runner()
+
+    async def main():
+        return await asyncio.gather(
+            *(collector.run(runner, trial) for trial in batched_trials())
+        )
+
+    results = asyncio.run(main())
+    # The batch's own job fills a budget of 1, but its trials are not rejected
+    assert [r["status"] for r in results] == ["COMPLETED"] * NUM_TRIALS
+    assert len({r["job_id"] for r in results}) == 1
+
+
+def test_later_run_joins_the_submitted_batch(tmp_path):
+    runner = make_runner()
+    trials = batched_trials()
+
+    async def first_run():
+        collector = make_collector(tmp_path, max_submitted_jobs_in_dir=1)
+        await collector._submit_if_capacity_available(runner, trials[0])
+
+    asyncio.run(first_run())
+
+    # A new process rebuilds the batch; its other trials join the existing job
+    submitted = []
+    original_submit = runner.submit_execution
+
+    async def submit_execution(example):
+        submitted.append(example.name)
+        return await original_submit(example)
+
+    runner.submit_execution = submit_execution
+
+    async def second_run():
+        collector = make_collector(tmp_path, max_submitted_jobs_in_dir=1)
+        return await asyncio.gather(
+            *(collector.run(runner, trial) for trial in batched_trials())
+        )
+
+    results = asyncio.run(second_run())
+    assert submitted == []
+    assert [r["status"] for r in results] == ["COMPLETED"] * NUM_TRIALS
+    assert len({r["job_id"] for r in results}) == 1
+
+
+def test_mock_runner_runs_one_job_per_batch(tmp_path, monkeypatch):
+    ideal_distributions = QVExample.ideal_distributions
+    built = []
+
+    def counted(self):
+        built.append(self.name)
+        return ideal_distributions(self)
+
+    monkeypatch.setattr(QVExample, "ideal_distributions", counted)
+    # Batches of 2: trials 0 and 1 share a job, trial 2 has its own
+    first_batch, second_batch = QVBatch(2, pairing_seed=7), QVBatch(2, pairing_seed=8)
+    trials = [
+        QVExample(2, trial_id=i, seed=100 + i, batch=batch)
+        for i, batch in enumerate([first_batch, first_batch, second_batch])
+    ]
+    collector = make_collector(tmp_path, max_submitted_jobs_in_dir=None)
+    runner = make_runner()
+
+    async def main():
+        return await asyncio.gather(*(collector.run(runner, trial) for trial in trials))
+
+    results = asyncio.run(main())
+    assert [r["status"] for r in results] == ["COMPLETED"] * NUM_TRIALS
+    job_ids = [r["job_id"] for r in results]
+    assert job_ids[0] == job_ids[1] != job_ids[2]
+    # Built once per trial, for scoring
+    assert sorted(built) == sorted(trial.name for trial in trials)
+
+
+@dataclass
+class UnsupportedExample(BenchmarkExample):
+    name: str = "unsupported"
+    problem_size: int = 2
+
+    def create_main(self) -> callable:
+        return None
+
+    async def submit(self, qprog) -> str:
+        raise AssertionError("Not submitted by the mock runner")
+
+    async def score(self, job_id: str) -> dict:
+        raise AssertionError("Not scored by the mock runner")
+
+
+def test_mock_runner_rejects_examples_without_local_model():
+    with pytest.raises(StageError) as excinfo:
+        asyncio.run(make_runner().submit_execution(UnsupportedExample()))
+    assert excinfo.value.stage == "submit_job"
+    assert isinstance(excinfo.value.original, NotImplementedError)
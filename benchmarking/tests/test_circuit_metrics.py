@@ -0,0 +1,79 @@
+import pytest
+
+import circuit_metrics
+from circuit_metrics import qasm_metrics
+
+QASM2_HEADER = 'OPENQASM 2.0;\ninclude "qelib1.inc";\n'
+
+
+@pytest.fixture(autouse=True)
+def metrics_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuit_metrics, "METRICS_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(circuit_metrics, "_METRICS_BY_HASH", {})
+    return tmp_path
+
+
+def test_nested_parentheses_in_parameters():
+    metrics = qasm_metrics(
+        QASM2_HEADER
+        + "qreg q[3];\n"
+        + "u3(pi*(1/2),0,pi) q[0];\n"
+        + "rz((pi/2)*(1+1)) q[1];\n"
+        + "cu1(pi/(2*(1+1))) q[1],q[2];\n"
+    )
+    assert metrics["circuit_width"] == 3
+    assert metrics["gate_counts"] == {"u3": 1, "rz": 1, "cu1": 1}
+    assert metrics["two_qubit_gate_count"] == 1
+    assert metrics["circuit_depth"] == 2
+    assert metrics["two_qubit_depth"] == 1
+
+
+def test_register_broadcast_and_measure():
+    metrics = qasm_metrics(
+        QASM2_HEADER
+        + "qreg q[2];\ncreg c[2];\n"
+        + "h q;\ncx q[0],q[1];\nmeasure q -> c;\n"
+    )
+    assert metrics["gate_counts"] == {"h": 2, "cx": 1, "measure": 2}
+    assert metrics["circuit_depth"] == 2
+    assert metrics["circuit_width"] == 2
+
+
+def test_qasm3_parameters_and_measure():
+    metrics = qasm_metrics(
+        "OPENQASM 3.0;\nqubit[2] q;\nbit[2] c;\n"
+        + "rx(2*(pi/4)) q[0];\ncx q[0], q[1];\nc[1] = measure q[1];\n"
+    )
+    assert metrics["circuit_width"] == 2
+    assert metrics["gate_counts"] == {"rx": 1, "cx": 1, "measure": 1}
+    assert metrics["circuit_depth"] == 2
+
+
+def test_metrics_persist_across_runs(metrics_cache, monkeypatch):
+    qasm = QASM2_HEADER + "qreg q[2];\ncx q[0],q[1];\n"
+    metrics = qasm_metrics(qasm)
+    assert len(list(metrics_cache.glob("*.json"))) == 1
+
+    # A new run starts with an empty memo and must not parse the circuit again
+    monkeypatch.setattr(circuit_metrics, "_METRICS_BY_HASH", {})
+
+    def fail(qasm):
+        raise AssertionError("metrics computed again")
+
+    monkeypatch.setattr(circuit_metrics, "_compute_qasm_metrics", fail)
+    assert qasm_metrics(qasm) == metrics
+
+
+def test_qasm3_gate_modifiers():
+    metrics = qasm_metrics(
+        "OPENQASM 3.0;\nqubit[3] q;\n"
+        + "ctrl @ x q[0], q[1];\n"
+        + "inv @ s q[2];\n"
+        + "pow(2) @ rz(pi/(2*2)) q[2];\n"
+        + "negctrl(2) @ inv @ x q[0], q[1], q[2];\n"
+    )
+    assert metrics["circuit_width"] == 3
+    assert metrics["gate_counts"] == {"x": 2, "s": 1, "rz": 1}
+    assert metrics["two_qubit_gate_count"] == 1
+    assert metrics["two_qubit_depth"] == 2
+    assert metrics["circuit_depth"] == 3
@@ -0,0 +1,109 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import protocol
+from mock_provider import MockRunner
+from protocol import QuantumVolumeProtocol
+from qv_stats import confidence_sequence_radius, sequential_decisions
+
+THRESHOLD = 2 / 3
+ALPHA = 0.05
+
+
+def make_protocol(early_stopping: bool = True, **kwargs) -> QuantumVolumeProtocol:
+    return QuantumVolumeProtocol(
+        min_problem_size=2,
+        max_problem_size=2,
+        runners=[MockRunner()],
+        early_stopping=early_stopping,
+        **kwargs,
+    )
+
+
+def trial_rows(scores: list[float], num_errors: int = 0) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "problem_size": 2,
+            "backend_service_provider": "Mock",
+            "backend_name": "local_simulator",
+            "status": ["COMPLETED"] * len(scores) + ["ERROR"] * num_errors,
+            "heavy_output_probability": scores + [np.nan] * num_errors,
+        }
+    )
+
+
+def test_radius_shrinks_with_trials():
+    n = np.array([0, 1, 10, 100, 1000], dtype=float)
+    radius = confidence_sequence_radius(np.full(5, 0.1), n, ALPHA, n_opt=100)
+    assert radius[0] == np.inf
+    assert np.all(np.diff(radius) < 0)
+    # A smaller error rate gives a wider sequence
+    assert np.all(
+        confidence_sequence_radius(np.full(5, 0.1), n, ALPHA / 10, n_opt=100)[1:]
+        > radius[1:]
+    )
+
+
+def test_radius_is_regularized():
+    # Three identical scores have no spread, but the prior variance keeps the
+    # sequence wider than the distance of any score from the threshold
+    radius = confidence_sequence_radius(np.zeros(1), np.array([3.0]), ALPHA, 100)
+    assert radius[0] > THRESHOLD
+
+
+def test_sequential_decisions():
+    summary = pd.DataFrame(
+        {
+            "num_completed": [200, 200, 5, 0],
+            "mean_score": [0.85, 0.5, 0.85, np.nan],
+            "std_score": [0.05, 0.05, 0.05, np.nan],
+        }
+    )
+    decisions = sequential_decisions(summary, THRESHOLD, ALPHA, n_opt=200)
+    assert list(decisions) == ["passed", "failed", "", ""]
+
+
+def test_stopped_cell_passes_on_the_trials_it_ran():
+    df = trial_rows([0.85] * 30)
+    # Without early stopping, 30 of 100 trials are too few to pass
+    summary = make_protocol(False, num_trials=100)._summarize(df)
+    assert not summary["passed"].item()
+    assert make_protocol(num_trials=100)._summarize(df)["passed"].item()
+
+
+def test_stopped_cell_requires_completion_rate():
+    # 8 of 10 trials completed, below 1 - MAX_TRIAL_ERROR_RATE
+    df = trial_rows([0.85] * 8, num_errors=2)
+    assert not make_protocol(num_trials=100)._summarize(df)["passed"].item()
+
+
+class RecordingCollector:
+    def __init__(self):
+        self.waves = []
+
+    async def run(self, runner, example):
+        self.waves[-1].append(example.trial_id)
+        return None
+
+
+@pytest.mark.parametrize("wave_size, expected", [(3, 4), (4, 4), (5, 8)])
+def test_waves_hold_whole_batches(monkeypatch, wave_size, expected):
+    qv = make_protocol(num_trials=10, wave_size=wave_size, batch_size=4)
+    collector = RecordingCollector()
+
+    def compute_heavy_states(examples, workers):
+        collector.waves.append([])
+
+    monkeypatch.setattr(protocol, "compute_heavy_states", compute_heavy_states)
+    monkeypatch.setattr(qv, "sequential_decisions", lambda problem_size: {})
+
+    examples = qv.make_batch_examples(2)
+    asyncio.run(qv._run_waves(collector, qv.runners, examples))
+
+    assert [len(wave) for wave in collector.waves[:-1]] == [expected] * (
+        len(collector.waves) - 1
+    )
+    assert sum(collector.waves, []) == list(range(10))
@@ -0,0 +1,46 @@
+import asyncio
+
+from storage import RESULT_CACHE, interprocess_lock, submission_ledger
+
+
+def test_async_writes_do_not_block_the_event_loop(tmp_path):
+    filename = tmp_path / "ghz3.csv"
+    row = {
+        "example": "ghz",
+        "problem_size": 3,
+        "backend_service_provider": "Classiq",
+        "backend_name": "simulator",
+        "num_shots": 1000,
+        "status": "SUBMITTED",
+        "job_id": "job-a",
+    }
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def write():
+            merged = await RESULT_CACHE.upsert_async(filename, row)
+            await submission_ledger(tmp_path).record_async(filename, merged)
+
+        ticker = asyncio.ensure_future(tick())
+        # Another worker holds the lock of the result file (flock locks of
+        # separately opened files conflict within a process as well)
+        with interprocess_lock(filename):
+            writer = asyncio.ensure_future(write())
+            await asyncio.sleep(0.2)
+            assert not writer.done()
+            assert ticks >= 5
+        await writer
+        ticker.cancel()
+        return await submission_ledger(tmp_path).num_submitted_async()
+
+    try:
+        assert asyncio.run(main()) == 1
+    finally:
+        RESULT_CACHE.invalidate()
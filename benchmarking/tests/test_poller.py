@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from poller import JobPoller
+
+
+class FakeJobs:
+    """Status fetcher whose jobs finish after a number of polling rounds."""
+
+    def __init__(self, poller: JobPoller, rounds_by_job: dict[str, int]):
+        self.poller = poller
+        self.rounds_by_job = rounds_by_job
+        self.calls = []
+        self.intervals = []
+
+    async def __call__(self, job_ids: list[str]) -> dict[str, bool]:
+        self.calls.append(sorted(job_ids))
+        self.intervals.append(self.poller._interval)
+        return {
+            job_id: len(self.calls) >= self.rounds_by_job[job_id] for job_id in job_ids
+        }
+
+
+def test_jobs_are_polled_in_one_batch():
+    poller = JobPoller(min_interval=0.01)
+    jobs = FakeJobs(poller, {"a": 1, "b": 2, "c": 2, "d": 3})
+
+    async def main():
+        return await asyncio.gather(*(poller.wait(job, jobs) for job in "abcd"))
+
+    assert asyncio.run(main()) == [True] * 4
+    assert jobs.calls == [["a", "b", "c", "d"], ["b", "c", "d"], ["d"]]
+    assert poller.pending() == []
+
+
+def test_interval_backs_off_until_a_job_finishes():
+    poller = JobPoller(min_interval=0.01, max_interval=0.04, backoff=2)
+    jobs = FakeJobs(poller, {"a": 5, "b": 6})
+
+    async def main():
+        await asyncio.gather(poller.wait("a", jobs), poller.wait("b", jobs))
+
+    asyncio.run(main())
+    assert jobs.intervals == pytest.approx([0.01, 0.02, 0.04, 0.04, 0.04, 0.01])
+
+
+def test_timeout_and_wait_again():
+    poller = JobPoller(min_interval=0.01, max_interval=0.01)
+    jobs = FakeJobs(poller, {"a": 10})
+
+    async def main():
+        assert not await poller.wait("a", jobs, timeout=0.03)
+        assert poller.pending() == []
+        assert await poller.wait("a", jobs)
+
+    asyncio.run(main())
+    assert len(jobs.calls) == 10
+
+
+def test_jobs_of_other_sources_and_failed_polls():
+    poller = JobPoller(min_interval=0.01)
+    jobs = FakeJobs(poller, {"a": 1, "b": 1})
+
+    async def failing(job_ids):
+        raise ConnectionError("service unavailable")
+
+    async def main():
+        return await asyncio.gather(
+            poller.wait("a", jobs), poller.wait("b", jobs), poller.wait("x", failing)
+        )
+
+    # Jobs whose status cannot be polled are handed to scoring
+    assert asyncio.run(main()) == [True] * 3
+    assert jobs.calls == [["a", "b"]]
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qv_stats import (
+    SUMMARY_COLUMNS,
+    QVCells,
+    QVTrials,
+    bootstrap_interval,
+    summarize_trials,
+)
+
+GROUP_COLS = ["problem_size", "backend_service_provider", "backend_name"]
+SIGMA_FACTOR = 2.0
+THRESHOLD = 2 / 3
+NUM_TRIALS = 40
+MIN_COMPLETED = 34
+
+
+def trial_rows(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cells = [
+        (2, "Mock", "good"),
+        (2, "Mock", "bad"),
+        (3, "Mock", "good"),
+        (3, "Other", "good"),
+    ]
+    rows = []
+    for width, provider, backend in cells:
+        level = 0.8 if backend == "good" else 0.6
+        for _ in range(NUM_TRIALS):
+            status = rng.choice(["COMPLETED", "ERROR", "TIMEOUT"], p=[0.9, 0.05, 0.05])
+            rows.append(
+                {
+                    "problem_size": width,
+                    "backend_service_provider": provider,
+                    "backend_name": backend,
+                    "status": status,
+                    "heavy_output_probability": (
+                        rng.uniform(level - 0.1, level + 0.1)
+                        if status == "COMPLETED"
+                        else np.nan
+                    ),
+                    "num_shots": rng.choice([100, 200]),
+                }
+            )
+    # A cell without completed trials
+    rows.append({**rows[0], "backend_name": "down", "status": "ERROR"})
+    rows[-1]["heavy_output_probability"] = np.nan
+    return pd.DataFrame(rows)
+
+
+def baseline_summary(df: pd.DataFrame, pooled: bool) -> pd.DataFrame:
+    """Per-backend summary of every width, as computed per trial with pandas."""
+    total = df.groupby(GROUP_COLS).size().rename("num_total")
+    completed = df[df["status"] == "COMPLETED"]
+    stats = completed.groupby(GROUP_COLS)["heavy_output_probability"].agg(
+        num_completed="count", mean_score="mean", std_score="std"
+    )
+    stats["std_score"] = stats["std_score"].fillna(0.0)
+    stats["stderr_score"] = stats["std_score"] / np.sqrt(stats["num_completed"])
+
+    def pooled_lower_bound(group: pd.DataFrame) -> float:
+        n_c = len(group)
+        shots = group["num_shots"].to_numpy(dtype=float)
+        n_h = (group["heavy_output_probability"].to_numpy() * shots).sum()
+        variance = max(n_h * (shots.sum() - n_h / n_c), 0.0)
+        return (n_h - SIGMA_FACTOR * np.sqrt(variance)) / shots.sum()
+
+    if pooled:
+        stats["lower_confidence_bound"] = completed.groupby(GROUP_COLS).apply(
+            pooled_lower_bound, include_groups=False
+        )
+    else:
+        stats["lower_confidence_bound"] = (
+            stats["mean_score"] - SIGMA_FACTOR * stats["stderr_score"]
+        )
+
+    summary = pd.concat([total, stats], axis=1).reset_index()
+    summary["num_trials_requested"] = NUM_TRIALS
+    summary["num_completed"] = summary["num_completed"].fillna(0).astype(int)
+    summary["passed"] = (summary["num_completed"] >= MIN_COMPLETED) & (
+        summary["lower_confidence_bound"] > THRESHOLD
+    )
+    return summary[SUMMARY_COLUMNS]
+
+
+def baseline_bootstrap(
+    df: pd.DataFrame, num_samples: int, confidence: float, seed: int
+) -> pd.DataFrame:
+    """Bootstrap interval of every cell, one replicate and trial at a time.
+
+    Draws the same random numbers as `bootstrap_interval` with a single batch:
+    one uniform per replicate and trial, then one binomial per resampled trial.
+    """
+    completed = df[df["status"] == "COMPLETED"].sort_values(GROUP_COLS, kind="stable")
+    groups = list(completed.groupby(GROUP_COLS, sort=True))
+    hop = np.concatenate([g["heavy_output_probability"].to_numpy() for _, g in groups])
+    shots = np.concatenate([g["num_shots"].to_numpy(dtype=np.int64) for _, g in groups])
+    starts = np.cumsum([0] + [len(g) for _, g in groups])
+
+    rng = np.random.default_rng(seed)
+    uniforms = rng.random((num_samples, len(hop)))
+    picks = np.empty((num_samples, len(hop)), dtype=np.int64)
+    for r in range(num_samples):
+        for start, end in zip(starts[:-1], starts[1:]):
+            for t in range(start, end):
+                picks[r, t] = start + int(uniforms[r, t] * (end - start))
+    heavy = rng.binomial(shots[picks], hop[picks])
+
+    bounds = []
+    alpha = (1 - confidence) / 2
+    for c, (start, end) in enumerate(zip(starts[:-1], starts[1:])):
+        fractions = [
+            heavy[r, start:end].sum() / shots[picks[r, start:end]].sum()
+            for r in range(num_samples)
+        ]
+        bounds.append((*groups[c][0], *np.quantile(fractions, [alpha, 1 - alpha])))
+    return pd.DataFrame(
+        bounds, columns=[*GROUP_COLS, "bootstrap_lower", "bootstrap_upper"]
+    )
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_summary_matches_baseline(pooled):
+    df = trial_rows()
+    summary = summarize_trials(
+        df,
+        num_trials=NUM_TRIALS,
+        sigma_factor=SIGMA_FACTOR,
+        success_threshold=THRESHOLD,
+        min_completed=MIN_COMPLETED,
+        pooled=pooled,
+    )
+    pd.testing.assert_frame_equal(
+        summary, baseline_summary(df, pooled), check_dtype=False
+    )
+    if not pooled:
+        # Both outcomes are compared
+        assert summary["passed"].any() and not summary["passed"].all()
+
+
+def test_bootstrap_matches_baseline():
+    df = trial_rows(seed=1)
+    df = df[df["backend_name"] != "down"]
+    trials = QVTrials.from_frame(df)
+    cells = QVCells.from_trials(trials)
+    lower, upper = bootstrap_interval(trials, cells, 50, confidence=0.9, seed=3)
+
+    baseline = baseline_bootstrap(df, 50, confidence=0.9, seed=3)
+    np.testing.assert_allclose(lower, baseline["bootstrap_lower"])
+    np.testing.assert_allclose(upper, baseline["bootstrap_upper"])
+    assert list(cells.backend) == list(baseline["backend_name"])
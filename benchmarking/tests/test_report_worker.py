@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import collector
+from collector import ReportWorker
+
+
+def example(problem_size: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        name="ghz",
+        problem_size=problem_size,
+        report_family_title="GHZ",
+        report_family_description="",
+        report_instance_title=f"ghz - {problem_size} qubits",
+    )
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Problem sizes of the written sections; a size in `fail` fails once."""
+    written = SimpleNamespace(sizes=[], fail=set())
+
+    def write_section(section, results, root):
+        if section.problem_size in written.fail:
+            written.fail.discard(section.problem_size)
+            raise OSError("disk full")
+        written.sizes.append(section.problem_size)
+
+    monkeypatch.setattr(collector, "_write_report_section", write_section)
+    monkeypatch.setattr(collector, "write_includes", lambda root: None)
+    return written
+
+
+def fail(*args, **kwargs):
+    raise OSError("disk full")
+
+
+def test_failed_sections_are_retried(tmp_path, written):
+    worker = ReportWorker(root=str(tmp_path), debounce=0.0)
+    written.fail.add(3)
+
+    async def main():
+        worker.mark_dirty(str(tmp_path / "ghz3.csv"), example(3))
+        await worker.flush()
+
+    asyncio.run(main())
+    assert written.sizes == [3]
+
+
+def test_gives_up_after_max_attempts(tmp_path, written, monkeypatch):
+    monkeypatch.setattr(collector, "write_includes", fail)
+    worker = ReportWorker(root=str(tmp_path), debounce=0.0, max_attempts=2)
+
+    async def main():
+        worker.mark_dirty(str(tmp_path / "ghz3.csv"), example(3))
+        await worker.flush()
+
+    asyncio.run(main())
+    # Kept for the next update
+    assert list(worker._dirty) == ["ghz_003"]
+
+
+def test_failed_build_is_retried(tmp_path, written, monkeypatch):
+    builds = []
+
+    def build_report(root, force, precompile_preamble):
+        builds.append(root)
+        if len(builds) == 1:
+            raise RuntimeError("latexmk failed")
+        return True
+
+    monkeypatch.setattr(collector, "build_report", build_report)
+    worker = ReportWorker(root=str(tmp_path), debounce=0.0, min_build_interval=0.0)
+
+    async def main():
+        worker.mark_dirty(str(tmp_path / "ghz3.csv"), example(3), build=True)
+        await worker.flush()
+
+    asyncio.run(main())
+    assert len(builds) == 2
+
+
+def test_worker_is_reused_across_event_loops(tmp_path, written):
+    worker = ReportWorker(root=str(tmp_path), debounce=0.0)
+
+    for problem_size in [3, 4]:
+
+        async def main():
+            worker.mark_dirty(str(tmp_path / "ghz.csv"), example(problem_size))
+            await worker.flush()
+
+        asyncio.run(main())
+    assert written.sizes == [3, 4]
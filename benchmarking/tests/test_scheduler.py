@@ -0,0 +1,98 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from scheduler import ExecutionScheduler
+
+
+def runner(provider: str, backend: str = "qpu") -> SimpleNamespace:
+    return SimpleNamespace(backend_service_provider=provider, backend_name=backend)
+
+
+def test_faster_backends_start_first():
+    scheduler = ExecutionScheduler(
+        max_concurrency=1, expected_durations={"IonQ": 600, "Classiq": 1}
+    )
+    started = []
+
+    async def run(name, r):
+        async with scheduler.slot(r):
+            started.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        async with scheduler.slot(runner("Other")):
+            tasks = [
+                asyncio.create_task(run("slow", runner("IonQ"))),
+                asyncio.create_task(run("fast", runner("Classiq"))),
+            ]
+            await asyncio.sleep(0.01)
+            assert scheduler.stats()["queued"] == 2
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert started == ["fast", "slow"]
+
+
+def test_backend_limits():
+    scheduler = ExecutionScheduler(
+        max_concurrency=8, backend_limits={"IonQ": 1, "Classiq/simulator": 2}
+    )
+    active = {}
+    peak = {}
+
+    async def run(r):
+        async with scheduler.slot(r):
+            key = r.backend_service_provider
+            active[key] = active.get(key, 0) + 1
+            peak[key] = max(peak.get(key, 0), active[key])
+            await asyncio.sleep(0.01)
+            active[key] -= 1
+
+    async def main():
+        await asyncio.gather(
+            *(run(runner("IonQ")) for _ in range(3)),
+            *(run(runner("Classiq", "simulator")) for _ in range(4)),
+            *(run(runner("Other")) for _ in range(4)),
+        )
+
+    asyncio.run(main())
+    assert peak == {"IonQ": 1, "Classiq": 2, "Other": 4}
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_frees_nothing():
+    scheduler = ExecutionScheduler(max_concurrency=1)
+
+    async def main():
+        async with scheduler.slot(runner("IonQ")):
+            waiter = asyncio.create_task(scheduler.slot(runner("IonQ")).__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+        assert scheduler.stats()["in_flight"] == 0
+        async with scheduler.slot(runner("IonQ")):
+            assert scheduler.stats()["in_flight"] == 1
+
+    asyncio.run(main())
+
+
+def test_submission_rate():
+    def make_scheduler() -> ExecutionScheduler:
+        return ExecutionScheduler(
+            submission_rate=20,
+            submission_burst=2,
+            backend_submission_rates={"Classiq": 1000},
+        )
+
+    async def submit(scheduler, r, num_submissions):
+        start = time.monotonic()
+        for _ in range(num_submissions):
+            await scheduler.wait_for_submission(r)
+        return time.monotonic() - start
+
+    # A burst of 2, then one submission every 50 ms
+    assert asyncio.run(submit(make_scheduler(), runner("IonQ"), 2)) < 0.02
+    assert asyncio.run(submit(make_scheduler(), runner("IonQ"), 6)) >= 0.18
+    # The backend's own bucket is not throttled by the default rate
+    assert asyncio.run(submit(make_scheduler(), runner("Classiq"), 6)) < 0.05
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import (
+    classical_fidelity,
+    classical_fidelity_batch,
+    normalized_tvd_score,
+    outcomes,
+    parity_expectation,
+    parity_expectation_batch,
+    popcount,
+    total_variation_distance,
+    total_variation_distance_to,
+)
+
+NUM_QUBITS = 6
+
+
+# Per-row DataFrame scoring of the examples before the shared kernels
+
+
+def baseline_parity(df: pd.DataFrame) -> float:
+    signs = 1 - 2 * df["x"].apply(lambda x: int(x).bit_count() % 2)
+    return (df["probability"] * signs).sum()
+
+
+def baseline_tvd_score(df: pd.DataFrame, u: np.ndarray, n: int) -> float:
+    p = np.zeros(2**n)
+    p[df["x"]] = df["probability"].to_numpy()
+    return 1.0 - 0.5 * np.abs(p - u).sum() / (1.0 - 1.0 / n)
+
+
+def baseline_fidelity(df: pd.DataFrame, u: np.ndarray, n: int) -> float:
+    p = np.zeros(2**n)
+    p[df["x"]] = df["probability"].to_numpy()
+    return np.sqrt(p * u).sum() ** 2
+
+
+def sampled_df(rng: np.random.Generator, n: int = NUM_QUBITS) -> pd.DataFrame:
+    states = rng.choice(2**n, size=rng.integers(1, 2**n), replace=False)
+    probs = rng.random(len(states))
+    return pd.DataFrame({"x": states, "probability": probs / probs.sum()})
+
+
+def linear_amplitudes(n: int) -> np.ndarray:
+    amps = np.arange(2**n)
+    return (amps / np.linalg.norm(amps)) ** 2
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(1234)
+
+
+def test_popcount(rng):
+    states = rng.integers(0, 2**62, size=1000)
+    states = np.concatenate([states, [0, 1, 2**63 - 1, -1]])
+    assert popcount(states).tolist() == [
+        int(x).bit_count() if x >= 0 else 64 for x in states
+    ]
+
+
+def test_parity_expectation(rng):
+    dfs = [sampled_df(rng) for _ in range(20)]
+    expected = [baseline_parity(df) for df in dfs]
+    assert [parity_expectation(*outcomes(df)) for df in dfs] == pytest.approx(expected)
+    batch = parity_expectation_batch([outcomes(df) for df in dfs])
+    assert batch == pytest.approx(expected)
+
+
+def test_bit_list_outcomes(rng):
+    df = sampled_df(rng)
+    bits = df["x"].apply(lambda x: [(x >> i) & 1 for i in range(NUM_QUBITS)])
+    states, probs = outcomes(df.assign(x=bits))
+    assert states.tolist() == df["x"].tolist()
+    assert probs.tolist() == df["probability"].tolist()
+
+
+def test_total_variation_distance(rng):
+    u = linear_amplitudes(NUM_QUBITS)
+    support = np.flatnonzero(u)
+    for _ in range(20):
+        df = sampled_df(rng)
+        states, probs = outcomes(df)
+        expected = baseline_tvd_score(df, u, NUM_QUBITS)
+
+        tvd = total_variation_distance(states, probs, support, u[support])
+        assert normalized_tvd_score(tvd, NUM_QUBITS) == pytest.approx(expected)
+        tvd = total_variation_distance_to(states, probs, lambda s: u[s])
+        assert normalized_tvd_score(tvd, NUM_QUBITS) == pytest.approx(expected)
+
+
+def test_total_variation_distance_repeated_states():
+    states = np.array([1, 1, 2])
+    probs = np.array([0.25, 0.25, 0.5])
+    ideal = {1: 0.5, 2: 0.5}
+    assert total_variation_distance(
+        states, probs, np.array([1, 2]), np.array([0.5, 0.5])
+    ) == pytest.approx(0.0)
+    assert total_variation_distance_to(
+        states, probs, lambda s: np.array([ideal[x] for x in s])
+    ) == pytest.approx(0.0)
+
+
+def test_classical_fidelity(rng):
+    u = linear_amplitudes(NUM_QUBITS)
+    support = np.flatnonzero(u)
+    dfs = [sampled_df(rng) for _ in range(20)]
+    expected = [baseline_fidelity(df, u, NUM_QUBITS) for df in dfs]
+
+    fidelities = [classical_fidelity(*outcomes(df), support, u[support]) for df in dfs]
+    assert fidelities == pytest.approx(expected)
+    batch = classical_fidelity_batch([outcomes(df) for df in dfs], support, u[support])
+    assert batch == pytest.approx(expected)
+
+
+def test_classical_fidelity_of_ideal_samples():
+    ghz_states = np.array([0, 2**NUM_QUBITS - 1])
+    ghz_probs = np.array([0.5, 0.5])
+    assert classical_fidelity(ghz_states, ghz_probs, ghz_states, ghz_probs) == (
+        pytest.approx(1.0)
+    )
+    # Repeated states are merged; disjoint supports have fidelity 0
+    results = [
+        (np.array([0, 0, 2**NUM_QUBITS - 1]), np.array([0.25, 0.25, 0.5])),
+        (np.array([1, 2]), np.array([0.5, 0.5])),
+    ]
+    assert classical_fidelity_batch(results, ghz_states, ghz_probs) == (
+        pytest.approx([1.0, 0.0])
+    )
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+
+import pytest
+
+from storage import (
+    RESULT_CACHE,
+    ParquetResultStore,
+    SQLiteResultStore,
+    open_result_store,
+    result_key,
+)
+
+
+def result_row(backend_name: str, status: str) -> dict:
+    return {
+        "example": "qv",
+        "problem_size": 2,
+        "backend_service_provider": "Mock",
+        "backend_name": backend_name,
+        "num_shots": 100,
+        "status": status,
+    }
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".sqlite", ".parquet"])
+def test_upsert_merges_rows(tmp_path, suffix):
+    store = open_result_store(tmp_path / f"qv_2{suffix}")
+    store.upsert({**result_row("a", "SUBMITTED"), "job_id": "job-a"})
+    store.upsert(result_row("b", "SUBMITTED"))
+    merged = store.upsert(
+        {**result_row("a", "COMPLETED"), "heavy_output_probability": 0.75}
+    )
+
+    assert merged["job_id"] == "job-a" and merged["status"] == "COMPLETED"
+    rows = open_result_store(tmp_path / f"qv_2{suffix}").load()
+    assert [(r["backend_name"], r["status"]) for r in rows] == [
+        ("a", "COMPLETED"),
+        ("b", "SUBMITTED"),
+    ]
+    assert rows[0]["job_id"] == "job-a"
+    # CSV rows hold the values as text
+    assert float(rows[0]["heavy_output_probability"]) == 0.75
+    assert store.get(result_key(result_row("b", "")))["status"] == "SUBMITTED"
+
+    store.reset()
+    assert store.load() == []
+
+
+def test_parquet_read_pushdown(tmp_path, monkeypatch):
+    filename = tmp_path / "qv_2.parquet"
+    store = ParquetResultStore(str(filename))
+    for backend, status in [("a", "COMPLETED"), ("b", "ERROR"), ("c", "COMPLETED")]:
+        store.upsert({**result_row(backend, status), "job_id": f"job-{backend}"})
+
+    # The cache reads the requested columns and rows from the file only
+    monkeypatch.setattr(
+        ParquetResultStore,
+        "load",
+        lambda self: pytest.fail("whole file loaded"),
+    )
+    df = RESULT_CACHE.dataframe(
+        filename,
+        columns=["backend_name", "problem_size", "missing"],
+        filters=[("status", "==", "COMPLETED")],
+    )
+    assert list(df.columns) == ["backend_name", "problem_size"]
+    assert list(df["backend_name"]) == ["a", "c"]
+    assert df["problem_size"].dtype == "int64"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    RESULT_CACHE.invalidate()
+
+
+def write_from_other_process(filename, write) -> None:
+    """Write through a store of its own, as another campaign worker does."""
+    before = os.stat(filename).st_mtime_ns
+    write(SQLiteResultStore(str(filename)))
+    # The cache notices the write by the file's signature
+    os.utime(filename, ns=(before + 10**9, before + 10**9))
+
+
+def forbid_load(monkeypatch):
+    def load(self):
+        raise AssertionError("whole file loaded")
+
+    monkeypatch.setattr(SQLiteResultStore, "load", load)
+
+
+def test_cache_reads_only_rows_written_by_others(tmp_path, monkeypatch):
+    filename = tmp_path / "qv_2.sqlite"
+    RESULT_CACHE.upsert(filename, result_row("a", "SUBMITTED"))
+    RESULT_CACHE.upsert(filename, result_row("b", "SUBMITTED"))
+    assert len(RESULT_CACHE.rows(filename)) == 2
+
+    write_from_other_process(
+        filename,
+        lambda store: (
+            store.upsert(result_row("a", "COMPLETED")),
+            store.upsert(result_row("c", "SUBMITTED")),
+        ),
+    )
+    forbid_load(monkeypatch)
+
+    merged = RESULT_CACHE.get(filename, result_key(result_row("a", "")))
+    assert merged["status"] == "COMPLETED"
+    assert [r["backend_name"] for r in RESULT_CACHE.rows(filename)] == ["a", "b", "c"]
+
+
+def test_upsert_after_write_by_others(tmp_path, monkeypatch):
+    filename = tmp_path / "qv_2.sqlite"
+    RESULT_CACHE.upsert(filename, result_row("a", "SUBMITTED"))
+    RESULT_CACHE.rows(filename)
+
+    write_from_other_process(
+        filename, lambda store: store.upsert(result_row("b", "SUBMITTED"))
+    )
+    forbid_load(monkeypatch)
+
+    RESULT_CACHE.upsert(filename, result_row("a", "COMPLETED"))
+    rows = RESULT_CACHE.rows(filename)
+    assert [(r["backend_name"], r["status"]) for r in rows] == [
+        ("a", "COMPLETED"),
+        ("b", "SUBMITTED"),
+    ]
+
+
+def test_reset_by_others_reloads_the_file(tmp_path, monkeypatch):
+    filename = tmp_path / "qv_2.sqlite"
+    RESULT_CACHE.upsert(filename, result_row("a", "SUBMITTED"))
+    RESULT_CACHE.rows(filename)
+
+    def reset_and_write(store):
+        store.reset()
+        store.upsert(result_row("b", "SUBMITTED"))
+
+    write_from_other_process(filename, reset_and_write)
+    assert [r["backend_name"] for r in RESULT_CACHE.rows(filename)] == ["b"]
+
+
+def test_file_without_versions(tmp_path):
+    filename = tmp_path / "qv_2.sqlite"
+    conn = sqlite3.connect(filename)
+    with conn:
+        conn.execute(
+            "CREATE TABLE results ("
+            "example TEXT, problem_size INTEGER, "
+            "backend_service_provider TEXT, backend_name TEXT, "
+            "num_shots INTEGER, seq INTEGER, data TEXT NOT NULL, "
+            "PRIMARY KEY (example, problem_size, backend_service_provider, "
+            "backend_name, num_shots))"
+        )
+        conn.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                *result_key(result_row("a", "")),
+                0,
+                SQLiteResultStore._encode(result_row("a", "SUBMITTED")),
+            ),
+        )
+    conn.close()
+
+    store = SQLiteResultStore(str(filename))
+    version = store.version()
+    store.upsert(result_row("b", "SUBMITTED"))
+    rows, _ = store.rows_since(version)
+    assert [r["backend_name"] for r in rows] == ["b"]
+    assert [r["backend_name"] for r in store.load()] == ["a", "b"]
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from storage import (
+    RESULT_CACHE,
+    SubmissionLedger,
+    count_submitted_jobs_in_dir,
+    dump_results,
+    load_results,
+)
+
+
+def result_row(backend_name: str, status: str, job_id: str) -> dict:
+    return {
+        "example": "ghz",
+        "problem_size": 3,
+        "backend_service_provider": "Classiq",
+        "backend_name": backend_name,
+        "num_shots": 1000,
+        "status": status,
+        "job_id": job_id,
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    yield tmp_path
+    RESULT_CACHE.invalidate()
+
+
+def submit(data_dir, filename, row) -> None:
+    """Write a row and record it, as the collectors do."""
+    merged = RESULT_CACHE.upsert(data_dir / filename, row)
+    SubmissionLedger(data_dir).record(data_dir / filename, merged)
+
+
+def test_records_submissions(data_dir):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    submit(data_dir, "ghz3.csv", result_row("b", "SUBMITTED", "job-b"))
+    assert SubmissionLedger(data_dir).num_submitted() == 2
+
+    submit(data_dir, "ghz3.csv", result_row("a", "COMPLETED", "job-a"))
+    assert SubmissionLedger(data_dir).num_submitted() == 1
+
+
+def test_deleted_result_file(data_dir):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    submit(data_dir, "qft3.csv", result_row("a", "SUBMITTED", "job-q"))
+    ledger = SubmissionLedger(data_dir)
+    assert ledger.num_submitted() == 2
+
+    (data_dir / "ghz3.csv").unlink()
+    # Noticed at the start of the next process, or on rebuild
+    assert SubmissionLedger(data_dir).num_submitted() == 1
+    ledger.rebuild()
+    assert ledger.num_submitted() == 1
+
+
+def test_result_file_edited_by_hand(data_dir):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    ledger = SubmissionLedger(data_dir)
+    assert ledger.num_submitted() == 1
+
+    rows = load_results(str(data_dir / "ghz3.csv"))
+    rows[0]["status"] = "ERROR"
+    dump_results(str(data_dir / "ghz3.csv"), rows)
+    assert ledger.num_submitted() == 1
+    ledger.rebuild()
+    assert ledger.num_submitted() == 0
+
+    dump_results(str(data_dir / "ghz3.csv"), [])
+    assert count_submitted_jobs_in_dir(data_dir) == 0
+
+
+def test_crash_before_recording(data_dir):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    ledger = SubmissionLedger(data_dir)
+    assert ledger.num_submitted() == 1
+
+    # The process stopped between writing the row and recording it
+    RESULT_CACHE.upsert(data_dir / "ghz3.csv", result_row("a", "COMPLETED", "job-a"))
+    RESULT_CACHE.upsert(data_dir / "ghz3.csv", result_row("b", "SUBMITTED", "job-b"))
+    assert SubmissionLedger(data_dir).num_submitted() == 1
+    ledger_data = json.loads((data_dir / ".submission_ledger.json").read_text())
+    assert ledger_data["submitted"] == {
+        "ghz3.csv": [[["ghz", 3, "Classiq", "b", 1000], "job-b"]]
+    }
+
+
+def test_existing_files_without_ledger(data_dir):
+    dump_results(
+        str(data_dir / "ghz3.csv"),
+        [
+            result_row("a", "SUBMITTED", "job-a"),
+            result_row("b", "SUBMITTED", "job-a"),
+            result_row("c", "COMPLETED", "job-c"),
+        ],
+    )
+    # Rows of a batched job count once
+    assert SubmissionLedger(data_dir).num_submitted() == 1
+
+
+def test_transitions_do_not_rescan(data_dir, monkeypatch):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    ledger = SubmissionLedger(data_dir)
+    assert ledger.num_submitted() == 1
+
+    def rows(*args, **kwargs):
+        raise AssertionError("Result file read by the ledger")
+
+    merged = RESULT_CACHE.upsert(
+        data_dir / "ghz3.csv", result_row("b", "SUBMITTED", "job-b")
+    )
+    monkeypatch.setattr(RESULT_CACHE, "rows", rows)
+    ledger.record(data_dir / "ghz3.csv", merged)
+    assert ledger.num_submitted() == 2
+    # The recorded signature is current, so a new process does not rescan either
+    assert SubmissionLedger(data_dir).num_submitted() == 2
+
+
+def test_ledger_without_per_file_index(data_dir):
+    submit(data_dir, "ghz3.csv", result_row("a", "SUBMITTED", "job-a"))
+    (data_dir / ".submission_ledger.json").write_text(
+        json.dumps(
+            {
+                "submitted": {
+                    json.dumps(["ghz3.csv", "ghz", 3, "Classiq", "a", 1000]): "job-a"
+                }
+            }
+        )
+    )
+    ledger = SubmissionLedger(data_dir)
+    assert ledger.num_submitted() == 1
+    submit(data_dir, "ghz3.csv", result_row("a", "COMPLETED", "job-a"))
+    assert ledger.num_submitted() == 0
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+import synthesis_cache
+from synthesis_cache import SynthesisCache, model_hash
+
+
+class FakeProgram:
+    """Stands in for a synthesized QuantumProgram."""
+
+    def __init__(self, qmod: str):
+        self.qmod = qmod
+
+    def model_copy(self, deep: bool = False) -> "FakeProgram":
+        return FakeProgram(self.qmod)
+
+    def model_dump_json(self) -> str:
+        return json.dumps({"qmod": self.qmod})
+
+    @classmethod
+    def model_validate_json(cls, data: str) -> "FakeProgram":
+        return cls(json.loads(data)["qmod"])
+
+
+def qmod(random_seed: int = 1, uuid: str = "a", num_qubits: int = 3) -> str:
+    return json.dumps(
+        {
+            "functions": [
+                {
+                    "name": "main",
+                    "body": [{"uuid": uuid, "source_ref": {"line": uuid}}],
+                    "num_qubits": num_qubits,
+                }
+            ],
+            "preferences": {"random_seed": random_seed, "optimization_level": 1},
+        }
+    )
+
+
+@pytest.fixture
+def synthesized(monkeypatch):
+    calls = []
+
+    async def synthesize_async(qmod):
+        calls.append(qmod)
+        await asyncio.sleep(0.01)
+        return FakeProgram(qmod)
+
+    monkeypatch.setattr(synthesis_cache, "synthesize_async", synthesize_async)
+    monkeypatch.setattr(synthesis_cache, "QuantumProgram", FakeProgram)
+    return calls
+
+
+def test_hash_ignores_volatile_fields():
+    assert model_hash(qmod(random_seed=1, uuid="a")) == model_hash(
+        qmod(random_seed=2, uuid="b")
+    )
+    assert model_hash(qmod(num_qubits=3)) != model_hash(qmod(num_qubits=4))
+
+
+def test_hash_depends_on_classiq_version(monkeypatch):
+    key = model_hash(qmod())
+    monkeypatch.setattr(synthesis_cache.classiq, "__version__", "0.0.0")
+    assert model_hash(qmod()) != key
+
+
+def test_concurrent_requests_share_one_synthesis(tmp_path, synthesized):
+    cache = SynthesisCache(tmp_path)
+
+    async def main():
+        return await asyncio.gather(
+            cache.synthesize_async(qmod(random_seed=1)),
+            cache.synthesize_async(qmod(random_seed=2)),
+            cache.synthesize_async(qmod(num_qubits=4)),
+        )
+
+    first, second, other = asyncio.run(main())
+    assert len(synthesized) == 2
+    # Every caller gets its own copy
+    assert first is not second and first.qmod == second.qmod
+    assert other.qmod == qmod(num_qubits=4)
+
+
+def test_programs_persist_across_runs(tmp_path, synthesized):
+    asyncio.run(SynthesisCache(tmp_path).synthesize_async(qmod()))
+    qprog = asyncio.run(SynthesisCache(tmp_path).synthesize_async(qmod(uuid="b")))
+    assert len(synthesized) == 1
+    assert qprog.qmod == qmod()
@@ -0,0 +1,85 @@
+import asyncio
+import contextvars
+import json
+
+from tracing import Tracer
+
+
+def test_runs_have_their_own_tracks_and_stage_times():
+    tracer = Tracer()
+
+    async def run(track, seconds):
+        tracer.begin_run(track)
+        with tracer.span("synthesize"):
+            await asyncio.sleep(seconds)
+        with tracer.span("synthesize"):
+            pass
+        with tracer.span("score", job_id=track):
+            pass
+        return tracer.stage_times()
+
+    async def main():
+        return await asyncio.gather(run("slow", 0.05), run("fast", 0.0))
+
+    slow, fast = asyncio.run(main())
+    assert set(slow) == {"time_synthesize", "time_score"}
+    assert slow["time_synthesize"] >= 0.05 > fast["time_synthesize"]
+    assert {span.track for span in tracer.spans} == {"slow", "fast"}
+    assert len(tracer.spans) == 6
+
+
+def test_lock_waits_are_recorded():
+    tracer = Tracer()
+
+    async def main():
+        lock = asyncio.Lock()
+        tracer.begin_run("run")
+        async with lock:
+            waiter = asyncio.create_task(tracer.locked(lock, "file_lock").__aenter__())
+            await asyncio.sleep(0.02)
+        await waiter
+        return tracer.stage_times()
+
+    assert asyncio.run(main())["time_file_lock_wait"] >= 0.02
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    tracer.enabled = False
+
+    def run():
+        tracer.begin_run("run")
+        with tracer.span("submit"):
+            pass
+        return tracer.stage_times()
+
+    # Runs in a context of its own, as the tasks of the collectors do
+    assert contextvars.copy_context().run(run) == {}
+    assert tracer.spans == []
+
+
+def test_export_chrome_trace(tmp_path):
+    tracer = Tracer()
+
+    def run(track):
+        tracer.begin_run(track)
+        with tracer.span("submit", job_id=track):
+            pass
+
+    for track in ["a", "b", "a"]:
+        contextvars.copy_context().run(run, track)
+    filename = tmp_path / "traces" / "trace.json"
+    tracer.export_chrome_trace(filename)
+
+    events = json.loads(filename.read_text())["traceEvents"]
+    names = [e for e in events if e["ph"] == "M"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [(e["tid"], e["args"]["name"]) for e in names] == [(1, "a"), (2, "b")]
+    assert [(e["tid"], e["args"]["job_id"]) for e in spans] == [
+        (1, "a"),
+        (2, "b"),
+        (1, "a"),
+    ]
+    # Microseconds since the tracer was created
+    assert all(e["ts"] >= 0 and e["dur"] >= 0 for e in spans)
+    assert spans[0]["ts"] <= spans[1]["ts"] <= spans[2]["ts"]
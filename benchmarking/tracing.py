@@ -0,0 +1,131 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+
+import asyncio
+import json
+import os
+import time
+
+# Result columns holding the accumulated seconds per stage, e.g. "time_synthesize"
+TIMING_COLUMN_PREFIX = "time_"
+
+_TRACK: ContextVar[str] = ContextVar("trace_track", default="main")
+_STAGE_TIMES: ContextVar[dict[str, float] | None] = ContextVar(
+    "trace_stage_times", default=None
+)
+
+
+@dataclass
+class Span:
+    name: str
+    track: str
+    start: float  # seconds since the tracer origin
+    duration: float  # seconds
+    args: dict
+
+
+class Tracer:
+    """
+    Records timed spans of the benchmarking pipeline.
+
+    Each `ResultCollector.run` is one track (a row in the trace viewer), and
+    the seconds spent per stage in the current run are also accumulated so
+    they can be stored with the result row. Lock waits are recorded as
+    separate `<lock>_wait` stages.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.reset()
+
+    def reset(self) -> None:
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter()
+
+    def begin_run(self, track: str) -> None:
+        """
+        Start a new track in the current task and reset its stage times.
+        """
+        _TRACK.set(track)
+        _STAGE_TIMES.set({})
+
+    def stage_times(self) -> dict[str, float]:
+        """
+        Seconds spent per stage in the current run, as result columns.
+        """
+        times = _STAGE_TIMES.get() or {}
+        return {
+            f"{TIMING_COLUMN_PREFIX}{name}": round(seconds, 6)
+            for name, seconds in times.items()
+        }
+
+    def record(self, name: str, start: float, end: float, **args) -> None:
+        if not self.enabled:
+            return
+        times = _STAGE_TIMES.get()
+        if times is not None:
+            times[name] = times.get(name, 0.0) + end - start
+        self.spans.append(
+            Span(name, _TRACK.get(), start - self._origin, end - start, args)
+        )
+
+    @contextmanager
+    def span(self, name: str, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    @asynccontextmanager
+    async def locked(self, lock: asyncio.Lock, name: str):
+        """
+        Acquire `lock` and hold it for the block, recording the wait time.
+        """
+        start = time.perf_counter()
+        async with lock:
+            self.record(f"{name}_wait", start, time.perf_counter())
+            yield
+
+    def export_chrome_trace(self, filename: str | Path) -> None:
+        """
+        Write all spans as a Chrome trace (open in Perfetto or chrome://tracing).
+        """
+        pid = os.getpid()
+        tids: dict[str, int] = {}
+        events = []
+        for span in self.spans:
+            if span.track not in tids:
+                tids[span.track] = len(tids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": tids[span.track],
+                        "args": {"name": span.track},
+                    }
+                )
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "benchmarking",
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": tids[span.track],
+                    "args": span.args,
+                }
+            )
+
+        path = Path(filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
+        )
+
+
+TRACER = Tracer()